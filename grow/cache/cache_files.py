@@ -0,0 +1,37 @@
+"""Shared handling of the persistent cache files in the pod control directory."""
+
+import os
+import tempfile
+import time
+
+
+# Files modified this recently could be changed again without changing the
+# modified time, so the modified time cannot be used to validate them.
+RACY_NS = 2 * 10**9
+
+
+def is_racy(mtime_ns, now_ns=None):
+    """Was the file modified too recently to be validated by modified time?"""
+    if now_ns is None:
+        now_ns = time.time_ns()
+    return now_ns - mtime_ns < RACY_NS
+
+
+def replace_file(pod, pod_path, content):
+    """Write a cache file using a temp file so it is never partially written.
+
+    The temp file is created in the temp directory of the control directory
+    so it is on the same file system and can replace the file.
+    """
+    temp_dir = pod.abs_path('{}tmp'.format(pod.PATH_CONTROL))
+    os.makedirs(temp_dir, exist_ok=True)
+    abs_path = pod.abs_path(pod_path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(content, bytes) else 'w') as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, abs_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,46 @@
+"""Test the shared cache file handling."""
+
+import os
+import unittest
+from grow import storage
+from grow.cache import cache_files
+from grow.pods import pods
+from grow.testing import testing
+
+
+class CacheFilesTestCase(unittest.TestCase):
+    """Tests for the cache files."""
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+
+    def test_is_racy(self):
+        """Recently modified files are racy."""
+        now = 100 * 10**9
+        self.assertTrue(cache_files.is_racy(now, now))
+        self.assertTrue(cache_files.is_racy(now - cache_files.RACY_NS + 1, now))
+        self.assertFalse(cache_files.is_racy(now - cache_files.RACY_NS, now))
+
+    def test_replace_file(self):
+        """Files are replaced without leaving temp files."""
+        pod_path = '{}cache/foo.json'.format(self.pod.PATH_CONTROL)
+        cache_files.replace_file(self.pod, pod_path, '{"foo": 1}')
+        self.assertEqual('{"foo": 1}', self.pod.read_file(pod_path))
+        cache_files.replace_file(self.pod, pod_path, b'bar')
+        self.assertEqual('bar', self.pod.read_file(pod_path))
+        temp_dir = self.pod.abs_path('{}tmp'.format(self.pod.PATH_CONTROL))
+        self.assertEqual([], os.listdir(temp_dir))
+
+    def test_replace_file_error(self):
+        """Temp files are removed when the file cannot be written."""
+        pod_path = '{}cache/foo.json'.format(self.pod.PATH_CONTROL)
+        with self.assertRaises(TypeError):
+            cache_files.replace_file(self.pod, pod_path, {'foo': 1})
+        temp_dir = self.pod.abs_path('{}tmp'.format(self.pod.PATH_CONTROL))
+        self.assertEqual([], os.listdir(temp_dir))
+        self.assertFalse(self.pod.file_exists(pod_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
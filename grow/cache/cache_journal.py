@@ -0,0 +1,139 @@
+"""
+Append-only journal for persisting pod caches.
+
+Instead of rewriting the whole cache file when the cache changes, only the
+changed keys are appended to the journal. The journal is compacted into a
+single snapshot when the appended changes grow larger than the snapshot.
+
+The journal is a sequence of pickled records following a header:
+
+    ('clear',)                  Remove all of the keys.
+    ('update', {key: value})    Set the keys, a `None` value removes the key.
+"""
+
+import os
+import pickle
+from grow.cache import cache_files
+
+
+JOURNAL_VERSION = 1
+
+# Compact once the appended records are larger than the snapshot by the ratio.
+COMPACT_RATIO = 1
+COMPACT_MIN_BYTES = 64 * 1024
+
+RECORD_CLEAR = 'clear'
+RECORD_UPDATE = 'update'
+
+
+class CacheJournal:
+    """Append-only journal of changes to a cache."""
+
+    def __init__(self, pod, file_name):
+        self._pod = pod
+        self.file_name = file_name
+        self._needs_compact = False
+
+    @property
+    def abs_path(self):
+        """Absolute path to the journal file."""
+        return self._pod.abs_path(self.file_name)
+
+    @property
+    def exists(self):
+        """Does the journal file exist?"""
+        return os.path.exists(self.abs_path)
+
+    @staticmethod
+    def _dump(record):
+        return pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _replay(data, record):
+        if record[0] == RECORD_CLEAR:
+            data.clear()
+        elif record[0] == RECORD_UPDATE:
+            for key, value in record[1].items():
+                if value is None:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+
+    def _read_header(self, journal_file):
+        try:
+            header = pickle.load(journal_file)
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if not isinstance(header, dict) or header.get('version') != JOURNAL_VERSION:
+            return None
+        return header
+
+    def _should_compact(self):
+        if self._needs_compact or not self.exists:
+            return True
+        try:
+            with open(self.abs_path, 'rb') as journal_file:
+                header = self._read_header(journal_file)
+        except IOError:
+            return True
+        if header is None:
+            return True
+        journal_size = os.path.getsize(self.abs_path)
+        snapshot_size = header.get('snapshot_size', 0)
+        return journal_size - snapshot_size > max(
+            COMPACT_MIN_BYTES, snapshot_size * COMPACT_RATIO)
+
+    def append(self, changes, cleared=False):
+        """Append the changed keys to the journal, compacting when needed."""
+        if self._should_compact():
+            data = {} if cleared else self.load()
+            self._replay(data, (RECORD_UPDATE, changes))
+            self.compact(data)
+            return
+        output = b''
+        if cleared:
+            output += self._dump((RECORD_CLEAR,))
+        output += self._dump((RECORD_UPDATE, changes))
+        with open(self.abs_path, 'ab') as journal_file:
+            journal_file.write(output)
+
+    def compact(self, data):
+        """Replace the journal with a snapshot of the data."""
+        snapshot = self._dump((RECORD_UPDATE, data))
+        header = self._dump({
+            'version': JOURNAL_VERSION,
+            'snapshot_size': len(snapshot),
+        })
+        cache_files.replace_file(self._pod, self.file_name, header + snapshot)
+        self._needs_compact = False
+
+    def load(self):
+        """Replay the journal into the current data.
+
+        An incomplete or corrupt record, such as from an interrupted write,
+        ends the replay and the journal is compacted on the next append.
+        """
+        data = {}
+        try:
+            journal_file = open(self.abs_path, 'rb')
+        except IOError:
+            return data
+        with journal_file:
+            if self._read_header(journal_file) is None:
+                self._needs_compact = True
+                return data
+            size = os.fstat(journal_file.fileno()).st_size
+            while True:
+                position = journal_file.tell()
+                try:
+                    record = pickle.load(journal_file)
+                except EOFError:
+                    # Truncated records also run out of input.
+                    if position != size:
+                        self._needs_compact = True
+                    break
+                except Exception:  # pylint: disable=broad-except
+                    self._needs_compact = True
+                    break
+                self._replay(data, record)
+        return data
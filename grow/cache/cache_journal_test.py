@@ -0,0 +1,65 @@
+"""Test the cache journal."""
+
+import os
+import unittest
+from grow import storage
+from grow.cache import cache_journal
+from grow.pods import pods
+from grow.testing import testing
+
+
+class CacheJournalTestCase(unittest.TestCase):
+    """Tests for the CacheJournal."""
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.journal = cache_journal.CacheJournal(self.pod, '/.grow/test.journal')
+
+    def test_append(self):
+        """Changes are appended to the journal."""
+        self.assertFalse(self.journal.exists)
+        self.assertEqual({}, self.journal.load())
+        self.journal.append({'/foo': ['/bar'], '/baz': ['/qux']})
+        self.assertTrue(self.journal.exists)
+        size = os.path.getsize(self.journal.abs_path)
+
+        self.journal.append({'/foo': ['/bar', '/baz'], '/baz': None})
+        self.assertGreater(os.path.getsize(self.journal.abs_path), size)
+        self.assertEqual({'/foo': ['/bar', '/baz']}, self.journal.load())
+
+        self.journal.append({'/new': ['/foo']}, cleared=True)
+        self.assertEqual({'/new': ['/foo']}, self.journal.load())
+
+    def test_compact(self):
+        """Journal is compacted when the changes outgrow the snapshot."""
+        self.journal.append({'/foo': 'a'})
+        for index in range(cache_journal.COMPACT_MIN_BYTES // 20):
+            self.journal.append({'/foo': str(index)})
+        self.assertLess(
+            os.path.getsize(self.journal.abs_path),
+            cache_journal.COMPACT_MIN_BYTES)
+        self.assertEqual({'/foo': str(index)}, self.journal.load())
+
+    def test_truncated(self):
+        """Incomplete records are ignored and the journal is compacted."""
+        self.journal.append({'/foo': 'a'})
+        self.journal.append({'/bar': 'b'})
+        with open(self.journal.abs_path, 'rb+') as journal_file:
+            journal_file.truncate(os.path.getsize(self.journal.abs_path) - 3)
+
+        journal = cache_journal.CacheJournal(self.pod, '/.grow/test.journal')
+        self.assertEqual({'/foo': 'a'}, journal.load())
+        journal.append({'/baz': 'c'})
+        self.assertEqual({'/foo': 'a', '/baz': 'c'}, journal.load())
+
+    def test_corrupt(self):
+        """Corrupt journals are replaced."""
+        self.pod.write_file('/.grow/test.journal', 'not a journal')
+        self.assertEqual({}, self.journal.load())
+        self.journal.append({'/foo': 'a'})
+        self.assertEqual({'/foo': 'a'}, self.journal.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Counters for measuring how well the caches are working."""
+
+
+class CacheStats:
+    """Usage counters for a cache."""
+
+    __slots__ = ('hits', 'misses', 'inserts', 'evictions', 'invalidations')
+
+    def __init__(self):
+        self.reset()
+
+    def evict(self, count=1):
+        """Entries removed to stay within the limits of the cache."""
+        self.evictions += count
+
+    def export(self, entries=None, size=None):
+        """Export the counters with the optional size of the cache."""
+        exported = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'inserts': self.inserts,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+        if entries is not None:
+            exported['entries'] = entries
+        if size is not None:
+            exported['bytes'] = size
+        return exported
+
+    def hit(self):
+        """Value found in the cache."""
+        self.hits += 1
+
+    def insert(self, count=1):
+        """Values added to the cache."""
+        self.inserts += count
+
+    def invalidate(self, count=1):
+        """Entries removed because they are no longer valid."""
+        self.invalidations += count
+
+    def lookup(self, found):
+        """Count a hit or miss, returns if found for convenience."""
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def merge(self, other):
+        """Add the counters from other stats."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def miss(self):
+        """Value not found in the cache."""
+        self.misses += 1
+
+    def reset(self):
+        """Reset all of the counters."""
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.invalidations = 0
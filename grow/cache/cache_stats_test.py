@@ -0,0 +1,54 @@
+"""Test the cache stats."""
+
+import unittest
+from grow.cache import cache_stats
+from grow.common import utils
+
+
+class CacheStatsTestCase(unittest.TestCase):
+    """Tests for the CacheStats."""
+
+    def test_counters(self):
+        """Counters are exported."""
+        stats = cache_stats.CacheStats()
+        self.assertTrue(stats.lookup(True))
+        self.assertFalse(stats.lookup(False))
+        stats.insert(2)
+        stats.evict()
+        stats.invalidate()
+        self.assertEqual({
+            'hits': 1,
+            'misses': 1,
+            'inserts': 2,
+            'evictions': 1,
+            'invalidations': 1,
+            'entries': 1,
+        }, stats.export(entries=1))
+
+        other = cache_stats.CacheStats()
+        other.merge(stats)
+        other.merge(stats)
+        self.assertEqual(2, other.hits)
+        other.reset()
+        self.assertEqual(0, other.inserts)
+
+    def test_memoize(self):
+        """Memoized functions count the cache usage."""
+
+        @utils.memoize
+        def _double(value):
+            return value * 2
+
+        _double(1)
+        _double(1)
+        _double([1])
+        self.assertEqual(1, _double.stats.hits)
+        self.assertEqual(2, _double.stats.misses)
+        self.assertEqual(1, _double.stats.inserts)
+        self.assertIn(
+            '{}.{}'.format(__name__, _double.func.__qualname__),
+            utils.memoize.export_stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
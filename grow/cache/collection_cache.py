@@ -1,37 +1,70 @@
 """Cache for storing and retrieving data specific to collections.
 
 Supports caching the collection and caching documents within those collections.
+
+Documents are indexed by the collection path, then the document pod path, then
+the locale, with a lookup of the collection for each document pod path. All
+changes are made while holding the lock and reads only use single lookups so
+the cache can be read from multiple threads.
 """
 
 import os
 import threading
+from grow.cache import cache_stats
 from grow.collections import collection
 
 
 class CollectionCache:
 
     def __init__(self):
-        self.reset()
         self._lock = threading.RLock()
+        self.stats = cache_stats.CacheStats()
+        self.reset()
 
     @staticmethod
-    def generate_cache_key(pod_path, locale):
-        return '{}::{}'.format(pod_path, locale)
+    def _locale_key(locale):
+        return str(locale)
+
+    def _remove_docs(self, collection_path, pod_path):
+        """Remove all locales of a document, needs to hold the lock."""
+        self._doc_collections.pop(pod_path, None)
+        entry = self._cache.get(collection_path)
+        if entry is not None and entry['docs'].pop(pod_path, None):
+            self.stats.invalidate()
+
+    def _remove_collection(self, collection_path):
+        """Remove a collection and its documents, needs to hold the lock."""
+        entry = self._cache.pop(collection_path, None)
+        if entry is None:
+            return
+        self.stats.invalidate()
+        for pod_path in entry['docs']:
+            if self._doc_collections.get(pod_path) == collection_path:
+                del self._doc_collections[pod_path]
+
+    def _set_document(self, col, pod_path, locale, doc):
+        with self._lock:
+            self.ensure_collection(col)
+            docs = self._cache[col.collection_path]['docs']
+            if pod_path not in docs:
+                docs[pod_path] = {}
+            docs[pod_path][self._locale_key(locale)] = doc
+            self._doc_collections[pod_path] = col.collection_path
+            self.stats.insert()
 
     def add_collection(self, col):
-        self._cache[col.collection_path] = {
-            'collection': col,
-            'docs': {},
-        }
+        with self._lock:
+            self._remove_collection(col.collection_path)
+            self._cache[col.collection_path] = {
+                'collection': col,
+                'docs': {},
+            }
+            self.stats.insert()
 
     def add_document(self, doc):
-        col = doc.collection
-        self.ensure_collection(col)
         # NOTE: Using `doc.locale` causes infinite loop since it needs to load
         # the fields (which can have circular dependencies).
-        cache_key = CollectionCache.generate_cache_key(
-            doc.pod_path, doc.locale_safe)
-        self._cache[col.collection_path]['docs'][cache_key] = doc
+        self._set_document(doc.collection, doc.pod_path, doc.locale_safe, doc)
 
     def add_document_locale(self, doc, locale):
         """Force a doc to be saved to a specific locale.
@@ -41,79 +74,49 @@ class CollectionCache:
         This allows for the None locale to be forced to the default locale from the
         doc.
         """
-        col = doc.collection
-        self.ensure_collection(col)
-        cache_key = CollectionCache.generate_cache_key(
-            doc.pod_path, locale)
-        self._cache[col.collection_path]['docs'][cache_key] = doc
+        self._set_document(doc.collection, doc.pod_path, locale, doc)
 
     def remove_by_path(self, path):
         """Removes the collection or document based on the path."""
-        if path.startswith(collection.Collection.CONTENT_PATH):
+        if not path.startswith(collection.Collection.CONTENT_PATH):
+            return
+        with self._lock:
             if path.endswith(
                     '/{}'.format(collection.Collection.BLUEPRINT_PATH)):
                 # If this is a blueprint then remove the entire collection.
                 col_path = path[len(collection.Collection.CONTENT_PATH):]
                 # Get just the directory.
                 col_path = os.path.split(col_path)[0]
-                collection_path = col_path[1:]  # Remove /
-                with self._lock:
-                    if collection_path in self._cache:
-                        del self._cache[collection_path]
+                self._remove_collection(col_path[1:])  # Remove /
             else:
-                # Search for an existing collection path.
-                col_path = path[len(collection.Collection.CONTENT_PATH):]
-                col_path = os.path.split(col_path)[0]
-                while col_path != os.sep:
-                    collection_path = col_path[1:]
-                    with self._lock:
-                        if collection_path in self._cache:
-                            # Do a 'wildcard' match on the path to remove all
-                            # locales.
-                            generic_key = CollectionCache.generate_cache_key(
-                                path, '')
-                            for key in self._cache[collection_path]['docs'].keys():
-                                if key.startswith(generic_key):
-                                    del self._cache[
-                                        collection_path]['docs'][key]
-                                    return
-                    col_path = os.path.split(col_path)[0]
+                collection_path = self._doc_collections.get(path)
+                if collection_path is not None:
+                    self._remove_docs(collection_path, path)
 
     def remove_collection(self, col):
         with self._lock:
-            if col.collection_path in self._cache:
-                del self._cache[col.collection_path]
+            self._remove_collection(col.collection_path)
 
     def remove_document(self, doc):
-        col = doc.collection
-        with self._lock:
-            if col.collection_path in self._cache:
-                cache_key = CollectionCache.generate_cache_key(
-                    doc.pod_path, doc.locale_safe)
-                if cache_key in self._cache[col.collection_path]['docs']:
-                    del self._cache[col.collection_path]['docs'][cache_key]
+        self.remove_document_locale(doc, doc.locale_safe)
 
     def remove_document_locale(self, doc, locale):
         col = doc.collection
         with self._lock:
-            if col.collection_path in self._cache:
-                cache_key = CollectionCache.generate_cache_key(
-                    doc.pod_path, locale)
-                if cache_key in self._cache[col.collection_path]['docs']:
-                    del self._cache[col.collection_path]['docs'][cache_key]
+            entry = self._cache.get(col.collection_path)
+            if entry is None:
+                return
+            locales = entry['docs'].get(doc.pod_path)
+            if locales is None:
+                return
+            if locales.pop(self._locale_key(locale), None) is not None:
+                self.stats.invalidate()
+            if not locales:
+                self._remove_docs(col.collection_path, doc.pod_path)
 
     def remove_document_locales(self, doc):
-        col = doc.collection
         with self._lock:
-            if col.collection_path in self._cache:
-                doc_cache_key = CollectionCache.generate_cache_key(
-                    doc.pod_path, '')
-                invalid_keys = []
-                for cache_key in self._cache[col.collection_path]['docs'].keys():
-                    if cache_key.startswith(doc_cache_key):
-                        invalid_keys.append(cache_key)
-                for cache_key in invalid_keys:
-                    del self._cache[col.collection_path]['docs'][cache_key]
+            self._remove_docs(doc.collection.collection_path, doc.pod_path)
 
     def ensure_collection(self, col):
         with self._lock:
@@ -123,16 +126,29 @@ class CollectionCache:
     def get_collection(self, collection_path):
         collection_path = collection.Collection.clean_collection_path(
             collection_path)
-        if collection_path in self._cache:
-            return self._cache[collection_path]['collection']
+        entry = self._cache.get(collection_path)
+        if self.stats.lookup(entry is not None):
+            return entry['collection']
         return None
 
     def get_document(self, col, pod_path, locale):
-        if col.collection_path in self._cache:
-            cache_key = CollectionCache.generate_cache_key(pod_path, locale)
-            return self._cache[col.collection_path]['docs'].get(
-                cache_key, None)
-        return None
+        doc = None
+        entry = self._cache.get(col.collection_path)
+        if entry is not None:
+            locales = entry['docs'].get(pod_path)
+            if locales is not None:
+                doc = locales.get(self._locale_key(locale), None)
+        self.stats.lookup(doc is not None)
+        return doc
+
+    def export_stats(self):
+        """Usage statistics for the cache."""
+        return self.stats.export(entries=sum(
+            len(entry['docs']) for entry in list(self._cache.values())))
 
     def reset(self):
-        self._cache = {}
+        with self._lock:
+            if getattr(self, '_cache', None):
+                self.stats.invalidate(len(self._cache))
+            self._cache = {}
+            self._doc_collections = {}
@@ -46,6 +46,45 @@ class DocumentCacheTestCase(unittest.TestCase):
         col_cache.remove_by_path('/content/pages/_blueprint.yaml')
         self.assertEqual(None, col_cache.get_collection('pages'))
 
+    def test_remove_by_path_locales(self):
+        col_cache = collection_cache.CollectionCache()
+        doc = self.pod.get_doc('/content/pages/intro.md')
+        doc_it = self.pod.get_doc('/content/pages/intro.md', 'it')
+        col = doc.collection
+        col_cache.add_document(doc)
+        col_cache.add_document(doc_it)
+
+        # Unknown documents are ignored.
+        col_cache.remove_by_path('/content/pages/other.md')
+        self.assertEqual(doc_it, col_cache.get_document(
+            col, '/content/pages/intro.md', 'it'))
+
+        # Deleting a document's path removes all of the locales.
+        col_cache.remove_by_path('/content/pages/intro.md')
+        self.assertEqual(None, col_cache.get_document(
+            col, '/content/pages/intro.md', doc.locale_safe))
+        self.assertEqual(None, col_cache.get_document(
+            col, '/content/pages/intro.md', 'it'))
+
+    def test_remove_document_locale(self):
+        col_cache = collection_cache.CollectionCache()
+        doc = self.pod.get_doc('/content/pages/intro.md')
+        doc_it = self.pod.get_doc('/content/pages/intro.md', 'it')
+        col = doc.collection
+        col_cache.add_document(doc)
+        col_cache.add_document_locale(doc_it, 'it')
+        col_cache.remove_document_locale(doc_it, 'it')
+        self.assertEqual(None, col_cache.get_document(
+            col, '/content/pages/intro.md', 'it'))
+        self.assertEqual(doc, col_cache.get_document(
+            col, '/content/pages/intro.md', doc.locale_safe))
+
+        # Re-adding after removing the collection.
+        col_cache.remove_collection(col)
+        col_cache.add_document(doc)
+        self.assertEqual(doc, col_cache.get_document(
+            col, '/content/pages/intro.md', doc.locale_safe))
+
     def test_remove_collection(self):
         col_cache = collection_cache.CollectionCache()
         doc = self.pod.get_doc('/content/pages/intro.md')
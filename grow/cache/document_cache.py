@@ -7,9 +7,13 @@ The contents of the cache should be raw and not internationalized as it will
 be shared between locales with the same pod_path.
 """
 
+from grow.cache import cache_stats
+
+
 class DocumentCache:
 
     def __init__(self):
+        self.stats = cache_stats.CacheStats()
         self.reset()
 
     def _ensure_exists(self, doc, value=None):
@@ -19,31 +23,47 @@ class DocumentCache:
 
     def add(self, doc, value):
         self._cache[doc.pod_path] = value
+        self.stats.insert()
 
     def add_all(self, path_to_cached):
         for path, value in path_to_cached.items():
             self._cache[path] = value
+        self.stats.insert(len(path_to_cached))
 
     def add_property(self, doc, prop, value):
         path = self._ensure_exists(doc)
         self._cache[path][prop] = value
+        self.stats.insert()
 
     def remove(self, doc):
         return self.remove_by_path(doc.pod_path)
 
     def remove_by_path(self, path):
-        return self._cache.pop(path, None)
+        value = self._cache.pop(path, None)
+        if value is not None:
+            self.stats.invalidate()
+        return value
 
     def export(self):
         return self._cache
 
+    def export_stats(self):
+        """Usage statistics for the cache."""
+        return self.stats.export(entries=len(self._cache))
+
     def get(self, doc):
-        return self._cache.get(doc.pod_path, None)
+        value = self._cache.get(doc.pod_path, None)
+        self.stats.lookup(value is not None)
+        return value
 
     def get_property(self, doc, prop):
+        value = None
         if doc.pod_path in self._cache:
-            return self._cache[doc.pod_path].get(prop, None)
-        return None
+            value = self._cache[doc.pod_path].get(prop, None)
+        self.stats.lookup(value is not None)
+        return value
 
     def reset(self):
+        if getattr(self, '_cache', None):
+            self.stats.invalidate(len(self._cache))
         self._cache = {}
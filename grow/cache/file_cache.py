@@ -4,10 +4,14 @@ Cache for storing and retrieving file content at a pod_path.
 The contents of the cache can be parsed and are stored based on locale.
 """
 
+from grow.cache import cache_stats
+
+
 class FileCache:
     """Simple cache for file contents."""
 
     def __init__(self):
+        self.stats = cache_stats.CacheStats()
         self.reset()
 
     def _ensure_exists(self, pod_path, value=None):
@@ -19,26 +23,39 @@ class FileCache:
         """Add a value to the cache by pod_path."""
         container = self._ensure_exists(pod_path)
         container[locale] = value
+        self.stats.insert()
 
     def add_all(self, pod_path_to_cached, locale=None):
         """Add a multiple values to the cache by pod_paths."""
         for pod_path, value in pod_path_to_cached.items():
             container = self._ensure_exists(pod_path)
             container[locale] = value
+        self.stats.insert(len(pod_path_to_cached))
 
     def remove(self, pod_path):
         """Remove a value from the cache by pod_path."""
-        return self._cache.pop(pod_path, None)
+        value = self._cache.pop(pod_path, None)
+        if value:
+            self.stats.invalidate()
+        return value
 
     def export(self):
         """Exports all the file cache data."""
         return self._cache
 
+    def export_stats(self):
+        """Usage statistics for the cache."""
+        return self.stats.export(entries=len(self._cache))
+
     def get(self, pod_path, locale=None):
         """Retrieve a cache value by pod_path or None."""
         container = self._ensure_exists(pod_path)
-        return container.get(locale, None)
+        value = container.get(locale, None)
+        self.stats.lookup(value is not None)
+        return value
 
     def reset(self):
         """Resets the internal cache reference."""
+        if getattr(self, '_cache', None):
+            self.stats.invalidate(len(self._cache))
         self._cache = {}
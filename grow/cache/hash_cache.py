@@ -0,0 +1,156 @@
+"""
+Cache for the content hashes of pod files.
+
+The hashes are keyed by the device, inode, size and modified time of the file
+so unchanged files are not read and hashed again. The cache is persisted in
+the pod control directory to be used by later runs.
+"""
+
+import json
+from multiprocessing.dummy import Pool as ThreadPool
+from grow.cache import cache_files
+
+
+FILE_HASH_CACHE = 'hashcache.json'
+CACHE_VERSION = 1
+
+
+class HashCache:
+    """Cache of file hashes keyed by the file stat."""
+
+    HASH_THREADS = 8
+
+    def __init__(self, pod):
+        self._pod = pod
+        self._cache = None
+        self._is_dirty = False
+
+    @property
+    def file_name(self):
+        """Pod path for the cache file."""
+        return '{}{}'.format(self._pod.PATH_CONTROL, FILE_HASH_CACHE)
+
+    @property
+    def is_dirty(self):
+        """Has the cache been modified?"""
+        return self._is_dirty
+
+    @property
+    def _hashes(self):
+        if self._cache is None:
+            self._cache = self._load()
+        return self._cache
+
+    def _load(self):
+        try:
+            data = self._pod.read_json(self.file_name)
+        except Exception:  # pylint: disable=broad-except
+            # Missing or corrupt cache file.
+            return {}
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return {}
+        return data.get('hashes', {})
+
+    @staticmethod
+    def _key(stat):
+        return [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def _stat(self, pod_path, stat=None):
+        """Stat of the file, using a known stat when it has the inode."""
+        if stat is not None and stat.st_ino:
+            return stat
+        try:
+            return self._pod.file_stat(pod_path)
+        except (IOError, OSError):
+            return None
+
+    def _hash(self, pod_path, stat=None):
+        """Hash the file and cache the hash when the file is not changing."""
+        abs_path = self._pod.abs_path(pod_path)
+        stat = self._stat(pod_path, stat)
+        hashed = self._pod.storage.hash(abs_path)
+        # Recently modified files could change without changing the stat.
+        if stat is not None and not cache_files.is_racy(stat.st_mtime_ns):
+            self._hashes[pod_path] = self._key(stat) + [hashed]
+            self._is_dirty = True
+        return hashed
+
+    def _hash_missing(self, pod_path, stat=None):
+        """Hash a file, errors are raised later when the hash is needed."""
+        try:
+            return self._hash(pod_path, stat)
+        except (IOError, OSError):
+            return None
+
+    def _cached(self, pod_path, stat=None):
+        """Cached hash for a file or None when the file changed."""
+        entry = self._hashes.get(pod_path)
+        if entry is None:
+            return None
+        stat = self._stat(pod_path, stat)
+        if stat is None:
+            return None
+        if entry[:4] != self._key(stat):
+            return None
+        return entry[4]
+
+    def get_hash(self, pod_path):
+        """Hash of the file contents."""
+        hashed = self._cached(pod_path)
+        if hashed is None:
+            hashed = self._hash(pod_path)
+        return hashed
+
+    def get_hashes(self, pod_paths, stats=None):
+        """Hashes of the contents for multiple files.
+
+        The files that are not cached are hashed using a thread pool. Files
+        that cannot be hashed have a `None` hash. Stats of the files that are
+        already known, such as from scanning the directories, can be given
+        as a dict of the pod path to the stat.
+        """
+        stats = stats or {}
+        hashes = {}
+        missing = []
+        for pod_path in pod_paths:
+            if pod_path in hashes:
+                continue
+            hashed = self._cached(pod_path, stats.get(pod_path))
+            if hashed is None:
+                missing.append(pod_path)
+            hashes[pod_path] = hashed
+        missing = list(set(missing))
+
+        def _hash_missing(pod_path):
+            return self._hash_missing(pod_path, stats.get(pod_path))
+
+        if len(missing) > 1:
+            thread_pool = ThreadPool(min(self.HASH_THREADS, len(missing)))
+            try:
+                for pod_path, hashed in zip(
+                        missing, thread_pool.map(_hash_missing, missing)):
+                    hashes[pod_path] = hashed
+            finally:
+                thread_pool.close()
+                thread_pool.join()
+        elif missing:
+            hashes[missing[0]] = _hash_missing(missing[0])
+        return hashes
+
+    def mark_clean(self):
+        """Mark that the cache has been written."""
+        self._is_dirty = False
+
+    def reset(self):
+        """Remove all of the cached hashes."""
+        self._cache = {}
+        self._is_dirty = True
+
+    def write(self):
+        """Write the cache file, without the files that no longer exist."""
+        hashes = {
+            pod_path: entry for pod_path, entry in self._hashes.items()
+            if self._pod.file_exists(pod_path)}
+        cache_files.replace_file(self._pod, self.file_name, json.dumps(
+            {'version': CACHE_VERSION, 'hashes': hashes}))
+        self.mark_clean()
@@ -0,0 +1,98 @@
+"""Test the hash cache."""
+
+import hashlib
+import unittest
+import mock
+from grow import storage
+from grow.cache import hash_cache
+from grow.pods import pods
+from grow.testing import testing
+
+
+class HashCacheTestCase(unittest.TestCase):
+    """Tests for the HashCache."""
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.cache = hash_cache.HashCache(self.pod)
+
+    @staticmethod
+    def _sha(content):
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def test_get_hash(self):
+        """Unchanged files are not hashed again."""
+        testing.write_old_file(self.pod, '/static/cached.txt', 'foo')
+        self.assertEqual(self._sha('foo'), self.cache.get_hash('/static/cached.txt'))
+        with mock.patch.object(self.pod.storage, 'hash') as mock_hash:
+            self.assertEqual(
+                self._sha('foo'), self.cache.get_hash('/static/cached.txt'))
+            mock_hash.assert_not_called()
+
+        testing.write_old_file(self.pod, '/static/cached.txt', 'bar')
+        self.assertEqual(self._sha('bar'), self.cache.get_hash('/static/cached.txt'))
+
+    def test_recently_modified(self):
+        """Recently modified files are always hashed."""
+        self.pod.write_file('/static/recent.txt', 'foo')
+        self.cache.get_hash('/static/recent.txt')
+        self.assertFalse(self.cache.is_dirty)
+        with mock.patch.object(
+                self.pod.storage, 'hash', return_value='hashed') as mock_hash:
+            self.assertEqual('hashed', self.cache.get_hash('/static/recent.txt'))
+            mock_hash.assert_called_once()
+
+    def test_get_hashes(self):
+        """Multiple files are hashed at once."""
+        paths = []
+        for index in range(5):
+            pod_path = '/static/file-{}.txt'.format(index)
+            testing.write_old_file(self.pod, pod_path, str(index))
+            paths.append(pod_path)
+        hashes = self.cache.get_hashes(paths + ['/static/missing.txt'])
+        for index, pod_path in enumerate(paths):
+            self.assertEqual(self._sha(str(index)), hashes[pod_path])
+        self.assertIsNone(hashes['/static/missing.txt'])
+
+    def test_get_hashes_stats(self):
+        """Known stats are used instead of another stat of the files."""
+        testing.write_old_file(self.pod, '/static/cached.txt', 'foo')
+        self.cache.get_hash('/static/cached.txt')
+        stats = {
+            '/static/cached.txt': self.pod.file_stat('/static/cached.txt'),
+        }
+        with mock.patch.object(self.pod, 'file_stat') as mock_stat:
+            hashes = self.cache.get_hashes(['/static/cached.txt'], stats=stats)
+            mock_stat.assert_not_called()
+        self.assertEqual(self._sha('foo'), hashes['/static/cached.txt'])
+
+    def test_write(self):
+        """Hashes are persisted for the next run."""
+        testing.write_old_file(self.pod, '/static/cached.txt', 'foo')
+        testing.write_old_file(self.pod, '/static/removed.txt', 'foo')
+        self.cache.get_hashes(['/static/cached.txt', '/static/removed.txt'])
+        self.assertTrue(self.cache.is_dirty)
+        self.pod.delete_file('/static/removed.txt')
+        self.cache.write()
+        self.assertFalse(self.cache.is_dirty)
+
+        cache = hash_cache.HashCache(self.pod)
+        with mock.patch.object(self.pod.storage, 'hash') as mock_hash:
+            self.assertEqual(self._sha('foo'), cache.get_hash('/static/cached.txt'))
+            mock_hash.assert_not_called()
+        # pylint: disable=protected-access
+        self.assertNotIn('/static/removed.txt', cache._hashes)
+
+    def test_pod_hash_file(self):
+        """Pod uses the hash cache."""
+        testing.write_old_file(self.pod, '/static/cached.txt', 'foo')
+        self.assertEqual(self._sha('foo'), self.pod.hash_file('static/cached.txt'))
+        self.assertEqual(
+            {'/static/cached.txt': self._sha('foo')},
+            self.pod.hash_files(['/static/cached.txt']))
+        self.assertTrue(self.pod.podcache.hash_cache.is_dirty)
+
+
+if __name__ == '__main__':
+    unittest.main()
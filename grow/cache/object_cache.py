@@ -5,9 +5,18 @@ Supports arbitrary data based on a cache key.
 
 The contents of the cache should be raw and not internationalized as it will
 be shared between locales.
+
+Caches can be limited by the number of entries or the approximate size of the
+serialized values, with the least recently used entries evicted first. Entries
+can also expire after a time to live.
 """
 
+import json
 import re
+import time
+from collections import OrderedDict
+from grow.cache import cache_stats
+from grow.common import json_encoder
 
 
 FILE_OBJECT_CACHE = 'objectcache.json'
@@ -18,18 +27,68 @@ class ObjectCache:
     """Object cache for caching arbitrary data in a pod."""
 
     def __contains__(self, key):
-        return key in self._cache
+        return key in self._cache and not self._expire(key)
 
-    def __init__(self):
-        self._cache = {}
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, timestamps=None):
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._timestamps = {}
         self._is_dirty = False
+        self._bytes = 0
+        self.stats = cache_stats.CacheStats()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
         self.reset()
+        self._loaded_timestamps = timestamps or {}
+
+    @staticmethod
+    def _size(value):
+        """Approximate size of the value when written to the cache file."""
+        try:
+            return len(json.dumps(value, cls=json_encoder.GrowJSONEncoder))
+        except (TypeError, ValueError):
+            return len(repr(value))
+
+    def _evict(self):
+        """Remove the least recently used entries until within the limits."""
+        while self._cache and (
+                (self.max_entries is not None and len(self._cache) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            key = next(iter(self._cache))
+            self._pop(key)
+            self.stats.evict()
+
+    def _expire(self, key):
+        """Remove the entry if it has expired."""
+        if self.ttl is None:
+            return False
+        if time.time() - self._timestamps.get(key, 0) < self.ttl:
+            return False
+        self._pop(key)
+        self.stats.evict()
+        return True
+
+    def _pop(self, key):
+        self._bytes -= self._sizes.pop(key, 0)
+        self._timestamps.pop(key, None)
+        self._is_dirty = True
+        return self._cache.pop(key, None)
 
     def add(self, key, value):
         """Add a new item to the cache or overwrite an existing value."""
-        if not self._is_dirty and (key not in self._cache or self._cache[key] != value):
+        if key not in self._cache or self._cache[key] != value:
             self._is_dirty = True
+            self.stats.insert()
         self._cache[key] = value
+        self._cache.move_to_end(key)
+        if self.ttl is not None:
+            self._timestamps[key] = self._loaded_timestamps.pop(key, None) or time.time()
+        if self.max_bytes is not None:
+            self._bytes -= self._sizes.get(key, 0)
+            self._sizes[key] = self._size(value)
+            self._bytes += self._sizes[key]
+        self._evict()
 
     def add_all(self, key_to_cached):
         """Update the cache with a preexisting set of data."""
@@ -38,11 +97,29 @@ class ObjectCache:
 
     def export(self):
         """Returns the raw cache data."""
+        if self.ttl is not None:
+            for key in list(self._cache.keys()):
+                self._expire(key)
         return self._cache
 
+    def export_timestamps(self):
+        """Returns when the cache entries were added, for expiring entries."""
+        return dict(self._timestamps)
+
     def get(self, key):
         """Retrieve the value from the cache."""
-        return self._cache.get(key, None)
+        if not self.stats.lookup(key in self._cache and not self._expire(key)):
+            return None
+        self._cache.move_to_end(key)
+        return self._cache[key]
+
+    def load(self, key_to_cached):
+        """Load previously written data without marking the cache as dirty."""
+        is_dirty = self._is_dirty
+        evictions = self.stats.evictions
+        self.add_all(key_to_cached)
+        if not is_dirty and evictions == self.stats.evictions:
+            self.mark_clean()
 
     @property
     def is_dirty(self):
@@ -56,11 +133,17 @@ class ObjectCache:
     def remove(self, key):
         """Removes a single element from the cache."""
         self._is_dirty = True
-        return self._cache.pop(key, None)
+        if key in self._cache:
+            self.stats.invalidate()
+        return self._pop(key)
 
     def reset(self):
         """Reset the internal cache object."""
-        self._cache = {}
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._timestamps = {}
+        self._loaded_timestamps = {}
+        self._bytes = 0
         self._is_dirty = False
 
     def search(self, pattern):
@@ -70,8 +153,31 @@ class ObjectCache:
 
         results = {}
 
-        for key, value in self._cache.items():
+        for key, value in self.export().items():
             if pattern.search(key) is not None:
                 results[key] = value
 
         return results
+
+    def set_limits(self, max_entries=None, max_bytes=None, ttl=None):
+        """Change the limits of the cache, evicting entries over the limits."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if self.ttl is not None:
+            now = time.time()
+            for key in self._cache:
+                self._timestamps.setdefault(key, now)
+        if max_bytes is not None and self.max_bytes is None:
+            self._sizes = {
+                key: self._size(value) for key, value in self._cache.items()}
+            self._bytes = sum(self._sizes.values())
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def export_stats(self):
+        """Usage statistics for the cache."""
+        if self.max_bytes is None:
+            size = sum(self._size(value) for value in self._cache.values())
+        else:
+            size = self._bytes
+        return self.stats.export(entries=len(self._cache), size=size)
@@ -2,6 +2,7 @@
 
 import re
 import unittest
+import mock
 from grow.pods import pods
 from grow import storage
 from grow.testing import testing
@@ -117,6 +118,88 @@ class ObjectCacheTestCase(unittest.TestCase):
             'question': '???',
         }, self.obj_cache.search(r'^quest'))
 
+    def test_is_dirty(self):
+        """Only changed values make the cache dirty."""
+        self.obj_cache.add('answer', 42)
+        self.assertTrue(self.obj_cache.is_dirty)
+        self.obj_cache.mark_clean()
+        self.obj_cache.add('answer', 42)
+        self.assertFalse(self.obj_cache.is_dirty)
+        self.obj_cache.add('question', '!!!')
+        self.assertTrue(self.obj_cache.is_dirty)
+
+    def test_load(self):
+        """Loading existing data does not make dirty."""
+        self.obj_cache.load({'answer': 42})
+        self.assertEqual(42, self.obj_cache.get('answer'))
+        self.assertFalse(self.obj_cache.is_dirty)
+
+        # Evicting loaded data makes dirty.
+        obj_cache = object_cache.ObjectCache(max_entries=1)
+        obj_cache.load({'answer': 42, 'question': '???'})
+        self.assertTrue(obj_cache.is_dirty)
+
+    def test_max_entries(self):
+        """Least recently used entries are evicted."""
+        obj_cache = object_cache.ObjectCache(max_entries=2)
+        obj_cache.add('answer', 42)
+        obj_cache.add('question', '???')
+        obj_cache.get('answer')
+        obj_cache.add('quest', 'to follow that star')
+        self.assertEqual(
+            {'answer': 42, 'quest': 'to follow that star'}, obj_cache.export())
+        self.assertEqual(1, obj_cache.export_stats()['evictions'])
+
+    def test_max_bytes(self):
+        """Entries are evicted when over the size limit."""
+        obj_cache = object_cache.ObjectCache(max_bytes=20)
+        obj_cache.add('first', 'a' * 10)
+        obj_cache.add('second', 'b' * 10)
+        self.assertNotIn('first', obj_cache)
+        self.assertEqual(12, obj_cache.export_stats()['bytes'])
+        obj_cache.add('large', 'c' * 30)
+        self.assertEqual({}, obj_cache.export())
+
+    def test_set_limits(self):
+        """Lowering the limits evicts entries."""
+        self.obj_cache.add('answer', 42)
+        self.obj_cache.add('question', '???')
+        self.obj_cache.set_limits(max_bytes=5)
+        self.assertEqual({'question': '???'}, self.obj_cache.export())
+
+    @mock.patch('time.time')
+    def test_ttl(self, mock_time):
+        """Entries expire after the time to live."""
+        mock_time.return_value = 100
+        obj_cache = object_cache.ObjectCache(ttl=10)
+        obj_cache.add('answer', 42)
+        mock_time.return_value = 105
+        self.assertEqual(42, obj_cache.get('answer'))
+        mock_time.return_value = 110
+        self.assertEqual(None, obj_cache.get('answer'))
+        self.assertNotIn('answer', obj_cache)
+
+        # Timestamps are kept when loading from a file.
+        obj_cache = object_cache.ObjectCache(ttl=10, timestamps={'answer': 95})
+        obj_cache.load({'answer': 42, 'question': '???'})
+        self.assertEqual({'question': '???'}, obj_cache.export())
+
+    def test_stats(self):
+        """Usage statistics for the cache."""
+        self.obj_cache.add('answer', 42)
+        self.obj_cache.get('answer')
+        self.obj_cache.get('question')
+        self.obj_cache.remove('answer')
+        self.assertEqual({
+            'entries': 0,
+            'bytes': 0,
+            'hits': 1,
+            'misses': 1,
+            'inserts': 1,
+            'evictions': 0,
+            'invalidations': 1,
+        }, self.obj_cache.export_stats())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,19 +1,25 @@
 """Caching for pod meta information."""
 
 import json
-import os
-import tempfile
+from grow.cache import cache_files
+from grow.cache import cache_journal
+from grow.cache import cache_stats
 from grow.cache import collection_cache
 from grow.cache import document_cache
 from grow.cache import file_cache
+from grow.cache import hash_cache as grow_hash_cache
 from grow.cache import object_cache
 from grow.cache import routes_cache as grow_routes_cache
+from grow.cache import yaml_cache as grow_yaml_cache
 from grow.common import json_encoder
+from grow.common import utils
 from grow.pods import dependency
 
 
 FILE_OBJECT_CACHE = object_cache.FILE_OBJECT_CACHE
 FILE_ROUTES_CACHE = grow_routes_cache.FILE_ROUTES_CACHE
+FILE_ROUTES_JOURNAL = grow_routes_cache.FILE_ROUTES_JOURNAL
+FILE_DEP_JOURNAL = 'depcache.journal'
 
 
 class Error(Exception):
@@ -33,9 +39,13 @@ class PodCache:
     """Caching container for the pod."""
 
     KEY_GLOBAL = '__global__'
+    OBJECT_CACHE_LIMITS = ('max_entries', 'max_bytes', 'ttl')
 
-    def __init__(self, dep_cache, obj_cache, routes_cache, pod):
+    def __init__(self, dep_cache, obj_cache, routes_cache, pod,
+                 dep_journal=None, routes_journal=None):
         self._pod = pod
+        self._dep_journal = dep_journal
+        self._routes_journal = routes_journal
 
         self._collection_cache = collection_cache.CollectionCache()
         self._document_cache = document_cache.DocumentCache()
@@ -43,6 +53,7 @@ class PodCache:
 
         self._dependency_graph = dependency.DependencyGraph()
         self._dependency_graph.add_all(dep_cache)
+        self._dependency_graph.mark_clean()
 
         self._object_caches = {}
         self.create_object_cache(
@@ -60,6 +71,11 @@ class PodCache:
 
         self._routes_cache = grow_routes_cache.RoutesCache()
         self._routes_cache.from_data(routes_cache)
+        self._routes_cache.mark_clean()
+
+        self._hash_cache = grow_hash_cache.HashCache(pod)
+        self._yaml_cache = grow_yaml_cache.YamlCache(pod)
+        self._template_stats = cache_stats.CacheStats()
 
     @property
     def collection_cache(self):
@@ -71,6 +87,14 @@ class PodCache:
         """Dependency graph from rendered docs."""
         return self._dependency_graph
 
+    @property
+    def dep_journal(self):
+        """Journal for persisting the dependency graph."""
+        if self._dep_journal is None:
+            self._dep_journal = cache_journal.CacheJournal(
+                self._pod, '{}{}'.format(self._pod.PATH_CONTROL, FILE_DEP_JOURNAL))
+        return self._dep_journal
+
     @property
     def document_cache(self):
         """Cache for specific document properties."""
@@ -81,6 +105,11 @@ class PodCache:
         """Cache for raw file contents."""
         return self._file_cache
 
+    @property
+    def hash_cache(self):
+        """Persistent cache for file hashes."""
+        return self._hash_cache
+
     @property
     def is_dirty(self):
         """Have the contents of the dependency graph or caches been modified?"""
@@ -91,6 +120,10 @@ class PodCache:
                 return True
         if self.routes_cache.is_dirty:
             return True
+        if self.hash_cache.is_dirty:
+            return True
+        if self.yaml_cache.is_dirty:
+            return True
         return False
 
     @property
@@ -103,34 +136,49 @@ class PodCache:
         """Global routes cache."""
         return self._routes_cache
 
+    @property
+    def routes_journal(self):
+        """Journal for persisting the routes cache."""
+        if self._routes_journal is None:
+            self._routes_journal = cache_journal.CacheJournal(
+                self._pod, '{}{}'.format(self._pod.PATH_CONTROL, FILE_ROUTES_JOURNAL))
+        return self._routes_journal
+
+    @property
+    def template_stats(self):
+        """Usage statistics for the jinja template caches."""
+        return self._template_stats
+
+    @property
+    def yaml_cache(self):
+        """Persistent cache for parsed yaml."""
+        return self._yaml_cache
+
     def _write_json(self, path, obj):
         output = json.dumps(
             obj, cls=json_encoder.GrowJSONEncoder,
             sort_keys=True, indent=2, separators=(',', ': '))
-        temp_dir = self._pod.abs_path('/.grow/tmp')
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
-        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
-        with os.fdopen(fd, 'w') as fp:
-            fp.write(output)
-        real_path = self._pod.abs_path(path)
-        dir_name = os.path.dirname(real_path)
-        if not os.path.exists(dir_name):
-            os.makedirs(dir_name)
-        os.rename(temp_path, real_path)
+        cache_files.replace_file(self._pod, path, output)
 
     def create_object_cache(self, key, write_to_file=False, can_reset=False, values=None,
-                            separate_file=False):
-        """Create a named object cache."""
+                            separate_file=False, max_entries=None, max_bytes=None,
+                            ttl=None, timestamps=None):
+        """Create a named object cache.
+
+        The cache can be limited to a number of entries, an approximate size
+        in bytes or a time to live in seconds for the entries.
+        """
         self._object_caches[key] = {
-            'cache': object_cache.ObjectCache(),
+            'cache': object_cache.ObjectCache(
+                max_entries=max_entries, max_bytes=max_bytes, ttl=ttl,
+                timestamps=timestamps),
             'write_to_file': write_to_file,
             'can_reset': can_reset,
             'separate_file': separate_file,
         }
         cache = self._object_caches[key]['cache']
         if values:
-            cache.add_all(values)
+            cache.load(values)
         return cache
 
     def get_object_cache(self, key, **kwargs):
@@ -141,7 +189,31 @@ class PodCache:
         if 'separate_file' in kwargs:
             if existing_meta['separate_file'] != kwargs['separate_file']:
                 existing_meta['separate_file'] = kwargs['separate_file']
-        return existing_meta['cache']
+        limits = [kwargs.get(name) for name in self.OBJECT_CACHE_LIMITS]
+        cache = existing_meta['cache']
+        if any(limit is not None for limit in limits):
+            cache.set_limits(*limits)
+        return cache
+
+    def export_stats(self):
+        """Usage statistics for all of the caches."""
+        exported = {
+            'collection_cache': self._collection_cache.export_stats(),
+            'document_cache': self._document_cache.export_stats(),
+            'file_cache': self._file_cache.export_stats(),
+            'routes_cache': self._routes_cache.export_stats(),
+            'templates': self._template_stats.export(),
+            'memoize': utils.memoize.export_stats(),
+        }
+        for key, stats in self.object_cache_stats().items():
+            exported['object_cache:{}'.format(key)] = stats
+        return exported
+
+    def object_cache_stats(self):
+        """Usage statistics for each of the object caches."""
+        return {
+            key: meta['cache'].export_stats()
+            for key, meta in self._object_caches.items()}
 
     def has_object_cache(self, key):
         """Has an existing object cache?"""
@@ -159,6 +231,11 @@ class PodCache:
             if meta['can_reset'] or force:
                 meta['cache'].reset()
 
+        # The hash and yaml caches are validated against the files when used.
+        if force:
+            self._hash_cache.reset()
+            self._yaml_cache.reset()
+
     def update(self, dep_cache=None, obj_cache=None):
         """Update the values in the dependency cache and/or the object cache."""
         if dep_cache:
@@ -173,7 +250,11 @@ class PodCache:
                     if isinstance(meta, str):
                         continue
 
-                    self._object_caches[key]['cache'].add_all(meta['values'])
+                    cache = self._object_caches[key]['cache']
+                    cache.add_all(meta['values'])
+                    limits = [meta.get(name) for name in self.OBJECT_CACHE_LIMITS]
+                    if any(limit is not None for limit in limits):
+                        cache.set_limits(*limits)
                     self._object_caches[key][
                         'write_to_file'] = meta['write_to_file']
                     self._object_caches[key][
@@ -183,35 +264,62 @@ class PodCache:
     def write(self):
         """Persist the cache information to a yaml file."""
         with self._pod.profile.timer('Podcache.write'):
+            # Only the changes are appended to the journals.
             if self._dependency_graph.is_dirty:
-                output = self._dependency_graph.export()
+                cleared, changes = self._dependency_graph.changes()
                 self._dependency_graph.mark_clean()
-                self._write_json('{}{}'.format(
-                    self._pod.PATH_CONTROL, self._pod.FILE_DEP_CACHE), output)
+                if cleared or changes:
+                    self.dep_journal.append(changes, cleared=cleared)
 
             if self._routes_cache.is_dirty:
-                output = self._routes_cache.export()
+                cleared, changes = self._routes_cache.changes()
                 self._routes_cache.mark_clean()
-                self._write_json('{}{}'.format(
-                    self._pod.PATH_CONTROL, FILE_ROUTES_CACHE), output)
+                if cleared or changes:
+                    self.routes_journal.append(changes, cleared=cleared)
+
+            if self._hash_cache.is_dirty:
+                self._hash_cache.write()
+
+            if self._yaml_cache.is_dirty:
+                self._yaml_cache.write()
 
             # Write out any of the object caches configured for write_to_file.
+            # Only the separate files of the modified caches are written.
             output = {}
+            is_dirty = False
             for key, meta in self._object_caches.items():
-                if meta['write_to_file']:
-                    cache_info = {
-                        'can_reset': meta['can_reset'],
-                        'write_to_file': meta['write_to_file'],
-                        'values': meta['cache'].export(),
-                        'separate_file': meta['separate_file'],
-                    }
-                    if meta['separate_file']:
-                        filename = '/{}'.format(
-                            object_cache.FILE_OBJECT_SUB_CACHE.format(key))
-                        self._write_json(filename, cache_info)
-                        output[key] = filename
-                    else:
-                        output[key] = cache_info
-                    meta['cache'].mark_clean()
-            if output:
+                if not meta['write_to_file']:
+                    continue
+                cache = meta['cache']
+                if meta['separate_file']:
+                    filename = '/{}'.format(
+                        object_cache.FILE_OBJECT_SUB_CACHE.format(key))
+                    if cache.is_dirty:
+                        self._write_json(filename, self._object_cache_info(meta))
+                        is_dirty = True
+                    output[key] = filename
+                else:
+                    output[key] = self._object_cache_info(meta)
+                    is_dirty = is_dirty or cache.is_dirty
+                cache.mark_clean()
+            if output and is_dirty:
                 self._write_json('/{}'.format(FILE_OBJECT_CACHE), output)
+
+    @staticmethod
+    def _object_cache_info(meta):
+        """Information for writing an object cache to a file."""
+        cache = meta['cache']
+        cache_info = {
+            'can_reset': meta['can_reset'],
+            'write_to_file': meta['write_to_file'],
+            'values': cache.export(),
+            'separate_file': meta['separate_file'],
+        }
+        if cache.max_entries is not None:
+            cache_info['max_entries'] = cache.max_entries
+        if cache.max_bytes is not None:
+            cache_info['max_bytes'] = cache.max_bytes
+        if cache.ttl is not None:
+            cache_info['ttl'] = cache.ttl
+            cache_info['timestamps'] = cache.export_timestamps()
+        return cache_info
@@ -112,5 +112,70 @@ class PodCacheTestCase(unittest.TestCase):
         self.cache.object_cache.add('foo', 'bar')
         self.cache.write()
 
+    def test_write_journals(self):
+        """Dependencies and routes are written to the journals."""
+        self.pod.write_file('/.grow/routescache.json', '{"version": 1}')
+        cache = pods.Pod(self.pod.root, storage=storage.FileStorage).podcache
+        self.assertFalse(self.pod.file_exists('/.grow/routescache.json'))
+        self.assertTrue(self.pod.file_exists('/.grow/routescache.journal'))
+        self.assertFalse(cache.is_dirty)
+
+        cache.dependency_graph.add_references(
+            '/content/pages/home.yaml', ['/views/base.html'])
+        cache.routes_cache.add(
+            '/foo/', {'kind': 'test'}, options={'bar': 1}, concrete=True)
+        cache.write()
+        self.assertFalse(cache.is_dirty)
+        cache.dependency_graph.add_references(
+            '/content/pages/about.yaml', ['/views/base.html'])
+        cache.routes_cache.remove('/foo/', concrete=True)
+        cache.write()
+
+        pod = pods.Pod(self.pod.root, storage=storage.FileStorage)
+        self.assertEqual({
+            '/content/pages/about.yaml': ['/views/base.html'],
+            '/content/pages/home.yaml': ['/views/base.html'],
+        }, pod.podcache.dependency_graph.export())
+        self.assertIsNone(pod.podcache.routes_cache.get('/foo/', concrete=True))
+        self.assertFalse(pod.podcache.is_dirty)
+
+    def test_write_object_cache_limits(self):
+        """Limits are written and only modified caches are written."""
+        named_cache = self.cache.create_object_cache(
+            'named', write_to_file=True, separate_file=True, max_entries=1)
+        named_cache.add('question', '???')
+        named_cache.add('answer', 42)
+        self.cache.write()
+        filename = '/objectcache.named.json'
+        self.assertEqual({
+            'can_reset': False,
+            'write_to_file': True,
+            'separate_file': True,
+            'max_entries': 1,
+            'values': {'answer': 42},
+        }, self.pod.read_json(filename))
+
+        self.pod.write_file(filename, '{"values": {}}')
+        self.assertFalse(self.cache.is_dirty)
+        self.cache.write()
+        self.assertEqual({'values': {}}, self.pod.read_json(filename))
+
+        cache = podcache.PodCache(
+            {}, self.pod.read_json('/objectcache.json'), {}, self.pod)
+        self.assertFalse(cache.is_dirty)
+        self.assertEqual(0, cache.object_cache_stats()['named']['entries'])
+
+    def test_export_stats(self):
+        """Usage statistics for all of the caches."""
+        self.cache.object_cache.add('foo', 'bar')
+        self.cache.object_cache.get('foo')
+        self.cache.routes_cache.get('/missing/')
+        stats = self.cache.export_stats()
+        self.assertEqual(1, stats['object_cache:__global__']['hits'])
+        self.assertEqual(1, stats['routes_cache']['misses'])
+        self.assertEqual(0, stats['file_cache']['entries'])
+        self.assertIn('templates', stats)
+        self.assertIn('memoize', stats)
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,10 +2,12 @@
 Cache for storing and retrieving routing information in a pod.
 """
 
+from grow.cache import cache_stats
 from grow.routing import router
 
 
 FILE_ROUTES_CACHE = 'routescache.json'
+FILE_ROUTES_JOURNAL = 'routescache.journal'
 
 
 class RoutesCache:
@@ -16,10 +18,22 @@ class RoutesCache:
     KEY_NONE = '__None__'
 
     def __init__(self):
+        self.stats = cache_stats.CacheStats()
+        # Meta shared by the routes in the cache.
+        self.shared_meta = router.SharedMeta()
+        # Values of the routes with the options only kept for the routes that
+        # have options.
         self._cache = {
             self.KEY_CONCRETE: {},
             self.KEY_DYNAMIC: {},
         }
+        self._options = {
+            self.KEY_CONCRETE: {},
+            self.KEY_DYNAMIC: {},
+        }
+        # Changed paths for each cache key and env.
+        self._changed = {}
+        self._cleared = False
         self._is_dirty = False
 
     @classmethod
@@ -27,46 +41,105 @@ class RoutesCache:
         return cls.KEY_CONCRETE if concrete else cls.KEY_DYNAMIC
 
     @staticmethod
-    def _export_cache(routes):
+    def _is_same(existing, value):
+        """Values are the same, including the file information of routes."""
+        if existing != value:
+            return False
+        for name in ('hashed', 'size', 'mtime_ns'):
+            if getattr(existing, name, None) != getattr(value, name, None):
+                return False
+        return True
+
+    @staticmethod
+    def _export_item(value, options):
+        if hasattr(value, 'export'):
+            value = value.export()
+        return {
+            'value': value,
+            'options': options,
+        }
+
+    def _export_cache(self, cache_key):
         routing_info = {}
-        for env, env_routes in routes.items():
+        for env, env_routes in self._cache[cache_key].items():
+            env_options = self._options[cache_key].get(env, {})
             routing_info[env] = {}
-            for path, item in env_routes.items():
-                if hasattr(item['value'], 'export'):
-                    value = item['value'].export()
-                else:
-                    value = item['value']
-                routing_info[env][path] = {
-                    'value': value,
-                    'options': item['options'],
-                }
+            for path, value in env_routes.items():
+                routing_info[env][path] = self._export_item(
+                    value, env_options.get(path))
         return routing_info
 
+    @staticmethod
+    def from_journal(entries):
+        """Convert the journal entries to the exported cache format."""
+        data = {'version': 1}
+        for (cache_key, env, path), item in entries.items():
+            data.setdefault(cache_key, {}).setdefault(env, {})[path] = item
+        return data
+
+    @staticmethod
+    def to_journal(data):
+        """Convert the exported cache format to journal entries."""
+        entries = {}
+        for cache_key in (RoutesCache.KEY_CONCRETE, RoutesCache.KEY_DYNAMIC):
+            for env, env_data in data.get(cache_key, {}).items():
+                for path, item in env_data.items():
+                    entries[(cache_key, env, path)] = item
+        return entries
+
     def add(self, key, value, options=None, concrete=False, env=None):
         """Add a new item to the cache or overwrite an existing value."""
         if env is None:
             env = self.KEY_NONE
+        # Routes without options are common so they are not stored.
+        options = options or None
         cache_key = self._cache_key(concrete)
         if env not in self._cache[cache_key]:
             self._cache[cache_key][env] = {}
+            self._options[cache_key][env] = {}
         cache = self._cache[cache_key][env]
-        cache_value = {
-            'value': value,
-            'options': options,
-        }
-        if not self._is_dirty and (key not in cache or cache[key] != cache_value):
+        cache_options = self._options[cache_key][env]
+        if (key not in cache or not self._is_same(cache[key], value)
+                or cache_options.get(key) != options):
             self._is_dirty = True
-        cache[key] = cache_value
+            self._changed.setdefault((cache_key, env), set()).add(key)
+            self.stats.insert()
+        cache[key] = value
+        if options is None:
+            cache_options.pop(key, None)
+        else:
+            cache_options[key] = options
+
+    def changes(self):
+        """Routes changed since the cache was clean.
+
+        Returns if the cache was reset and a dict of the changed routes
+        as journal entries, removed routes have a `None` value.
+        """
+        entries = {}
+        for (cache_key, env), keys in self._changed.items():
+            for key in keys:
+                value = self._cache[cache_key].get(env, {}).get(key)
+                entries[(cache_key, env, key)] = None if value is None else (
+                    self._export_item(
+                        value, self._options[cache_key].get(env, {}).get(key)))
+        return self._cleared, entries
 
     def export(self, concrete=None):
         """Returns the raw cache data."""
         if concrete is None:
             return {
                 'version': 1,
-                self.KEY_CONCRETE: self._export_cache(self._cache[self.KEY_CONCRETE]),
-                self.KEY_DYNAMIC: self._export_cache(self._cache[self.KEY_DYNAMIC]),
+                self.KEY_CONCRETE: self._export_cache(self.KEY_CONCRETE),
+                self.KEY_DYNAMIC: self._export_cache(self.KEY_DYNAMIC),
             }
-        return self._export_cache(self._cache[self._cache_key(concrete)])
+        return self._export_cache(self._cache_key(concrete))
+
+    def export_stats(self):
+        """Usage statistics for the cache."""
+        return self.stats.export(entries=sum(
+            len(env_routes) for routes in self._cache.values()
+            for env_routes in routes.values()))
 
     def from_data(self, data):
         """Set the cache from data."""
@@ -82,7 +155,8 @@ class RoutesCache:
                     for key, item in env_data.items():
                         self.add(
                             key,
-                            router.RouteInfo.from_data(**item['value']),
+                            router.RouteInfo.from_data(
+                                shared_meta=self.shared_meta, **item['value']),
                             options=item['options'], concrete=concrete,
                             env=env)
 
@@ -90,7 +164,14 @@ class RoutesCache:
         """Retrieve the value from the cache."""
         if env is None:
             env = self.KEY_NONE
-        return self._cache[self._cache_key(concrete)].get(env, {}).get(key, None)
+        cache_key = self._cache_key(concrete)
+        value = self._cache[cache_key].get(env, {}).get(key, None)
+        if not self.stats.lookup(value is not None):
+            return None
+        return {
+            'value': value,
+            'options': self._options[cache_key][env].get(key),
+        }
 
     @property
     def is_dirty(self):
@@ -99,22 +180,52 @@ class RoutesCache:
 
     def mark_clean(self):
         """Mark that the object cache is clean."""
+        self._changed = {}
+        self._cleared = False
         self._is_dirty = False
 
+    def items(self, concrete=False, env=None):
+        """Paths in the cache with the value and options of the route."""
+        if env is None:
+            env = self.KEY_NONE
+        cache_key = self._cache_key(concrete)
+        env_options = self._options[cache_key].get(env, {})
+        for key, value in list(self._cache[cache_key].get(env, {}).items()):
+            yield key, value, env_options.get(key)
+
     def raw(self, concrete=None, env=None):
         """Returns the raw cache data."""
         if concrete is None:
-            return self._cache
-        if env is None:
-            env = self.KEY_NONE
-        return self._cache[self._cache_key(concrete)].get(env, {})
+            return {
+                cache_key: {
+                    env: {
+                        key: {'value': value, 'options': options}
+                        for key, value, options in self.items(
+                            concrete=cache_key == self.KEY_CONCRETE, env=env)
+                    } for env in self._cache[cache_key]
+                } for cache_key in (self.KEY_CONCRETE, self.KEY_DYNAMIC)
+            }
+        return {
+            key: {'value': value, 'options': options}
+            for key, value, options in self.items(concrete=concrete, env=env)
+        }
 
     def remove(self, key, concrete=False, env=None):
         """Removes a single element from the cache."""
         if env is None:
             env = self.KEY_NONE
         self._is_dirty = True
-        return self._cache[self._cache_key(concrete)].get(env, {}).pop(key, None)
+        cache_key = self._cache_key(concrete)
+        self._changed.setdefault((cache_key, env), set()).add(key)
+        value = self._cache[cache_key].get(env, {}).pop(key, None)
+        options = self._options[cache_key].get(env, {}).pop(key, None)
+        if value is None:
+            return None
+        self.stats.invalidate()
+        return {
+            'value': value,
+            'options': options,
+        }
 
     def reset(self):
         """Reset the internal cache object."""
@@ -122,4 +233,11 @@ class RoutesCache:
             self.KEY_CONCRETE: {},
             self.KEY_DYNAMIC: {},
         }
+        self._options = {
+            self.KEY_CONCRETE: {},
+            self.KEY_DYNAMIC: {},
+        }
+        self._changed = {}
+        self._cleared = True
         self._is_dirty = False
+        self.shared_meta.reset()
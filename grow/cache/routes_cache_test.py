@@ -87,6 +87,16 @@ class RoutesCacheTestCase(unittest.TestCase):
             'version': 1,
         }, self.routes_cache.export())
 
+    def test_items(self):
+        """Items of the cache with the options."""
+        self.routes_cache.add('answer', 42, options={}, concrete=True)
+        self.routes_cache.add(
+            'question', 7, options={'dev': True}, concrete=True)
+        self.assertEqual(
+            [('answer', 42, None), ('question', 7, {'dev': True})],
+            sorted(self.routes_cache.items(concrete=True)))
+        self.assertEqual([], list(self.routes_cache.items(concrete=False)))
+
     def test_mark_clean(self):
         """Can mark as clean?"""
         self.assertFalse(self.routes_cache.is_dirty)
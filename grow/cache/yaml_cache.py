@@ -0,0 +1,227 @@
+"""
+Persistent cache for parsed yaml files and front matter.
+
+Only yaml without any tags (ex: `!g.doc`) is cached. The tag constructors
+depend on the pod, locale and dependency tracking so the parsed data from
+tagged yaml cannot be reused between runs.
+
+Files are validated using the size and modified time of the file, front matter
+is validated using the hash of the front matter content.
+
+The parsed content is also kept in memory as an untag plan so it can be untagged
+for each locale without parsing or loading it again.
+
+When a shared build cache is used, the parsed data is also stored in the build
+cache by the hash of the content so other builds can reuse it.
+"""
+
+import hashlib
+import pickle
+import re
+from grow.cache import cache_files
+from grow.common import untag
+
+
+FILE_YAML_CACHE = 'yamlcache.pickle'
+CACHE_VERSION = 1
+
+# Anything that looks like a yaml tag at the start of a node.
+TAG_REGEX = re.compile(r'(?:^|[\s\[\]{},:?-])!', re.MULTILINE)
+
+
+class YamlCache:
+    """Cache for the parsed data of yaml without tags."""
+
+    KEY_CONTENT = 'content'
+    KEY_FILES = 'files'
+
+    def __init__(self, pod):
+        self._pod = pod
+        self._cache = None
+        self._is_dirty = False
+        self._plans = {}
+        self.build_cache = None
+
+    @property
+    def file_name(self):
+        """Pod path for the cache file."""
+        return '{}{}'.format(self._pod.PATH_CONTROL, FILE_YAML_CACHE)
+
+    @property
+    def is_dirty(self):
+        """Has the cache been modified?"""
+        return self._is_dirty
+
+    @property
+    def _entries(self):
+        if self._cache is None:
+            self._cache = self._load()
+        return self._cache
+
+    @staticmethod
+    def _empty():
+        return {
+            'version': CACHE_VERSION,
+            YamlCache.KEY_CONTENT: {},
+            YamlCache.KEY_FILES: {},
+        }
+
+    @staticmethod
+    def _hash(content):
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+        return hashlib.sha1(content).hexdigest()
+
+    @staticmethod
+    def is_cacheable(content):
+        """Can the parsed data of the yaml content be cached?"""
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return not TAG_REGEX.search(content)
+
+    def _load(self):
+        try:
+            with open(self._pod.abs_path(self.file_name), 'rb') as cache_file:
+                data = pickle.load(cache_file)
+        except Exception:  # pylint: disable=broad-except
+            # Missing, corrupt or incompatible cache file.
+            return self._empty()
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return self._empty()
+        return data
+
+    def _stat(self, pod_path):
+        try:
+            stat = self._pod.file_stat(pod_path)
+        except (IOError, OSError, ValueError):
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _file_stat(self, pod_path):
+        """Stat used to validate the file, unless recently modified.
+
+        Recently modified files are validated using the content hash instead.
+        """
+        stat = self._stat(pod_path)
+        if stat is None or cache_files.is_racy(stat[1]):
+            return None
+        return stat
+
+    def _build_cache_key(self, hashed):
+        return self.build_cache.key('yaml', hashed)
+
+    def _get_shared(self, key, content, pod_path=None):
+        """Parsed data from the shared build cache, added to the local cache."""
+        if self.build_cache is None or not self.is_cacheable(content):
+            return None
+        hashed = self._hash(content)
+        data = self.build_cache.get_data(self._build_cache_key(hashed))
+        if data is None:
+            return None
+        pickled = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if pod_path is None:
+            self._entries[self.KEY_CONTENT][key] = (hashed, pickled)
+        else:
+            self._entries[self.KEY_FILES][pod_path] = (
+                self._file_stat(pod_path), hashed, pickled)
+        self._is_dirty = True
+        return data
+
+    def _put_shared(self, hashed, data):
+        if self.build_cache is not None:
+            self.build_cache.put_data(self._build_cache_key(hashed), data)
+
+    def add_content(self, key, content, data):
+        """Add the parsed data of yaml content."""
+        if not self.is_cacheable(content):
+            return
+        hashed = self._hash(content)
+        self._entries[self.KEY_CONTENT][key] = (
+            hashed, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        self._is_dirty = True
+        self._put_shared(hashed, data)
+
+    def add_file(self, pod_path, content, data):
+        """Add the parsed data of a yaml file."""
+        if not self.is_cacheable(content):
+            return
+        hashed = self._hash(content)
+        self._entries[self.KEY_FILES][pod_path] = (
+            self._file_stat(pod_path), hashed,
+            pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        self._is_dirty = True
+        self._put_shared(hashed, data)
+
+    def get_content(self, key, content):
+        """Parsed data for the yaml content if cached."""
+        entry = self._entries[self.KEY_CONTENT].get(key)
+        if entry is None or entry[0] != self._hash(content):
+            return self._get_shared(key, content)
+        return pickle.loads(entry[1])
+
+    def get_file(self, pod_path, content=None):
+        """Parsed data for a yaml file if the file has not changed.
+
+        Without the content, only the size and modified time of the file are
+        used to validate the cached data.
+        """
+        entry = self._entries[self.KEY_FILES].get(pod_path)
+        if entry is None:
+            return None if content is None else self._get_shared(
+                pod_path, content, pod_path=pod_path)
+        stat, hashed, data = entry
+        if content is None:
+            if stat is None or stat != self._stat(pod_path):
+                return None
+        elif hashed != self._hash(content):
+            return self._get_shared(pod_path, content, pod_path=pod_path)
+        else:
+            # Same content with a new modified time, such as a new checkout.
+            current_stat = self._file_stat(pod_path)
+            if current_stat != stat:
+                self._entries[self.KEY_FILES][pod_path] = (
+                    current_stat, hashed, data)
+                self._is_dirty = True
+        return pickle.loads(data)
+
+    def get_untag_plan(self, key, content):
+        """Untag plan for the yaml content if the parsed data is cached."""
+        if not self.is_cacheable(content):
+            return None
+        hashed = self._hash(content)
+        entry = self._plans.get(key)
+        if entry is not None and entry[0] == hashed:
+            return entry[1]
+        data = self.get_content(key, content)
+        if data is None:
+            return None
+        plan = untag.UntagPlan(data)
+        self._plans[key] = (hashed, plan)
+        return plan
+
+    def mark_clean(self):
+        """Mark that the cache has been written."""
+        self._is_dirty = False
+
+    def remove(self, pod_path):
+        """Remove the cached data for a file."""
+        self._plans.pop(pod_path, None)
+        if self._entries[self.KEY_FILES].pop(pod_path, None) is not None:
+            self._is_dirty = True
+
+    def reset(self):
+        """Remove all of the cached data."""
+        self._cache = self._empty()
+        self._plans = {}
+        self._is_dirty = True
+
+    def write(self):
+        """Write the cache file, without the files that no longer exist."""
+        entries = self._entries
+        for key in (self.KEY_CONTENT, self.KEY_FILES):
+            for pod_path in list(entries[key].keys()):
+                if not self._pod.file_exists(pod_path):
+                    del entries[key][pod_path]
+        cache_files.replace_file(self._pod, self.file_name, pickle.dumps(
+            entries, pickle.HIGHEST_PROTOCOL))
+        self.mark_clean()
@@ -0,0 +1,109 @@
+"""Test the yaml cache."""
+
+import unittest
+from grow import storage
+from grow.cache import yaml_cache
+from grow.pods import pods
+from grow.testing import testing
+
+
+class YamlCacheTestCase(unittest.TestCase):
+    """Tests for the YamlCache."""
+
+    def setUp(self):
+        dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(dir_path, storage=storage.FileStorage)
+        self.cache = yaml_cache.YamlCache(self.pod)
+
+    def test_is_cacheable(self):
+        """Only yaml without tags is cached."""
+        self.assertTrue(yaml_cache.YamlCache.is_cacheable('foo: Bar!'))
+        self.assertTrue(yaml_cache.YamlCache.is_cacheable('foo: "Hi! There"'))
+        self.assertFalse(yaml_cache.YamlCache.is_cacheable('foo: !_ Bar'))
+        self.assertFalse(yaml_cache.YamlCache.is_cacheable(
+            'foo:\n- !g.doc /content/pages/home.yaml'))
+        self.assertFalse(yaml_cache.YamlCache.is_cacheable('[!g.url /]'))
+
+    def test_content(self):
+        """Content is validated by hash."""
+        self.cache.add_content('/foo.yaml', 'foo: bar', {'foo': 'bar'})
+        self.assertEqual(
+            {'foo': 'bar'}, self.cache.get_content('/foo.yaml', 'foo: bar'))
+        self.assertIsNone(self.cache.get_content('/foo.yaml', 'foo: baz'))
+        self.cache.add_content('/tagged.yaml', 'foo: !_ bar', {'foo': 'bar'})
+        self.assertIsNone(self.cache.get_content('/tagged.yaml', 'foo: !_ bar'))
+
+    def test_copies(self):
+        """Cached data is not shared between uses."""
+        self.cache.add_content('/foo.yaml', 'foo: [1]', {'foo': [1]})
+        data = self.cache.get_content('/foo.yaml', 'foo: [1]')
+        data['foo'].append(2)
+        self.assertEqual(
+            {'foo': [1]}, self.cache.get_content('/foo.yaml', 'foo: [1]'))
+
+    def test_untag_plan(self):
+        """Untag plans are shared for the same content."""
+        self.assertIsNone(self.cache.get_untag_plan('/foo.yaml', 'foo@fr: bar'))
+        self.cache.add_content(
+            '/foo.yaml', 'foo@fr: bar', {'foo@fr': 'bar'})
+        plan = self.cache.get_untag_plan('/foo.yaml', 'foo@fr: bar')
+        self.assertEqual({'foo': 'bar'}, plan.untag(locale_identifier='fr'))
+        self.assertEqual({}, plan.untag(locale_identifier='de'))
+        self.assertIs(
+            plan, self.cache.get_untag_plan('/foo.yaml', 'foo@fr: bar'))
+        self.assertIsNone(self.cache.get_untag_plan('/foo.yaml', 'foo: baz'))
+
+    def test_file(self):
+        """Files are validated by the stat or hash."""
+        testing.write_old_file(self.pod, '/data/cached.yaml', 'foo: bar')
+        self.cache.add_file('/data/cached.yaml', 'foo: bar', {'foo': 'bar'})
+        self.assertEqual(
+            {'foo': 'bar'}, self.cache.get_file('/data/cached.yaml'))
+
+        # Recently modified files are validated by hash.
+        self.pod.write_file('/data/cached.yaml', 'foo: baz')
+        self.assertIsNone(self.cache.get_file('/data/cached.yaml'))
+        self.assertIsNone(
+            self.cache.get_file('/data/cached.yaml', content='foo: baz'))
+
+        # Same content with a new modified time.
+        testing.write_old_file(self.pod, '/data/cached.yaml', 'foo: bar')
+        self.assertIsNone(self.cache.get_file('/data/cached.yaml'))
+        self.assertEqual({'foo': 'bar'}, self.cache.get_file(
+            '/data/cached.yaml', content='foo: bar'))
+        self.assertEqual(
+            {'foo': 'bar'}, self.cache.get_file('/data/cached.yaml'))
+
+    def test_write(self):
+        """Cache is persisted for the next run, without removed files."""
+        testing.write_old_file(self.pod, '/data/cached.yaml', 'foo: bar')
+        self.cache.add_file('/data/cached.yaml', 'foo: bar', {'foo': 'bar'})
+        self.cache.add_content('/data/removed.yaml', 'foo: bar', {'foo': 'bar'})
+        self.assertTrue(self.cache.is_dirty)
+        self.cache.write()
+        self.assertFalse(self.cache.is_dirty)
+
+        cache = yaml_cache.YamlCache(self.pod)
+        self.assertEqual({'foo': 'bar'}, cache.get_file('/data/cached.yaml'))
+        self.assertIsNone(cache.get_content('/data/removed.yaml', 'foo: bar'))
+
+        # Corrupt cache files are ignored.
+        self.pod.write_file(cache.file_name, 'not a pickle')
+        cache = yaml_cache.YamlCache(self.pod)
+        self.assertIsNone(cache.get_file('/data/cached.yaml'))
+
+    def test_read_yaml(self):
+        """Pod uses the cache for parsing yaml files."""
+        testing.write_old_file(self.pod, '/data/cached.yaml', 'foo: bar\nfoo@fr: baz')
+        self.assertEqual({'foo': 'baz'}, self.pod.read_yaml(
+            '/data/cached.yaml', locale='fr'))
+        self.pod.podcache.write()
+
+        pod = pods.Pod(self.pod.root, storage=storage.FileStorage)
+        self.assertEqual({'foo': 'bar', 'foo@fr': 'baz'},
+                         pod.podcache.yaml_cache.get_file('/data/cached.yaml'))
+        self.assertEqual({'foo': 'bar'}, pod.read_yaml('/data/cached.yaml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,9 @@ def grow(auth, clear_auth, auth_key_file, interactive_auth, profile):
         os.environ['AUTH_KEY_FILE'] = str(auth_key_file)
     if clear_auth:
         os.environ['CLEAR_AUTH'] = '1'
+    if profile:
+        # Render processes inherit the environment to profile templates.
+        os.environ['GROW_PROFILE_TEMPLATES'] = '1'
 
 
 @grow.resultcallback()
@@ -12,6 +12,19 @@ def pod_path_argument(func):
     return click.argument('pod_path', default='.')(func)
 
 
+def build_cache_option(config):
+    """Option for a build cache shared between builds."""
+    shared_default = CFG.get('build-cache', None)
+    config_default = config.get('build-cache', shared_default)
+
+    def _decorator(func):
+        return click.option(
+            '--build-cache', 'build_cache', type=str, default=config_default,
+            help='Directory or url of a build cache shared between shards '
+                 'and builds for reusing rendered routes and parsed content.')(func)
+    return _decorator
+
+
 def deployment_option(config):
     """Option for changing env based on deployment name."""
     shared_default = CFG.get('deployment', None)
@@ -141,6 +154,31 @@ def preprocess_option(config):
     return _decorator
 
 
+def processes_option(config):
+    """Option for using multiple processes when rendering."""
+    shared_default = CFG.get('processes', None)
+    config_default = config.get('processes', shared_default)
+
+    def _decorator(func):
+        return click.option(
+            '--processes', type=int, default=config_default,
+            help='Number of render processes to use during rendering.')(func)
+    return _decorator
+
+
+def render_envs_option(config):
+    """Option for limiting the number of render environments."""
+    shared_default = CFG.get('render-envs', None)
+    config_default = config.get('render-envs', shared_default)
+
+    def _decorator(func):
+        return click.option(
+            '--render-envs', 'render_envs', type=int, default=config_default,
+            help='Maximum number of jinja environments kept for rendering. '
+                 'Idle environments are reused for other locales.')(func)
+    return _decorator
+
+
 def routes_file_option(help_text=None):
     """Option for providing a routes file instead of pulling from content."""
     if help_text is None:
@@ -167,6 +205,14 @@ def shard_option(func):
         help='Current index of shard being used for sharding.')(func)
 
 
+def shard_profile_option(func):
+    """Option for balancing the shards using a previous profile."""
+    return click.option(
+        '--shard-profile', type=click.Path(exists=True, dir_okay=False),
+        help='Profile (profile.json) of a previous build using --profile for '
+             'balancing the shards by the render time of the routes.')(func)
+
+
 def shards_option(func):
     """Option for configuring the shard count."""
     return click.option(
@@ -174,6 +220,19 @@ def shards_option(func):
         help='Number of shards being used for sharding.')(func)
 
 
+def spool_option(config):
+    """Option for spooling rendered content to disk over a memory budget."""
+    shared_default = CFG.get('spool-memory', None)
+    config_default = config.get('spool-memory', shared_default)
+
+    def _decorator(func):
+        return click.option(
+            '--spool-memory', 'spool_memory', type=float, default=config_default,
+            help='Megabytes of rendered content to keep in memory before '
+                 'spooling the rendered content to temp files.')(func)
+    return _decorator
+
+
 def threaded_option(config):
     """Option for using threading when rendering."""
     shared_default = CFG.get('threaded', True)
@@ -187,6 +246,20 @@ def threaded_option(config):
     return _decorator
 
 
+def verify_hashes_option(config):
+    """Option for hashing all files when validating the cached routes."""
+    shared_default = CFG.get('verify-hashes', False)
+    config_default = config.get('verify-hashes', shared_default)
+
+    def _decorator(func):
+        return click.option(
+            '--verify-hashes', 'verify_hashes', is_flag=True,
+            default=config_default,
+            help='Hash all files when validating the cached routes instead of '
+                 'trusting unchanged file sizes and modified times.')(func)
+    return _decorator
+
+
 def work_dir_option(func):
     """Option for working directory."""
     help_text = 'Directory to pull working files from.'
@@ -10,7 +10,11 @@ from grow.deployments import stats
 from grow.deployments.destinations import local as local_destination
 from grow.extensions import hooks
 from grow.performance import docs_loader
+from grow.performance import render_costs
 from grow.pods import pods
+from grow.rendering import build_cache as grow_build_cache
+from grow.rendering import build_manifest
+from grow.rendering import render_spool
 from grow.rendering import renderer
 from grow import storage
 
@@ -26,30 +30,53 @@ CFG = rc_config.RC_CONFIG.prefixed('grow.build')
               help='Clear the pod cache before building.')
 @click.option('--file', '--pod-path', 'pod_paths',
               help='Build only pages affected by content files.', multiple=True)
+@click.option('--incremental',
+              default=CFG.get('incremental', False), is_flag=True,
+              help='Reuse the output of routes whose content, templates, and '
+                   'other dependencies are unchanged since the last build. '
+                   'Requires a fingerprint in the environment config.')
 @click.option('--locate-untranslated',
               default=CFG.get('locate-untranslated', False), is_flag=True,
               help='Shows untranslated message information.')
 @shared.locale_option(help_text='Filter build routes to specific locale.')
+@shared.build_cache_option(CFG)
 @shared.deployment_option(CFG)
 @shared.out_dir_option(CFG)
 @shared.preprocess_option(CFG)
 @shared.threaded_option(CFG)
+@shared.processes_option(CFG)
+@shared.spool_option(CFG)
+@shared.render_envs_option(CFG)
 @shared.shards_option
 @shared.shard_option
+@shared.shard_profile_option
+@shared.verify_hashes_option(CFG)
 @shared.work_dir_option
 @shared.routes_file_option()
-def build(pod_path, out_dir, preprocess, clear_cache, pod_paths,
-          locate_untranslated, deployment, threaded, locale, shards, shard,
-          work_dir, routes_file):
+def build(pod_path, out_dir, preprocess, clear_cache, pod_paths, incremental,
+          locate_untranslated, build_cache, deployment, threaded, processes,
+          spool_memory, render_envs, locale, shards, shard, shard_profile,
+          verify_hashes, work_dir, routes_file):
     """Generates static files and dumps them to a local destination."""
     root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
     out_dir = out_dir or os.path.join(root, 'build')
 
     pod = pods.Pod(root, storage=storage.FileStorage)
+    if render_envs:
+        pod.render_pool.max_envs = render_envs
     if not pod_paths or clear_cache:
         # Clear the cache when building all, only force if the flag is used.
         pod.podcache.reset(force=clear_cache)
     deployment_obj = None
+    manifest = None
+    shared_cache = None
+    if build_cache and not clear_cache:
+        try:
+            shared_cache = grow_build_cache.BuildCache.from_location(
+                build_cache, version=build_manifest.grow_version())
+        except grow_build_cache.Error as err:
+            raise click.ClickException(str(err))
+        pod.podcache.yaml_cache.build_cache = shared_cache
     if deployment:
         deployment_obj = pod.get_deployment(deployment)
         pod.set_env(deployment_obj.config.env)
@@ -75,33 +102,60 @@ def build(pod_path, out_dir, preprocess, clear_cache, pod_paths,
             elif routes_file:
                 pod.router.from_data(pod.read_json(routes_file))
             else:
-                pod.router.add_all()
+                pod.router.add_all(verify_hashes=verify_hashes)
             if locale:
                 pod.router.filter('whitelist', locales=list(locale))
 
             # Shard the routes when using sharding.
             if shards and shard:
                 is_partial = True
-                pod.router.shard(shards, shard)
+                costs = None
+                if shard_profile:
+                    costs = render_costs.load(shard_profile)
+                pod.router.shard(shards, shard, costs=costs)
 
             if not work_dir:
                 # Preload the documents used by the paths after filtering.
                 docs_loader.DocsLoader.load_from_routes(pod, pod.router.routes)
 
+            # Untranslated strings are only found when rendering everything.
+            if ((incremental or shared_cache) and not clear_cache
+                    and not work_dir and not locate_untranslated):
+                manifest = build_manifest.BuildManifest(
+                    pod, out_dir, build_cache=shared_cache)
+                if not pod.env.config.fingerprint:
+                    pod.logger.warning(
+                        'Routes are not reused without a fingerprint in the '
+                        'environment config.')
+                if incremental:
+                    manifest.load()
+
             paths = pod.router.routes.paths
-            content_generator = renderer.Renderer.rendered_docs(
+            content_generator = renderer.Renderer.stream_rendered_docs(
                 pod, pod.router.routes, source_dir=work_dir,
-                use_threading=threaded)
+                use_threading=threaded, process_count=processes,
+                manifest=manifest)
             content_generator = hooks.generator_wrapper(
                 pod, 'pre_deploy', content_generator, 'build')
+            if spool_memory is not None:
+                spool = render_spool.RenderSpool.from_megabytes(
+                    pod.control_tmp_dir, spool_memory)
+                content_generator = spool.spool_docs(content_generator)
             stats_obj = stats.Stats(pod, paths=paths)
             destination.deploy(
                 content_generator, stats=stats_obj, repo=repo, confirm=False,
                 test=False, is_partial=is_partial)
             pod.podcache.write()
+            if manifest and incremental:
+                manifest.write(prune=not is_partial)
+            if shared_cache:
+                pod.logger.info('Reused {} of {} routes from the build cache.'.format(
+                    shared_cache.hits, shared_cache.hits + shared_cache.misses))
     except bulk_errors.BulkErrors as err:
         # Write the podcache files even when there are rendering errors.
         pod.podcache.write()
+        if manifest and incremental:
+            manifest.write(prune=False)
         bulk_errors.display_bulk_errors(err)
         raise click.Abort()
     except pods.Error as err:
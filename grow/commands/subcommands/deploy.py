@@ -11,7 +11,9 @@ from grow.deployments import stats
 from grow.deployments.destinations import base
 from grow.extensions import hooks
 from grow.performance import docs_loader
+from grow.performance import render_costs
 from grow.pods import pods
+from grow.rendering import render_spool
 from grow.rendering import renderer
 from grow import storage
 
@@ -34,14 +36,20 @@ CFG = rc_config.RC_CONFIG.prefixed('grow.deploy')
 @shared.force_untranslated_option(CFG)
 @shared.preprocess_option(CFG)
 @shared.threaded_option(CFG)
+@shared.processes_option(CFG)
+@shared.spool_option(CFG)
+@shared.render_envs_option(CFG)
 @shared.shards_option
 @shared.shard_option
+@shared.shard_profile_option
+@shared.verify_hashes_option(CFG)
 @shared.work_dir_option
 @shared.routes_file_option()
 @click.pass_context
 def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
-           test_only, auth, force_untranslated, threaded, shards, shard,
-           work_dir, routes_file):
+           test_only, auth, force_untranslated, threaded, processes,
+           spool_memory, render_envs, shards, shard, shard_profile,
+           verify_hashes, work_dir, routes_file):
     """Deploys a pod to a destination."""
     if auth:
         text = ('--auth must now be specified before deploy. Usage:'
@@ -51,6 +59,8 @@ def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
     root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
     try:
         pod = pods.Pod(root, storage=storage.FileStorage)
+        if render_envs:
+            pod.render_pool.max_envs = render_envs
         with pod.profile.timer('grow_deploy'):
             # Always clear the cache when building.
             pod.podcache.reset()
@@ -75,7 +85,7 @@ def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
             if routes_file:
                 pod.router.from_data(pod.read_json(routes_file))
             else:
-                pod.router.add_all()
+                pod.router.add_all(verify_hashes=verify_hashes)
             is_partial = False
             # Filter routes based on deployment config.
             for build_filter in deployment.filters:
@@ -87,7 +97,10 @@ def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
             # Shard the routes when using sharding.
             if shards and shard:
                 is_partial = True
-                pod.router.shard(shards, shard)
+                costs = None
+                if shard_profile:
+                    costs = render_costs.load(shard_profile)
+                pod.router.shard(shards, shard, costs=costs)
 
             if not work_dir:
                 # Preload the documents used by the paths after filtering.
@@ -96,9 +109,14 @@ def deploy(context, deployment_name, pod_path, preprocess, confirm, test,
             paths = pod.router.routes.paths
             stats_obj = stats.Stats(pod, paths=paths)
             content_generator = deployment.dump(
-                pod, source_dir=work_dir, use_threading=threaded)
+                pod, source_dir=work_dir, use_threading=threaded,
+                process_count=processes)
             content_generator = hooks.generator_wrapper(
                 pod, 'pre_deploy', content_generator, 'deploy')
+            if spool_memory is not None:
+                spool = render_spool.RenderSpool.from_megabytes(
+                    pod.control_tmp_dir, spool_memory)
+                content_generator = spool.spool_docs(content_generator)
             deployment.deploy(
                 content_generator, stats=stats_obj, repo=repo, confirm=confirm,
                 test=test, require_translations=require_translations,
@@ -1,6 +1,7 @@
 """Subcommand for inspecting pods."""
 
 import click
+from grow.commands.subcommands import inspect_cache
 from grow.commands.subcommands import inspect_routes
 from grow.commands.subcommands import inspect_stats
 from grow.commands.subcommands import inspect_untranslated
@@ -13,6 +14,7 @@ def inspect():
 
 
 # Add the sub commands.
+inspect.add_command(inspect_cache.inspect_cache)
 inspect.add_command(inspect_routes.inspect_routes)
 inspect.add_command(inspect_stats.inspect_stats)
 inspect.add_command(inspect_untranslated.inspect_untranslated)
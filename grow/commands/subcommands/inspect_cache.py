@@ -0,0 +1,76 @@
+"""Subcommand for displaying the cache usage of a pod."""
+
+import json
+import os
+import click
+import texttable
+from grow.commands import shared
+from grow.common import rc_config
+from grow.pods import pods
+from grow import storage
+
+
+CFG = rc_config.RC_CONFIG.prefixed('grow.inspect.cache')
+
+COLUMNS = ('hits', 'misses', 'inserts', 'evictions', 'invalidations', 'entries', 'bytes')
+
+
+def _format_rate(stats):
+    lookups = stats['hits'] + stats['misses']
+    if not lookups:
+        return ''
+    return '{:.1f}%'.format(100.0 * stats['hits'] / lookups)
+
+
+def _stats_table(cache_stats):
+    table = texttable.Texttable(max_width=0)
+    table.set_deco(texttable.Texttable.HEADER)
+    rows = [['Cache', 'Hit rate'] + [column.capitalize() for column in COLUMNS]]
+    for key in sorted(cache_stats):
+        stats = cache_stats[key]
+        rows.append([key, _format_rate(stats)] + [
+            str(stats.get(column, '')) for column in COLUMNS])
+    table.add_rows(rows)
+    return table.draw()
+
+
+@click.command(name='cache')
+@shared.deployment_option(CFG)
+@click.option('--file', '-f', 'stats_file', type=str, default=None,
+              help='Export the cache stats to a json file.')
+@shared.pod_path_argument
+def inspect_cache(pod_path, deployment, stats_file):
+    """Displays the cache usage for routing and loading the docs."""
+    root = os.path.abspath(os.path.join(os.getcwd(), pod_path))
+    pod = pods.Pod(root, storage=storage.FileStorage)
+    if deployment:
+        deployment_obj = pod.get_deployment(deployment)
+        pod.set_env(deployment_obj.config.env)
+    try:
+        with pod.profile.timer('grow_inspect_cache'):
+            pod.router.add_all()
+            # Load the fields of the routed docs like a render would.
+            for _, node, _ in pod.router.routes.nodes:
+                if node.kind != 'doc':
+                    continue
+                locale = node.meta.get('locale')
+                if locale == 'None':
+                    locale = None
+                _ = pod.get_doc(node.pod_path, locale).fields
+            cache_stats = pod.podcache.export_stats()
+    except pods.Error as err:
+        raise click.ClickException(str(err))
+
+    memoized = cache_stats.pop('memoize')
+    if stats_file:
+        pod.write_file(stats_file, json.dumps(
+            dict(cache_stats, memoize=memoized), sort_keys=True, indent=2,
+            separators=(',', ': ')))
+        print('Exported cache stats to file: {}'.format(stats_file))
+        return pod
+
+    output = [_stats_table(cache_stats)]
+    if memoized:
+        output.append(_stats_table(memoized))
+    click.echo_via_pager('\n\n'.join(output))
+    return pod
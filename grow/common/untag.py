@@ -1,77 +1,294 @@
-"""Untag an object using convention based keys."""
+"""Untag an object using convention based keys.
 
+Untagging analyses the data into an untag plan once, which can then be used to
+untag the data for each locale. Containers without any tagged keys are copied
+without visiting each of their keys.
+"""
+
+import functools
+import json
 import re
-from boltons import iterutils
+import threading
+from collections import OrderedDict
+from collections import abc
 
 
 LOCALIZED_KEY_REGEX = re.compile(r'(.*)@([^@]+)$')
 
+KEY_COMMENT = 'comment'
+KEY_LOCALE = 'locale'
+KEY_PARAM = 'param'
+KEY_PLAIN = 'plain'
+
+# Number of different params to keep shared untagged data for in a plan.
+MAX_SHARED_PARAMS = 8
+
+
+@functools.lru_cache(maxsize=1024)
+def _regex(pattern, flags=0):
+    """Compiled regex, cached since the same patterns are used by many files."""
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_key(key, param_names):
+    """Parse a tagged key into the type of key, if it is marked for extraction,
+    the key without the extraction marker and the parts of the tag."""
+    if key.endswith('@#'):
+        # Translation Comment.
+        return KEY_COMMENT, False, key, None
+
+    marked_for_extraction = key.endswith('@')
+    if marked_for_extraction:
+        key = key[:-1]
+
+    # Support <key>@<param key>.<param value>: <value>.
+    if param_names:
+        param_regex = _regex(
+            r'(.*)@({})\.([^@]+)$'.format('|'.join(param_names)),
+            re.IGNORECASE)
+        param_match = param_regex.match(key)
+        if param_match:
+            return KEY_PARAM, marked_for_extraction, key, param_match.groups()
+
+    # Support <key>@<locale regex>: <value>.
+    match = LOCALIZED_KEY_REGEX.match(key)
+    if match:
+        return KEY_LOCALE, marked_for_extraction, key, match.groups()
+    return KEY_PLAIN, marked_for_extraction, key, None
+
+
+def _params_key(params):
+    """Hashable key for the params, or None if the params cannot be keyed."""
+    if not params:
+        return ()
+    keys = []
+    for name, param in params.items():
+        key = getattr(param, 'cache_key', None) if param else False
+        if key is None:
+            return None
+        keys.append((name, key))
+    return tuple(keys)
+
+
+def copy_containers(value, memo=None):
+    """Copy the containers in the value, the other values are not copied.
+
+    Containers that are shared in the value, such as from yaml aliases, stay
+    shared in the copy.
+    """
+    value_type = type(value)
+    if value_type in (str, bytes, int, float, bool, type(None)):
+        return value
+    if memo is None:
+        memo = {}
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, abc.MutableMapping):
+        new_value = value.__class__()
+        memo[id(value)] = new_value
+        for key, item in value.items():
+            new_value[key] = copy_containers(item, memo)
+    elif isinstance(value, abc.MutableSequence):
+        new_value = value.__class__()
+        memo[id(value)] = new_value
+        new_value.extend(copy_containers(item, memo) for item in value)
+    elif isinstance(value, abc.MutableSet):
+        new_value = value.__class__()
+        memo[id(value)] = new_value
+        for item in value:
+            new_value.add(copy_containers(item, memo))
+    elif isinstance(value, tuple) and value_type is tuple:
+        new_value = tuple(copy_containers(item, memo) for item in value)
+        memo[id(value)] = new_value
+    else:
+        return value
+    return new_value
+
+
+class _Node:
+    """Container in the untag plan."""
+
+    __slots__ = ('value', 'cls', 'is_mapping', 'items', 'is_static')
+
+    def __init__(self, value, is_mapping):
+        self.value = value
+        self.cls = value.__class__
+        self.is_mapping = is_mapping
+        self.items = []
+        self.is_static = True
+
 
-class Untag:
-    """Untagging utility for locale and environment based untagging."""
+class UntagPlan:
+    """Analysed structure of data for untagging it for multiple locales.
+
+    The plan keeps a reference to the data, which should not be changed after
+    creating the plan.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._lock = threading.Lock()
+        self._variants = {}
+        self._root = self._compile(data, {})
+        if not isinstance(self._root, _Node):
+            raise TypeError('expected remappable root, not: {!r}'.format(data))
+
+    @classmethod
+    def _compile(cls, value, memo):
+        if isinstance(value, (str, bytes)):
+            return value
+        if isinstance(value, abc.Mapping):
+            items = value.items()
+        elif isinstance(value, (abc.Sequence, abc.Set)):
+            items = enumerate(value)
+        else:
+            return value
+
+        # Shared containers, such as from yaml aliases, share the same node.
+        if id(value) in memo:
+            return memo[id(value)]
+        node = _Node(value, isinstance(value, abc.Mapping))
+        memo[id(value)] = node
+        for key, item in items:
+            child = cls._compile(item, memo)
+            node.items.append((key, child))
+            if isinstance(key, str) and '@' in key:
+                node.is_static = False
+            elif isinstance(child, _Node) and not child.is_static:
+                node.is_static = False
+        return node
 
     @staticmethod
-    def untag(data, locale_identifier=None, params=None):
+    def _build(node, new_parent, new_items):
+        if node.is_mapping:
+            new_parent.update(new_items)
+            return new_parent
+        values = [value for _, value in new_items]
+        try:
+            if isinstance(new_parent, abc.Set):
+                new_parent.update(values)
+            else:
+                new_parent.extend(values)
+        except AttributeError:
+            # Immutable containers, such as tuples.
+            return node.cls(values)
+        return new_parent
+
+    def get_untagged(self, locale_identifier=None, params=None,
+                     locale_identifiers=None):
+        """Untagged data for a locale from the shared untagged data.
+
+        When the locale has not been untagged yet, the other locale
+        identifiers, or a function returning them, are untagged in the same
+        pass. Each caller gets its own copy of the containers so the data can
+        be changed. Params without a `cache_key` are untagged without sharing.
+        """
+        locale_identifier = str(locale_identifier)
+        params_key = _params_key(params)
+        if params_key is None:
+            return self.untag(locale_identifier, params=params)
+        variants = self._variants.get(params_key)
+        if variants is not None and locale_identifier in variants:
+            return copy_containers(variants[locale_identifier])
+        with self._lock:
+            variants = self._variants.get(params_key)
+            if variants is None:
+                if len(self._variants) >= MAX_SHARED_PARAMS:
+                    self._variants = {}
+                variants = {}
+            if locale_identifier not in variants:
+                if callable(locale_identifiers):
+                    locale_identifiers = locale_identifiers()
+                pending = [locale_identifier] + [
+                    str(identifier) for identifier in locale_identifiers or ()
+                    if str(identifier) not in variants]
+                variants = dict(variants)
+                variants.update(self.untag_locales(
+                    pending, params=params, share=True))
+                self._variants[params_key] = variants
+        return copy_containers(variants[locale_identifier])
+
+    def untag(self, locale_identifier=None, params=None):
         """Untags fields, handling translation priority."""
-        paths_to_keep_tagged = set()
         locale_identifier = str(locale_identifier)
+        return self.untag_locales(
+            [locale_identifier], params=params)[locale_identifier]
+
+    def untag_locales(self, locale_identifiers, params=None, share=False):
+        """Untags fields for multiple locales in one pass.
+
+        Returns a dict of the locale identifiers to the untagged data.
+        Containers without tagged keys are copied once and the copy is shared
+        by all of the locales, or the containers from the data of the plan are
+        used when sharing.
+        """
+        data = self.data
+        locale_identifiers = list(OrderedDict.fromkeys(
+            str(identifier) for identifier in locale_identifiers))
+        indexes = range(len(locale_identifiers))
+        param_names = tuple(params.keys()) if params else ()
+
+        # Untagged containers for each locale by the node.
+        registry = {}
+
+        # Marked lists are found the same way for all of the locales.
+        paths_to_keep_tagged = set()
 
         # When untagging the order of the keys isn't consistent. Sometimes the
         # tagged value is found but then is overwritten by the original value
         # since it is processed after the tagged version. Need to keep track of
         # untagged keys to make sure that they are not overwritten by the original.
-        untagged_key_paths = set()
+        all_untagged_key_paths = [set() for _ in indexes]
 
         # pylint: disable=too-many-return-statements
-        def _visit(path, key, value):
-            """Function for each key and value in the data."""
+        def _visit(index, path, key, value):
+            """Untag the key and value of a container item for a locale."""
             if not isinstance(key, str):
                 return key, value
+            untagged_key_paths = all_untagged_key_paths[index]
+            if '@' not in key:
+                if (path, key) in untagged_key_paths:
+                    return False
+                return key, value
 
-            if key.endswith('@#'):
-                # Translation Comment.
+            key_type, marked_for_extraction, untagged_key, groups = _parse_key(
+                key, param_names)
+            if key_type == KEY_COMMENT:
                 return False
 
-            marked_for_extraction = key.endswith('@')
-            if marked_for_extraction:
-                if isinstance(value, list):
-                    paths_to_keep_tagged.add((path, key))
-                key = key[:-1]
-
-            # Support <key>@<param key>.<param value>: <value>.
-            if params:
-                param_regex = re.compile(
-                    r'(.*)@({})\.([^@]+)$'.format('|'.join(params.keys())),
-                    re.IGNORECASE)
-                param_match = param_regex.match(key)
-                if param_match:
-                    untagged_key, param_key, param_value = param_match.groups()
-
-                    # If the key has already been untagged, don't overwrite.
-                    if (path, untagged_key) in untagged_key_paths:
-                        return False
-
-                    if not params[param_key]:
-                        return False
-                    result = params[param_key](
-                        data, untagged_key, param_key, param_value, value,
-                        locale_identifier=locale_identifier)
-                    if result is not False:
-                        # Don't let the original key overwrite the new value.
-                        untagged_key_paths.add((path, untagged_key))
-                    return result
-
-            # Support <key>@<locale regex>: <value>.
-            match = LOCALIZED_KEY_REGEX.match(key)
-            if not match:
-                if (path, key) in untagged_key_paths:
+            if marked_for_extraction and isinstance(value, list):
+                paths_to_keep_tagged.add((path, key))
+
+            locale_identifier = locale_identifiers[index]
+            if key_type == KEY_PARAM:
+                untagged_key, param_key, param_value = groups
+
+                # If the key has already been untagged, don't overwrite.
+                if (path, untagged_key) in untagged_key_paths:
                     return False
-                return key, value
+
+                if not params[param_key]:
+                    return False
+                result = params[param_key](
+                    data, untagged_key, param_key, param_value, value,
+                    locale_identifier=locale_identifier)
+                if result is True:
+                    return key, value
+                if result is not False:
+                    # Don't let the original key overwrite the new value.
+                    untagged_key_paths.add((path, untagged_key))
+                return result
+
+            if key_type == KEY_PLAIN:
+                if (path, untagged_key) in untagged_key_paths:
+                    return False
+                return untagged_key, value
 
             if not locale_identifier:
                 return False
 
-            untagged_key, locale_from_key = match.groups()
+            untagged_key, locale_from_key = groups
 
             # If the key has already been untagged, don't overwrite.
             if (path, untagged_key) in untagged_key_paths:
@@ -84,7 +301,7 @@ class Untag:
             # if marked_for_extraction:
             #     return False
 
-            locale_regex = re.compile(
+            locale_regex = _regex(
                 r'^{}$'.format(locale_from_key), re.IGNORECASE)
             if not locale_regex.match(locale_identifier):
                 return False
@@ -94,29 +311,126 @@ class Untag:
 
             return untagged_key, value
 
-        # Backwards compatibility for https://github.com/grow/grow/issues/95
-        def _remap_exit(path, key, old_parent, new_parent, new_items):
-            resp = iterutils.default_exit(path, key, old_parent,
-                                          new_parent, new_items)
-            if paths_to_keep_tagged and isinstance(resp, dict):
-                updated_values = {}
-                for sub_key, value in resp.items():
-                    if not isinstance(value, list):
-                        continue
-                    new_key = '{}@'.format(sub_key)
-                    updated_values[new_key] = value
-                resp.update(updated_values)
-                try:
-                    paths_to_keep_tagged.remove((path, key))
-                except KeyError:
-                    pass
-            return resp
-
-        return iterutils.remap(data, visit=_visit, exit=_remap_exit)
+        def _copy(node):
+            """Copy a container without any tagged keys for all locales."""
+            if share:
+                return node.value
+            new_parent = node.cls()
+            registry[id(node)] = [new_parent] * len(indexes)
+            new_items = []
+            for key, child in node.items:
+                if isinstance(child, _Node):
+                    values = registry.get(id(child))
+                    child = _copy(child) if values is None else values[0]
+                new_items.append((key, child))
+            new_parent = self._build(node, new_parent, new_items)
+            registry[id(node)] = [new_parent] * len(indexes)
+            return new_parent
+
+        def _untag(node, path, key, items_path):
+            """Untag a container, the path is the path of the parent."""
+            new_parents = [node.cls() for _ in indexes]
+            registry[id(node)] = new_parents
+            all_new_items = [[] for _ in indexes]
+            for item_key, child in node.items:
+                if isinstance(child, _Node):
+                    values = registry.get(id(child))
+                    if values is None:
+                        if child.is_static and not paths_to_keep_tagged:
+                            values = [_copy(child)] * len(indexes)
+                        else:
+                            values = _untag(
+                                child, items_path, item_key,
+                                items_path + (item_key,))
+                else:
+                    values = [child] * len(indexes)
+                for index in indexes:
+                    item = _visit(index, items_path, item_key, values[index])
+                    if item is not False:
+                        all_new_items[index].append(item)
+
+            keep_tagged = bool(paths_to_keep_tagged)
+            for index in indexes:
+                new_parent = self._build(
+                    node, new_parents[index], all_new_items[index])
+
+                # Backwards compatibility for https://github.com/grow/grow/issues/95
+                if keep_tagged and isinstance(new_parent, dict):
+                    updated_values = {}
+                    for sub_key, value in new_parent.items():
+                        if not isinstance(value, list):
+                            continue
+                        new_key = '{}@'.format(sub_key)
+                        updated_values[new_key] = value
+                    new_parent.update(updated_values)
+                new_parents[index] = new_parent
+            if keep_tagged:
+                paths_to_keep_tagged.discard((path, key))
+
+            registry[id(node)] = new_parents
+            return new_parents
+
+        return OrderedDict(zip(
+            locale_identifiers, _untag(self._root, (), None, ())))
+
+
+class Untag:
+    """Untagging utility for locale and environment based untagging."""
+
+    @staticmethod
+    def has_tags(data):
+        """Does the data contain any keys that are changed by untagging?"""
+        seen = set()
+        pending = [data]
+        while pending:
+            value = pending.pop()
+            value_type = type(value)
+            if value_type is dict:
+                if id(value) in seen:
+                    continue
+                seen.add(id(value))
+                for key in value:
+                    if isinstance(key, str) and '@' in key:
+                        return True
+                pending.extend(value.values())
+            elif value_type is list:
+                if id(value) in seen:
+                    continue
+                seen.add(id(value))
+                pending.extend(value)
+            elif value_type in (str, bytes, int, float, bool, type(None)):
+                continue
+            elif isinstance(value, abc.Mapping):
+                if id(value) in seen:
+                    continue
+                seen.add(id(value))
+                for key in value:
+                    if isinstance(key, str) and '@' in key:
+                        return True
+                pending.extend(value.values())
+            elif isinstance(value, (abc.Sequence, abc.Set)) and not isinstance(
+                    value, (str, bytes)):
+                if id(value) in seen:
+                    continue
+                seen.add(id(value))
+                pending.extend(value)
+        return False
+
+    @staticmethod
+    def untag(data, locale_identifier=None, params=None):
+        """Untags fields, handling translation priority."""
+        return UntagPlan(data).untag(
+            locale_identifier=locale_identifier, params=params)
 
 
 class UntagParam:
-    """Untagging param for complex untagging."""
+    """Untagging param for complex untagging.
+
+    Params with a hashable `cache_key` for their configuration allow the
+    untagged data to be shared between documents.
+    """
+
+    cache_key = None
 
     def __call__(self, data, untagged_key, param_key, param_value, value, locale_identifier=None):
         raise NotImplementedError()
@@ -128,11 +442,16 @@ class UntagParamRegex:
     def __init__(self, value):
         self.value = value
 
+    @property
+    def cache_key(self):
+        """Key of the param configuration."""
+        return ('regex', self.value)
+
     def __call__(self, data, untagged_key, param_key, param_value, value, locale_identifier=None):
         if not self.value:
             return False
-        value_regex = r'^{}$'.format(param_value)
-        if not re.match(value_regex, self.value, re.IGNORECASE):
+        value_regex = _regex(r'^{}$'.format(param_value), re.IGNORECASE)
+        if not value_regex.match(self.value):
             return False
         return untagged_key, value
 
@@ -147,6 +466,16 @@ class UntagParamLocaleRegex:
     def __init__(self, podspec_data=None, collection_data=None):
         self.podspec_data = podspec_data or {}
         self.collection_data = collection_data or {}
+        self._cache_key = None
+
+    @property
+    def cache_key(self):
+        """Key of the param configuration."""
+        if self._cache_key is None:
+            self._cache_key = ('locale_regex', json.dumps(
+                [self.podspec_data, self.collection_data], sort_keys=True,
+                default=str))
+        return self._cache_key
 
     def __call__(self, data, untagged_key, param_key, param_value, value, locale_identifier=None):
         podspec_value = self.podspec_data.get(param_value, None)
@@ -160,8 +489,8 @@ class UntagParamLocaleRegex:
         if not isinstance(regex_value, str):
             regex_value = '|'.join(regex_value)
 
-        value_regex = r'^{}$'.format(regex_value)
-        if not re.match(value_regex, locale_identifier, re.IGNORECASE):
+        value_regex = _regex(r'^{}$'.format(regex_value), re.IGNORECASE)
+        if not value_regex.match(locale_identifier):
             return False
         return untagged_key, value
 
@@ -652,6 +652,146 @@ class UntagTestCase(unittest.TestCase):
     #         'foo': 'base',
     #     }, untag_func(fields, locale_identifier='fr'))
 
+    def test_untag_plan(self):
+        """Untag plans are reused for multiple locales."""
+        fields = {
+            'title': 'foo',
+            'title@fr': 'bar',
+            'nested': {
+                'list': ['value1'],
+            },
+            'shared@env.prod': 'baz',
+        }
+        params = {
+            'env': untag.UntagParamRegex('prod'),
+        }
+        plan = untag.UntagPlan(copy.deepcopy(fields))
+        for locale in ('en', 'fr', None):
+            self.assertEqual(
+                untag.Untag.untag(fields, locale_identifier=locale, params=params),
+                plan.untag(locale_identifier=locale, params=params))
+
+        # Untagged data is not shared with the plan or other untagged data.
+        untagged = plan.untag(locale_identifier='fr')
+        untagged['nested']['list'].append('value2')
+        self.assertEqual(['value1'], plan.data['nested']['list'])
+        self.assertEqual(
+            ['value1'], plan.untag(locale_identifier='fr')['nested']['list'])
+
+    def test_untag_plan_shared(self):
+        """Shared containers stay shared when untagged."""
+        shared = {'foo@fr': 'bar', 'foo': 'baz'}
+        untagged = untag.UntagPlan({
+            'first': shared,
+            'second': shared,
+        }).untag(locale_identifier='fr')
+        self.assertEqual({'foo': 'bar'}, untagged['first'])
+        self.assertIs(untagged['first'], untagged['second'])
+
+    def test_untag_locales(self):
+        """Untag multiple locales in one pass."""
+        fields = {
+            'title': 'foo',
+            'title@fr': 'bar',
+            'nested': {
+                'list': ['value1'],
+            },
+            'list@': ['value2'],
+        }
+        plan = untag.UntagPlan(fields)
+        untagged = plan.untag_locales(['en', 'fr', None])
+        self.assertEqual(['en', 'fr', 'None'], list(untagged.keys()))
+        for locale in ('en', 'fr', None):
+            self.assertEqual(
+                untag.Untag.untag(fields, locale_identifier=locale),
+                untagged[str(locale)])
+
+        # Containers without tags are shared between the locales.
+        untagged = plan.untag_locales(['en', 'fr'])
+        self.assertIs(untagged['en']['nested'], untagged['fr']['nested'])
+        self.assertIsNot(fields['nested'], untagged['en']['nested'])
+        untagged = plan.untag_locales(['en', 'fr'], share=True)
+        self.assertIs(fields['nested'], untagged['en']['nested'])
+
+    def test_get_untagged(self):
+        """Shared untagged data is untagged once for all of the locales."""
+        plan = untag.UntagPlan({
+            'title': 'foo',
+            'title@fr': 'bar',
+            'title@env.prod': 'baz',
+        })
+        params = {
+            'env': untag.UntagParamRegex('dev'),
+        }
+        locale_calls = []
+
+        def _locales():
+            locale_calls.append(True)
+            return ['de', 'fr']
+
+        fr_untagged = plan.get_untagged(
+            'fr', params=params, locale_identifiers=_locales)
+        self.assertEqual({'title': 'bar'}, fr_untagged)
+        self.assertEqual(fr_untagged, plan.get_untagged(
+            'fr', params=params, locale_identifiers=_locales))
+        self.assertEqual({'title': 'foo'}, plan.get_untagged(
+            'de', params=params, locale_identifiers=_locales))
+        self.assertEqual(1, len(locale_calls))
+
+        # Different params are untagged separately.
+        self.assertEqual({'title': 'baz'}, plan.get_untagged(
+            'de', params={'env': untag.UntagParamRegex('prod')}))
+
+        # Params without a cache key are not shared.
+        params = {
+            'env': lambda *args, **kwargs: False,
+        }
+        self.assertIsNot(
+            plan.get_untagged('fr', params=params),
+            plan.get_untagged('fr', params=params))
+
+    def test_get_untagged_changes(self):
+        """Changes to the untagged data are not shared."""
+        shared = ['value1']
+        plan = untag.UntagPlan({
+            'title@fr': 'bar',
+            'nested': {'list': shared, 'alias': shared},
+        })
+        fr_untagged = plan.get_untagged('fr', locale_identifiers=['de', 'it'])
+        self.assertIs(
+            fr_untagged['nested']['list'], fr_untagged['nested']['alias'])
+        fr_untagged['nested']['list'].append('value2')
+        fr_untagged['nested']['key'] = 'value'
+        for locale in ('de', 'fr', 'it'):
+            self.assertEqual(
+                {'list': ['value1'], 'alias': ['value1']},
+                plan.get_untagged(locale)['nested'])
+        self.assertEqual(['value1'], plan.data['nested']['list'])
+
+    def test_copy_containers(self):
+        """Containers are copied and other values are shared."""
+        value = object()
+        data = {'list': [value, {'set': {1}}], 'tuple': ([],)}
+        copied = untag.copy_containers(data)
+        self.assertEqual(data, copied)
+        self.assertIsNot(data['list'], copied['list'])
+        self.assertIsNot(data['list'][1]['set'], copied['list'][1]['set'])
+        self.assertIsNot(data['tuple'][0], copied['tuple'][0])
+        self.assertIs(value, copied['list'][0])
+
+    def test_has_tags(self):
+        """Check for keys that are changed by untagging."""
+        self.assertFalse(untag.Untag.has_tags({
+            'foo': [{'bar': 'baz'}],
+            1: 'qux',
+        }))
+        self.assertTrue(untag.Untag.has_tags({
+            'foo': [{'bar@de': 'baz'}],
+        }))
+        self.assertTrue(untag.Untag.has_tags({
+            'foo@': 'bar',
+        }))
+
     def test_untag_translation_comment(self):
         """Untag ignored translation comments."""
         untag_func = untag.Untag.untag
@@ -20,6 +20,7 @@ import bs4
 import git
 import html2text
 import translitcodec  # pylint: disable=unused-import
+from grow.cache import cache_stats
 from grow.common import structures
 from grow.common import untag
 from grow.common import yaml_utils
@@ -131,19 +132,29 @@ def validate_name(name):
 
 class memoize:
 
+    # All of the memoized functions, for reporting the cache usage.
+    instances = []
+
     def __init__(self, func):
         self.func = func
         self.cache = {}
+        self.stats = cache_stats.CacheStats()
+        memoize.instances.append(self)
 
     def __call__(self, *args, **kwargs):
         key = (args, frozenset(list(kwargs.items())))
         try:
-            return self.cache[key]
+            value = self.cache[key]
+            self.stats.hit()
+            return value
         except KeyError:
+            self.stats.miss()
             value = self.func(*args, **kwargs)
             self.cache[key] = value
+            self.stats.insert()
             return value
         except TypeError:
+            self.stats.miss()
             return self.func(*args, **kwargs)
 
     def __repr__(self):
@@ -155,8 +166,22 @@ class memoize:
         return fn
 
     def _reset(self):
+        self.stats.invalidate(len(self.cache))
         self.cache = {}
 
+    @classmethod
+    def export_stats(cls):
+        """Usage statistics for the memoized functions that have been used."""
+        exported = {}
+        for instance in cls.instances:
+            stats = instance.stats
+            if not stats.hits and not stats.misses:
+                continue
+            name = '{}.{}'.format(
+                instance.func.__module__, instance.func.__qualname__)
+            exported[name] = stats.export(entries=len(instance.cache))
+        return exported
+
 
 class cached_property(property):
     """A decorator that converts a function into a lazy property.  The
@@ -454,6 +479,8 @@ def load_yaml(*args, **kwargs):
     doc = kwargs.pop('doc', None)
     untag_params = kwargs.pop('untag_params', None)
     simple_loader = kwargs.pop('simple_loader', False)
+    cache_key = kwargs.pop('cache_key', None)
+    untag_locales = kwargs.pop('untag_locales', None)
     default_locale = None
     if doc:
         default_locale = doc._locale_kwarg or doc.collection.default_locale
@@ -465,7 +492,21 @@ def load_yaml(*args, **kwargs):
     else:
         loader = make_yaml_loader(
             pod, doc=doc, locale=locale, untag_params=untag_params)
-    contents = yaml.load(*args, Loader=loader, **kwargs) or {}
+    if pod and cache_key and untag_params:
+        # Yaml without tags is untagged for all of the locales in one pass
+        # from a shared plan, the untagged data is shared between the docs.
+        plan = pod.podcache.yaml_cache.get_untag_plan(cache_key, args[0])
+        if plan is not None:
+            return plan.get_untagged(
+                locale, params=untag_params, locale_identifiers=untag_locales)
+    contents = None
+    if pod and cache_key:
+        # Yaml without tags does not depend on the loader and can be cached.
+        contents = pod.podcache.yaml_cache.get_content(cache_key, args[0])
+    if contents is None:
+        contents = yaml.load(*args, Loader=loader, **kwargs) or {}
+        if pod and cache_key:
+            pod.podcache.yaml_cache.add_content(cache_key, args[0], contents)
     if not untag_params:
         return contents
     return untag.Untag.untag(
@@ -129,6 +129,8 @@ class BaseDestination:
     stats_basename = 'stats.proto.json'
     threaded = True
     batch_writes = False
+    # Write the changed documents while streaming the diff when possible.
+    stream_writes = False
     success = False
 
     def __init__(self, config, name='default'):
@@ -180,7 +182,8 @@ class BaseDestination:
 
     def export_profile_report(self):
         """Write the results of the profiling timers."""
-        report = profile_report.ProfileReport(self.pod.profile)
+        report = profile_report.ProfileReport(
+            self.pod.profile, cache_stats=self.pod.podcache.export_stats())
         file_name = '{}profile.json'.format(self.control_dir)
         self.pod.write_file(file_name, json.dumps(report.export()))
         logging.info('Profiling data exported to {}'.format(file_name))
@@ -276,12 +279,13 @@ class BaseDestination:
     def login(self, account, reauth=False):
         pass
 
-    def dump(self, pod, pod_paths=None, use_threading=True, source_dir=None):
+    def dump(self, pod, pod_paths=None, use_threading=True, source_dir=None,
+             process_count=None):
         """Dump the contents of the pod."""
         pod.set_env(self.get_env())
         return pod.dump(
             pod_paths=pod_paths, use_threading=use_threading,
-            source_dir=source_dir)
+            source_dir=source_dir, process_count=process_count)
 
     def deploy(self, content_generator, stats=None, repo=None, dry_run=False,
                confirm=False, test=True, is_partial=False, require_translations=False):
@@ -294,8 +298,12 @@ class BaseDestination:
                 deployed_index = self._get_remote_index()
                 if require_translations:
                     self.pod.enable(self.pod.FEATURE_TRANSLATION_STATS)
+                # Writing while diffing skips the confirmation and checks.
+                streamed_writes = (self.stream_writes and not self.batch_writes
+                                   and not (dry_run or confirm or require_translations))
                 diff, new_index, paths_to_rendered_doc = indexes.Diff.stream(
-                    deployed_index, content_generator, repo=repo, is_partial=is_partial)
+                    deployed_index, content_generator, repo=repo, is_partial=is_partial,
+                    write_func=self.write_file if streamed_writes else None)
                 self._diff = diff
                 if indexes.Diff.is_empty(diff):
                     logging.info('Finished with no diffs since the last build.')
@@ -315,7 +323,8 @@ class BaseDestination:
                 indexes.Diff.apply(
                     diff, paths_to_rendered_doc, write_func=self.write_file,
                     batch_write_func=self.write_files, delete_func=self.delete_file,
-                    threaded=self.threaded, batch_writes=self.batch_writes)
+                    threaded=self.threaded, batch_writes=self.batch_writes,
+                    streamed_writes=streamed_writes)
                 self.write_control_file(
                     self.index_basename, indexes.Index.to_string(new_index))
                 if stats is not None:
@@ -25,6 +25,7 @@ class LocalDestination(base.BaseDestination):
     KIND = 'local'
     Config = Config
     storage = file_storage.FileStorage
+    stream_writes = True
 
     def __str__(self):
         return os.path.abspath(os.path.join(self.out_dir))
@@ -47,6 +48,17 @@ class LocalDestination(base.BaseDestination):
             else:
                 raise
 
+    @staticmethod
+    def _unlink(out_path, shared_only=False):
+        """Remove an existing output file, or only when hardlinked."""
+        try:
+            if shared_only and os.stat(out_path).st_nlink <= 1:
+                return
+            os.unlink(out_path)
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+
     def write_file(self, rendered_doc):
         path = rendered_doc.path
         out_path = os.path.join(self.out_dir, path.lstrip('/'))
@@ -59,8 +71,24 @@ class LocalDestination(base.BaseDestination):
                     pass
                 else:
                     raise
+            # Reused output from a previous build is already in place.
+            if (os.path.exists(out_path)
+                    and os.path.samefile(rendered_doc.file_path, out_path)):
+                return
+            # Link spooled files into place instead of copying the content.
+            # Other files, like pod static files, are copied (using sendfile
+            # when available) so the output is not linked to the source.
+            self._unlink(out_path)
+            if rendered_doc.tmp_dir:
+                try:
+                    os.link(rendered_doc.file_path, out_path)
+                    return
+                except OSError:
+                    pass
             shutil.copyfile(rendered_doc.file_path, out_path)
         else:
+            # Writing into a hardlinked file would change the other links.
+            self._unlink(out_path, shared_only=True)
             self.storage.write(out_path, rendered_doc.read())
 
     def prelaunch(self, dry_run=False):
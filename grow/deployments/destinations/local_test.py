@@ -1,5 +1,8 @@
-from . import local
+import os
+import tempfile
 import unittest
+from grow.rendering import rendered_document
+from . import local
 
 
 class LocalDestinationTestCase(unittest.TestCase):
@@ -10,6 +13,26 @@ class LocalDestinationTestCase(unittest.TestCase):
         # Weakly verify out_dir is expanded.
         self.assertNotIn('~', destination.out_dir)
 
+    def test_write_file_spooled(self):
+        out_dir = tempfile.mkdtemp()
+        tmp_dir = tempfile.mkdtemp()
+        destination = local.LocalDestination(local.Config(out_dir=out_dir))
+        for path in ('/foo/index.html', '/bar/index.html'):
+            rendered_doc = rendered_document.RenderedDocument(path, 'same')
+            rendered_doc.spool(tmp_dir)
+            destination.write_file(rendered_doc)
+        foo_path = os.path.join(out_dir, 'foo/index.html')
+        bar_path = os.path.join(out_dir, 'bar/index.html')
+        self.assertTrue(os.path.samefile(foo_path, bar_path))
+
+        # Writing content does not change the other linked files.
+        destination.write_file(
+            rendered_document.RenderedDocument('/foo/index.html', 'changed'))
+        with open(foo_path) as foo_file:
+            self.assertEqual('changed', foo_file.read())
+        with open(bar_path) as bar_file:
+            self.assertEqual('same', bar_file.read())
+
 
 if __name__ == '__main__':
     unittest.main()
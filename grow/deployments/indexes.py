@@ -193,7 +193,12 @@ class Diff:
 
     @classmethod
     def apply(cls, message, paths_to_rendered_doc, write_func, batch_write_func, delete_func,
-              threaded=True, batch_writes=False):
+              threaded=True, batch_writes=False, streamed_writes=False):
+        """Apply the diff using the write and delete functions.
+
+        When the adds and edits were already written while streaming the
+        diff (`streamed_writes`) only the deletes are applied.
+        """
         if pool is None:
             text = 'Deployment is unavailable in this environment.'
             raise common_utils.UnavailableError(text)
@@ -202,7 +207,8 @@ class Diff:
         if threaded:
             thread_pool = pool.ThreadPool(cls.POOL_SIZE)
         diff = message
-        num_files = len(diff.adds) + len(diff.edits) + len(diff.deletes)
+        writes = [] if streamed_writes else diff.adds + diff.edits
+        num_files = len(writes) + len(diff.deletes)
         text = 'Deploying: %(value)d/{} (in %(time_elapsed).9s)'
         widgets = [progressbar.FormatLabel(text.format(num_files))]
         progress = progressbar_non.create_progressbar(
@@ -220,10 +226,7 @@ class Diff:
 
         if batch_writes:
             writes_paths_to_rendered_doc = {}
-            for file_message in diff.adds:
-                writes_paths_to_rendered_doc[file_message.path] = \
-                    paths_to_rendered_doc[file_message.path]
-            for file_message in diff.edits:
+            for file_message in writes:
                 writes_paths_to_rendered_doc[file_message.path] = \
                     paths_to_rendered_doc[file_message.path]
             deletes_paths = [
@@ -236,13 +239,7 @@ class Diff:
             progress.start()
             threaded_args = []
 
-            for file_message in diff.adds:
-                rendered_doc = paths_to_rendered_doc[file_message.path]
-                threaded_args.append({
-                    'func': write_func,
-                    'args': (rendered_doc,),
-                })
-            for file_message in diff.edits:
+            for file_message in writes:
                 rendered_doc = paths_to_rendered_doc[file_message.path]
                 threaded_args.append({
                     'func': write_func,
@@ -275,18 +272,27 @@ class Diff:
             progress.finish()
 
         if apply_errors:
-            for error in apply_errors:
-                print(error.message)
-                print(error.err)
-                traceback.print_tb(error.err_tb)
-                print('')
-            text = 'There were {} errors during deployment.'
-            raise DeploymentErrors(text.format(
-                len(apply_errors)), apply_errors)
+            cls._raise_errors(apply_errors)
+
+    @staticmethod
+    def _raise_errors(deploy_errors):
+        for error in deploy_errors:
+            print(error.message)
+            print(error.err)
+            traceback.print_tb(error.err_tb)
+            print('')
+        text = 'There were {} errors during deployment.'
+        raise DeploymentErrors(text.format(
+            len(deploy_errors)), deploy_errors)
 
     @classmethod
-    def stream(cls, theirs, content_generator, repo=None, is_partial=False):
-        """Render the content and create a diff passing on only the changed content."""
+    def stream(cls, theirs, content_generator, repo=None, is_partial=False,
+               write_func=None):
+        """Render the content and create a diff passing on only the changed content.
+
+        When a write function is given the added and edited documents are
+        written as soon as they are diffed instead of being kept for `apply`.
+        """
         index = Index.create()
         if repo:
             Index.add_repo(index, repo)
@@ -303,6 +309,20 @@ class Diff:
         for file_message in theirs.files:
             their_paths_to_shas[file_message.path] = file_message.sha
 
+        write_errors = []
+
+        def _changed(path, rendered_doc):
+            if not write_func:
+                paths_to_rendered_doc[path] = rendered_doc
+                return
+            try:
+                write_func(rendered_doc)
+            # pylint: disable=broad-except
+            except Exception as err:
+                _, _, err_tb = sys.exc_info()
+                write_errors.append(DeploymentError(
+                    "Error deploying {}".format(path), err, err_tb))
+
         for rendered_doc in content_generator:
             path = rendered_doc.path
             index_paths_to_shas[path] = Index.add_file(index, rendered_doc).sha
@@ -320,13 +340,16 @@ class Diff:
                     file_message.deployed = theirs.deployed
                     file_message.deployed_by = theirs.deployed_by
                     diff.edits.append(file_message)
-                    paths_to_rendered_doc[path] = rendered_doc
+                    _changed(path, rendered_doc)
                 del their_paths_to_shas[path]
             else:
                 file_message = messages.FileMessage()
                 file_message.path = path
                 diff.adds.append(file_message)
-                paths_to_rendered_doc[path] = rendered_doc
+                _changed(path, rendered_doc)
+
+        if write_errors:
+            cls._raise_errors(write_errors)
 
         # When doing partial diffs we do not have enough information to know
         # which files have been deleted.
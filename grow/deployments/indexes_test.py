@@ -37,6 +37,27 @@ class IndexTest(unittest.TestCase):
         diff = indexes.Diff.create(my_index, their_index)
         self.assertFilePathsEqual(expected.adds, diff.adds)
 
+    def test_stream_write_func(self):
+        their_index = indexes.Index.create({
+            '/file2.txt': rendered_document.RenderedDocument('/file2.txt', 'change'),
+            '/foo/file.txt': rendered_document.RenderedDocument('/foo/file.txt', 'test'),
+        })
+        content = [
+            rendered_document.RenderedDocument('/file.txt', 'test'),
+            rendered_document.RenderedDocument('/file2.txt', 'test'),
+            rendered_document.RenderedDocument('/foo/file.txt', 'test'),
+        ]
+        written = []
+        diff, _, paths_to_rendered_doc = indexes.Diff.stream(
+            their_index, iter(content),
+            write_func=lambda doc: written.append(doc.path))
+        self.assertEqual(['/file.txt', '/file2.txt'], written)
+        self.assertEqual({}, paths_to_rendered_doc)
+        self.assertFilePathsEqual(
+            [messages.FileMessage(path='/file.txt')], diff.adds)
+        self.assertFilePathsEqual(
+            [messages.FileMessage(path='/file2.txt')], diff.edits)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -18,8 +18,12 @@ class DocumentFields:
     def __init__(self, data, locale_identifier=None, params=None):
         self._locale_identifier = locale_identifier
         self._params = params
-        self._data = untag.Untag.untag(
-            data, locale_identifier, params=params)
+        if untag.Untag.has_tags(data):
+            self._data = untag.Untag.untag(
+                data, locale_identifier, params=params)
+        else:
+            # Untagging only copies the containers of data without tags.
+            self._data = untag.copy_containers(data)
 
     def __len__(self):
         return len(self._data)
@@ -52,6 +52,26 @@ class DocumentFieldsTestCase(unittest.TestCase):
         })
         self.assertEqual('bbq', doc_fields['foo'])
 
+    def test_shared(self):
+        data = {
+            'foo': {'bar': 'baz'},
+            'qux@de': 'quux',
+        }
+        doc_fields = document_fields.DocumentFields(data, 'de')
+        self.assertEqual('quux', doc_fields['qux'])
+        self.assertIsNot(data['foo'], doc_fields['foo'])
+
+        # Containers of data without tags are copied.
+        data = {
+            'foo': {'bar': ['baz']},
+        }
+        doc_fields = document_fields.DocumentFields(data, 'de')
+        self.assertEqual(data, doc_fields._data)
+        doc_fields['foo']['bar'].append('qux')
+        self.assertEqual(['baz'], data['foo']['bar'])
+        doc_fields.update({'foo': 'bar'})
+        self.assertEqual({'bar': ['baz']}, data['foo'])
+
 
 if __name__ == '__main__':
     unittest.main()
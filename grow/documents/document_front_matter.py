@@ -2,8 +2,8 @@
 Parsing and manipulation of front matter elements of a document.
 """
 
-import collections
 import re
+from collections import abc
 import yaml
 from grow.common import untag
 from grow.common import utils
@@ -17,7 +17,7 @@ CONVERT_MESSAGE = """Document contains too many parts: {}
 def _update_deep(orig_dict, new_dict):
     for k in new_dict:
         if (k in orig_dict and isinstance(orig_dict[k], dict)
-                and isinstance(new_dict[k], collections.Mapping)):
+                and isinstance(new_dict[k], abc.Mapping)):
             _update_deep(orig_dict[k], new_dict[k])
         else:
             orig_dict[k] = new_dict[k]
@@ -69,7 +69,7 @@ class DocumentFrontMatter:
                 raw_locale_front_matter = locale_doc.format.front_matter.export()
                 if raw_locale_front_matter:
                     _update_deep(self.data, self._load_yaml(
-                        raw_locale_front_matter))
+                        raw_locale_front_matter, cache_key=locale_path))
 
         if raw_front_matter:
             # There should be no boundary separators in the front-matter.
@@ -83,17 +83,23 @@ class DocumentFrontMatter:
                 self._doc.raw_content, pod_path=self._doc.pod_path)
 
         if self._raw_front_matter:
-            new_data = self._load_yaml(self._raw_front_matter)
+            new_data = self._load_yaml(
+                self._raw_front_matter, cache_key=self._doc.pod_path)
             if not isinstance(new_data, dict):
                 raise BadFormatError(
                     'Front matter needs to be a dictionary: {} <{}>'.format(
                         self._doc.pod_path, type(new_data).__name__))
             _update_deep(self.data, new_data)
 
-    def _load_yaml(self, raw_yaml):
+    def _untag_locales(self):
+        """Locales of the collection to untag the front matter for at once."""
+        return self._doc.collection.locales
+
+    def _load_yaml(self, raw_yaml, cache_key=None):
         try:
             return utils.load_yaml(
-                raw_yaml, doc=self._doc, pod=self._doc.pod,
+                raw_yaml, doc=self._doc, pod=self._doc.pod, cache_key=cache_key,
+                untag_locales=self._untag_locales,
                 untag_params={
                     'env': untag.UntagParamRegex(self._doc.pod.env.name),
                     'locale': untag.UntagParamLocaleRegex.from_pod(
@@ -650,6 +650,37 @@ class DocumentsTestCase(unittest.TestCase):
         expected = ['/de/page/', '/en/page/']
         self.assertEqual(expected, paths)
 
+    def test_locale_fields_changes(self):
+        """Changes to the fields of a locale do not change other locales."""
+        pod = testing.create_pod()
+        pod.write_yaml('/podspec.yaml', {})
+        pod.write_yaml('/content/pages/_blueprint.yaml', {
+            '$path': '/{base}/',
+            '$view': '/views/base.html',
+            '$localization': {
+                'path': '/{locale}/{base}/',
+                'locales': ['de', 'fr', 'it'],
+            },
+        })
+        pod.write_yaml('/content/pages/page.yaml', {
+            'nested': {'items': ['foo']},
+        })
+        # The untagged fields are shared once the yaml has been cached.
+        de_doc = pod.get_doc('/content/pages/page.yaml', locale='de')
+        self.assertEqual(['foo'], de_doc.fields['nested']['items'])
+        fr_doc = pod.get_doc('/content/pages/page.yaml', locale='fr')
+        fr_doc.fields['nested']['items'].append('bar')
+        self.assertEqual(['foo', 'bar'], fr_doc.fields['nested']['items'])
+        for locale in ('de', 'it'):
+            doc = pod.get_doc('/content/pages/page.yaml', locale=locale)
+            self.assertEqual(['foo'], doc.fields['nested']['items'])
+
+        pod.podcache.document_cache.reset()
+        pod.podcache.collection_cache.reset()
+        for locale in ('de', 'fr', 'it'):
+            doc = pod.get_doc('/content/pages/page.yaml', locale=locale)
+            self.assertEqual(['foo'], doc.fields['nested']['items'])
+
     def test_view_format(self):
         pod = testing.create_pod()
         pod.write_yaml('/podspec.yaml', {})
@@ -18,10 +18,11 @@ class StaticDocument:
         return (self.pod == other.pod and self.pod_path == other.pod_path
                 and other.locale == self.locale)
 
-    def __init__(self, pod, pod_path, locale=None):
+    def __init__(self, pod, pod_path, locale=None, fingerprint=None):
         self.pod = pod
         self.pod_path = pod_path
         self.locale = locale
+        self._fingerprint = fingerprint
         self.config = self.pod.router.get_static_config_for_pod_path(pod_path)
 
         # When localized the base string is changed.
@@ -84,6 +85,8 @@ class StaticDocument:
     @property
     def fingerprint(self):
         """Fingerprint of the file contents."""
+        if self._fingerprint is not None:
+            return self._fingerprint
         return self.pod.hash_file(self.pod_path)
 
     @property
@@ -128,14 +131,20 @@ class StaticDocument:
     def serving_path(self):
         """Serving path for the static document."""
         if self.source_pod_path != self.pod_path or not self.use_fallback:
-            path = self.pod.path_format.format_static(
-                self.path_format, locale=self.locale,
-                fingerprint=self.fingerprint)
+            path_format = self.path_format
+            locale = self.locale
         else:
             # Fall back to use the default locale for the formatted path.
-            path = self.pod.path_format.format_static(
-                self.base_path_format, locale=self.pod.podspec.default_locale,
-                fingerprint=self.fingerprint)
+            path_format = self.base_path_format
+            locale = self.pod.podspec.default_locale
+
+        # Only hash the file when the fingerprint is used, including with a
+        # format spec such as `{fingerprint:.8}`.
+        fingerprint = None
+        if self.fingerprinted or '{fingerprint' in path_format:
+            fingerprint = self.fingerprint
+        path = self.pod.path_format.format_static(
+            path_format, locale=locale, fingerprint=fingerprint)
 
         if not self.fingerprinted:
             return path
@@ -144,8 +153,8 @@ class StaticDocument:
         # Special case to preserve ".min.<ext>" extensions.
         if base.endswith('.min'):
             base = base[:-4]
-            return '{}-{}.min{}'.format(base, self.fingerprint, ext)
-        return '{}-{}{}'.format(base, self.fingerprint, ext)
+            return '{}-{}.min{}'.format(base, fingerprint, ext)
+        return '{}-{}{}'.format(base, fingerprint, ext)
 
     @property
     def serving_path_parameterized(self):
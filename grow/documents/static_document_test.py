@@ -76,6 +76,29 @@ class StaticDocumentTestCase(unittest.TestCase):
              '048db567e231eb6fd0a23b6359f068b1e8bef135b.txt'),
             static_doc.serving_path)
 
+    def test_serving_path_fingerprint_format(self):
+        """Static document serving path with a formatted fingerprint."""
+        pod = testing.create_pod()
+        pod.write_yaml('/podspec.yaml', {
+            'static_dirs': [{
+                'static_dir': '/static/',
+                'serve_at': '/a-{fingerprint:.8}/',
+            }, {
+                'static_dir': '/public/',
+                'serve_at': '/b-{fingerprint}/',
+            }],
+        })
+        pod.write_file('/static/test.txt', 'test')
+        pod.write_file('/public/test.txt', 'test')
+        static_doc = static_document.StaticDocument(pod, '/static/test.txt')
+        self.assertEqual(
+            '/a-{}/test.txt'.format(static_doc.fingerprint[:8]),
+            static_doc.serving_path)
+        static_doc = static_document.StaticDocument(pod, '/public/test.txt')
+        self.assertEqual(
+            '/b-{}/test.txt'.format(static_doc.fingerprint),
+            static_doc.serving_path)
+
     def test_serving_path_parameterized(self):
         """Static document parameterized serving path."""
         static_doc = static_document.StaticDocument(
@@ -20,6 +20,7 @@ class PodcacheDevFileChangeHook(hooks.DevFileChangeHook):
 
         # Remove any raw file in the cache.
         self.pod.podcache.file_cache.remove(pod_path)
+        self.pod.podcache.yaml_cache.remove(pod_path)
 
         if pod_path == '/{}'.format(self.pod.FILE_PODSPEC):
             self.pod.podcache.reset()
@@ -53,6 +53,14 @@ class ExtensionController:
         for _, hook in self._hooks.items():
             hook.register_extensions(new_extensions)
 
+    def has_extension_hooks(self, hook_key):
+        """Are there any extension hooks for the hook?"""
+        return self._hooks[hook_key].has_extension_hooks
+
+    def should_trigger(self, hook_key, *args, **kwargs):
+        """Would any extension hooks trigger for the hook?"""
+        return self._hooks[hook_key].should_trigger(*args, **kwargs)
+
     def trigger(self, hook_key, *args, **kwargs):
         """Trigger a hook."""
         return self._hooks[hook_key].trigger(*args, **kwargs)
@@ -16,6 +16,31 @@ class HookController:
                 hook = extension.auto_hook(self.key)
                 self._hooks.append(hook)
 
+    @property
+    def has_extension_hooks(self):
+        """Are there any hooks from the extensions?"""
+        return len(self._hooks) > 1
+
+    def should_trigger(self, *args, **kwargs):
+        """Would any of the extension hooks trigger?
+
+        The arguments are the same as for `trigger`, each extension hook is
+        asked with the same previous result that `trigger` would pass it.
+        Hooks that fail to decide are assumed to trigger.
+        """
+        default_hook = self._hooks[0]
+        result = None
+        if self.has_extension_hooks and default_hook.should_trigger(
+                result, *args, **kwargs):
+            result = default_hook.trigger(result, *args, **kwargs)
+        for hook in self._hooks[1:]:
+            try:
+                if hook.should_trigger(result, *args, **kwargs):
+                    return True
+            except Exception:  # pylint: disable=broad-except
+                return True
+        return False
+
     def trigger(self, *args, **kwargs):
         """Trigger the hook."""
         result = None
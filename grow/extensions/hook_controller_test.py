@@ -1,12 +1,69 @@
 """Tests for hook controller."""
 
 import unittest
+import mock
 from grow.extensions import hook_controller
+from grow.extensions.hooks import post_render_hook
+
+
+class ContentHook(post_render_hook.PostRenderHook):
+    """Post render hook that only changes content that is not empty."""
+
+    # pylint: disable=arguments-differ,unused-argument
+    def should_trigger(self, previous_result, doc, raw_content, *_args, **_kwargs):
+        return bool(previous_result)
+
+    def trigger(self, previous_result, doc, raw_content, *_args, **_kwargs):
+        return previous_result.upper()
 
 
 class HookControllerTestCase(unittest.TestCase):
     """Test the hook controller."""
 
-    def test_something(self):
-        """?"""
-        pass
+    def _extension(self, should_trigger=None, hook=None):
+        if hook is None:
+            hook = mock.Mock()
+            hook.should_trigger.side_effect = should_trigger
+        extension = mock.Mock()
+        extension.hooks.is_enabled.return_value = True
+        extension.auto_hook.return_value = hook
+        return extension
+
+    def test_should_trigger(self):
+        """Only extension hooks are considered to trigger."""
+        controller = hook_controller.HookController(
+            mock.Mock(), 'post_render', post_render_hook.PostRenderHook(None))
+        self.assertFalse(controller.should_trigger('doc', None))
+
+        controller.register_extensions([
+            self._extension(lambda *args, **kwargs: False)])
+        self.assertFalse(controller.should_trigger('doc', None))
+
+        controller.register_extensions([
+            self._extension(lambda *args, **kwargs: True)])
+        self.assertTrue(controller.should_trigger('doc', None))
+
+    def test_should_trigger_content(self):
+        """Hooks are asked with the same previous result as when triggered."""
+        controller = hook_controller.HookController(
+            mock.MagicMock(), 'post_render', post_render_hook.PostRenderHook(None))
+        controller.register_extensions([self._extension(hook=ContentHook(None))])
+        self.assertTrue(controller.should_trigger('doc', 'foo'))
+        self.assertEqual('FOO', controller.trigger('doc', 'foo'))
+        self.assertFalse(controller.should_trigger('doc', ''))
+        self.assertEqual('', controller.trigger('doc', ''))
+
+    def test_should_trigger_error(self):
+        """Hooks that error are assumed to trigger."""
+        controller = hook_controller.HookController(
+            mock.Mock(), 'post_render', post_render_hook.PostRenderHook(None))
+
+        def _raise(*args, **kwargs):
+            raise AttributeError()
+
+        controller.register_extensions([self._extension(_raise)])
+        self.assertTrue(controller.should_trigger('doc', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
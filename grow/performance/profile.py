@@ -1,6 +1,7 @@
 """Code timing for profiling."""
 
 import time
+from grow.performance import template_profile
 
 
 class Timer:
@@ -30,6 +31,14 @@ class Timer:
         """Duration of timer."""
         return self.end - self.start
 
+    @classmethod
+    def from_data(cls, key, label, meta, start, end):
+        """Create the timer from exported data."""
+        timer = cls(key, label=label, meta=meta)
+        timer.start = start
+        timer.end = end
+        return timer
+
     def export(self):
         """Export the timer data."""
         return {
@@ -54,8 +63,10 @@ class Timer:
 class Profile:
     """Keeps track of all of the timer usage."""
 
-    def __init__(self):
+    def __init__(self, profile_templates=False):
         self.timers = []
+        self.templates = template_profile.TemplateProfile(
+            enabled=profile_templates)
 
     def __iter__(self):
         for timer in self.timers:
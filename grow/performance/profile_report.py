@@ -4,9 +4,17 @@
 class ProfileReport:
     """Analyzes the timers to report on the app timing."""
 
-    def __init__(self, profile):
+    KEY_CACHES = 'caches'
+    KEY_TEMPLATES = 'templates'
+
+    def __init__(self, profile, cache_stats=None):
         self.profile = profile
+        self.cache_stats = cache_stats or {}
         self.items = {}
+        self.templates = {}
+        templates = getattr(self.profile, 'templates', None)
+        if templates is not None and templates.enabled:
+            self.templates = templates.export()
 
         for timer in self.profile:
             if timer.key not in self.items:
@@ -22,6 +30,10 @@ class ProfileReport:
         exported = {}
         for key, item in self.items.items():
             exported[key] = item.export()
+        if self.templates:
+            exported[self.KEY_TEMPLATES] = self.templates
+        if self.cache_stats:
+            exported[self.KEY_CACHES] = self.cache_stats
         return exported
 
     def pretty_print(self):
@@ -32,6 +44,21 @@ class ProfileReport:
             if len(item) > 1:
                 for timer in item.top():
                     print(timer)
+        if self.templates:
+            print('Templates by exclusive time:')
+            for key, stats in self.profile.templates.top():
+                print('  {} ({}): Exclusive {} Inclusive {} Load {}'.format(
+                    key, stats['count'], stats['exclusive'], stats['inclusive'],
+                    stats['load']))
+        if self.cache_stats:
+            print('Caches:')
+            for key, stats in sorted(self.cache_stats.items()):
+                if 'hits' not in stats:
+                    # Grouped stats, such as the memoized functions.
+                    continue
+                print('  {}: Hits {} Misses {} Inserts {} Evictions {} Invalidations {}'.format(
+                    key, stats['hits'], stats['misses'], stats['inserts'],
+                    stats['evictions'], stats['invalidations']))
 
 
 class ReportItem:
@@ -16,6 +16,13 @@ class TimerReportTestCase(unittest.TestCase):
         """Test report."""
         self.assertEqual(None, self.report.analyze())
 
+    def test_export_caches(self):
+        """Test cache stats are exported next to the timers."""
+        self.assertNotIn('caches', self.report.export())
+        stats = {'file_cache': {'hits': 1, 'misses': 0}}
+        report = profile_report.ProfileReport(self.profile, cache_stats=stats)
+        self.assertEqual(stats, report.export()['caches'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,49 @@
+"""Render costs of the routes from the profile of a previous build.
+
+The profile is written to `profile.json` in the control directory of the
+destination when building with `grow --profile build`. The load and render
+timers of each route are added together as the cost of the serving path.
+"""
+
+import json
+
+
+RENDER_KEY_PREFIX = 'Render'
+RENDER_KEY_SUFFIXES = ('Controller.load', 'Controller.render')
+
+# Timers that use the serving path as the label.
+SERVING_PATH_LABEL_KEYS = (
+    'RenderSitemapController.load', 'RenderSitemapController.render',
+    'RenderStaticDocumentController.load',
+    'RenderStaticDocumentController.render',
+)
+
+
+def _serving_path(key, timer):
+    meta = timer.get('meta')
+    if isinstance(meta, dict) and meta.get('serving_path'):
+        return meta['serving_path']
+    if key in SERVING_PATH_LABEL_KEYS:
+        return timer.get('label')
+    return None
+
+
+def from_profile(data):
+    """Seconds spent rendering each serving path in the exported profile."""
+    costs = {}
+    for key, item in data.items():
+        if not (key.startswith(RENDER_KEY_PREFIX)
+                and key.endswith(RENDER_KEY_SUFFIXES)):
+            continue
+        for timer in item.get('timers', []):
+            path = _serving_path(key, timer)
+            if not path or timer.get('start') is None or timer.get('end') is None:
+                continue
+            costs[path] = costs.get(path, 0.0) + timer['end'] - timer['start']
+    return costs
+
+
+def load(file_path):
+    """Seconds spent rendering each serving path in a profile file."""
+    with open(file_path, 'r') as profile_file:
+        return from_profile(json.load(profile_file))
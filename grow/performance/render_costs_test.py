@@ -0,0 +1,61 @@
+"""Test the render costs of routes."""
+
+import json
+import os
+import tempfile
+import unittest
+from . import profile
+from . import profile_report
+from . import render_costs
+
+
+class RenderCostsTestCase(unittest.TestCase):
+    """Tests for the render costs."""
+
+    def setUp(self):
+        self.profile = profile.Profile()
+        self._add_timer(
+            'RenderDocumentController.render', 10, 12,
+            label='/content/pages/foo.yaml (en)',
+            meta={'path': '/content/pages/foo.yaml', 'locale': 'en',
+                  'serving_path': '/en/foo/'})
+        self._add_timer(
+            'RenderStaticDocumentController.render', 12, 12.5,
+            label='/static/main.css', meta={'path': '/static/main.css'})
+        self._add_timer(
+            'RenderStaticDocumentController.load', 13, 13.25,
+            label='/static/main.css', meta={'path': '/static/main.css'})
+        # Documents from older profiles do not have the serving path.
+        self._add_timer(
+            'RenderDocumentController.render', 14, 20,
+            label='/content/pages/bar.yaml (en)',
+            meta={'path': '/content/pages/bar.yaml', 'locale': 'en'})
+        self._add_timer('renderer.Renderer.render_docs', 1, 30)
+
+    def _add_timer(self, key, start, end, label=None, meta=None):
+        self.profile.add_timer(profile.Timer.from_data(
+            key, label, meta, start, end))
+
+    def test_from_profile(self):
+        """Costs are the load and render time of each serving path."""
+        report = profile_report.ProfileReport(
+            self.profile, cache_stats={'file_cache': {'hits': 1}})
+        self.assertEqual({
+            '/en/foo/': 2.0,
+            '/static/main.css': 0.75,
+        }, render_costs.from_profile(report.export()))
+
+    def test_load(self):
+        """Costs are loaded from the profile file."""
+        report = profile_report.ProfileReport(self.profile)
+        fd, file_path = tempfile.mkstemp(suffix='.json')
+        self.addCleanup(os.remove, file_path)
+        with os.fdopen(fd, 'w') as profile_file:
+            json.dump(report.export(), profile_file)
+        self.assertEqual(
+            {'/en/foo/': 2.0, '/static/main.css': 0.75},
+            render_costs.load(file_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Threaded scanner for the files in the static directories of a pod.
+
+Directories are listed one level at a time with a thread pool using
+`os.scandir`. The files are returned in batches with the stat of each file so
+the files do not need to be stat again when they are hashed.
+"""
+
+from multiprocessing.dummy import Pool as ThreadPool
+
+
+# pylint: disable=too-few-public-methods
+class StaticScanner:
+    """Scanner that threads the listing of the static directories."""
+
+    BATCH_SIZE = 1000
+    MAX_POOL_SIZE = 16
+    MIN_POOL_COUNT = 4
+
+    @staticmethod
+    def _scan_dir(storage, path):
+        """Files with their stat and the sub directories of a directory."""
+        files = []
+        dirs = []
+        try:
+            entries = storage.scandir(path)
+        except (IOError, OSError):
+            return files, dirs
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        # Hidden directories are not part of the static files.
+                        if not entry.name.startswith('.'):
+                            dirs.append(entry.path)
+                        continue
+                    files.append((entry.path, entry.stat()))
+                except (IOError, OSError):
+                    # Broken links or files removed while scanning.
+                    continue
+        return files, dirs
+
+    @classmethod
+    def scan(cls, pod, pod_dirs, batch_size=None):
+        """Generator for batches of the files in the directories.
+
+        Batches are lists of the pod path and stat of the files, with at
+        least the batch size of files except for the last batch.
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        root_length = len(pod.root.rstrip('/'))
+        pending = [pod.abs_path(pod_dir) for pod_dir in pod_dirs if pod_dir]
+        thread_pool = None
+        batch = []
+
+        def _scan_dir(path):
+            return cls._scan_dir(pod.storage, path)
+
+        with pod.profile.timer(
+                'StaticScanner.scan', meta={'dirs': list(pod_dirs)}):
+            try:
+                while pending:
+                    if len(pending) < cls.MIN_POOL_COUNT:
+                        results = map(_scan_dir, pending)
+                    else:
+                        if thread_pool is None:
+                            thread_pool = ThreadPool(cls.MAX_POOL_SIZE)
+                        results = thread_pool.imap(_scan_dir, pending)
+                    pending = []
+                    # The rest of the level is scanned while the batches are
+                    # being used.
+                    for files, dirs in results:
+                        pending.extend(dirs)
+                        for path, stat in files:
+                            batch.append((path[root_length:], stat))
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+                if batch:
+                    yield batch
+            finally:
+                if thread_pool is not None:
+                    thread_pool.close()
+                    thread_pool.join()
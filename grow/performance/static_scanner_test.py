@@ -0,0 +1,61 @@
+"""Tests for the static scanner."""
+
+import os
+import unittest
+from grow import storage
+from grow.performance import static_scanner
+from grow.pods import pods
+from grow.testing import testing
+
+
+class StaticScannerTestCase(unittest.TestCase):
+    """Test the static scanner."""
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+
+    def test_scan(self):
+        """Files of the directories are scanned with their stat."""
+        self.pod.write_file('/static/.hidden/secret.txt', 'secret')
+        expected = set()
+        for root, dirs, files in os.walk(self.pod.abs_path('/static/')):
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+            for file_name in files:
+                expected.add(os.path.join(root, file_name)[len(self.pod.root):])
+
+        scanned = {}
+        batches = list(static_scanner.StaticScanner.scan(
+            self.pod, ['/static/'], batch_size=2))
+        self.assertTrue(len(batches) > 1)
+        for batch in batches:
+            scanned.update(batch)
+        self.assertEqual(expected, set(scanned))
+        self.assertIn('/static/intl/de/test.txt', scanned)
+        self.assertNotIn('/static/.hidden/secret.txt', scanned)
+        self.assertEqual(
+            os.stat(self.pod.abs_path('/static/test.txt')).st_size,
+            scanned['/static/test.txt'].st_size)
+
+    def test_scan_threaded(self):
+        """Directories are scanned with the thread pool."""
+        for index in range(10):
+            self.pod.write_file(
+                '/static/many/dir-{}/file.txt'.format(index), str(index))
+        scanned = set()
+        for batch in static_scanner.StaticScanner.scan(
+                self.pod, ['/static/many/']):
+            scanned.update(pod_path for pod_path, _ in batch)
+        self.assertEqual(
+            set('/static/many/dir-{}/file.txt'.format(index)
+                for index in range(10)),
+            scanned)
+
+    def test_scan_missing(self):
+        """Missing directories do not have files."""
+        self.assertEqual(
+            [], list(static_scanner.StaticScanner.scan(self.pod, ['/missing/'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Render time attribution for templates.
+
+Keeps the inclusive and exclusive time spent rendering each template, where
+the exclusive time does not include the time spent in the templates and
+macros that it includes, extends, or calls.
+
+    template_profile = TemplateProfile(enabled=True)
+    for event in template_profile.render('/views/base.html', events):
+        ...
+"""
+
+import threading
+import time
+
+
+class TemplateProfile:
+    """Aggregates the render time of templates by template path."""
+
+    # Position of the values in the aggregated stats.
+    COUNT = 0
+    INCLUSIVE = 1
+    EXCLUSIVE = 2
+    LOAD = 3
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._time = time.perf_counter
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread_stats = []
+        self._merged = {}
+
+    def _stack(self):
+        """Stack of the child time for the templates in progress."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._local.stats = {}
+            with self._lock:
+                self._thread_stats.append(self._local.stats)
+        return stack
+
+    def _enter(self):
+        self._stack().append(0.0)
+        return self._time()
+
+    def _exit(self, key, start, count=0, field=EXCLUSIVE):
+        elapsed = self._time() - start
+        stack = self._local.stack
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        stats = self._local.stats.get(key)
+        if stats is None:
+            stats = self._local.stats[key] = [0, 0.0, 0.0, 0.0]
+        stats[self.COUNT] += count
+        if field == self.LOAD:
+            stats[self.LOAD] += elapsed
+        else:
+            stats[self.INCLUSIVE] += elapsed
+            stats[self.EXCLUSIVE] += elapsed - children
+
+    def render(self, key, events):
+        """Time the events of a render stream for the template."""
+        events = iter(events)
+        count = 1
+        while True:
+            start = self._enter()
+            try:
+                event = next(events)
+            except StopIteration:
+                self._exit(key, start, count=count)
+                return
+            except BaseException:
+                self._exit(key, start, count=count)
+                raise
+            self._exit(key, start, count=count)
+            count = 0
+            yield event
+
+    def call(self, key, func, *args, **kwargs):
+        """Time a function call, such as a macro, for the template."""
+        start = self._enter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._exit(key, start, count=1)
+
+    def load(self, key, func, *args, **kwargs):
+        """Time the loading of a template."""
+        start = self._enter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._exit(key, start, field=self.LOAD)
+
+    def export(self):
+        """Export the aggregated stats for each template."""
+        totals = {}
+        with self._lock:
+            all_stats = [self._merged] + [
+                dict(stats) for stats in self._thread_stats]
+        for stats in all_stats:
+            for key, values in stats.items():
+                if key not in totals:
+                    totals[key] = [0, 0.0, 0.0, 0.0]
+                for index, value in enumerate(values):
+                    totals[key][index] += value
+        return {
+            key: {
+                'count': values[self.COUNT],
+                'inclusive': values[self.INCLUSIVE],
+                'exclusive': values[self.EXCLUSIVE],
+                'load': values[self.LOAD],
+            } for key, values in totals.items()}
+
+    def merge(self, data):
+        """Merge exported stats, such as from a render process."""
+        with self._lock:
+            for key, values in data.items():
+                if key not in self._merged:
+                    self._merged[key] = [0, 0.0, 0.0, 0.0]
+                merged = self._merged[key]
+                merged[self.COUNT] += values['count']
+                merged[self.INCLUSIVE] += values['inclusive']
+                merged[self.EXCLUSIVE] += values['exclusive']
+                merged[self.LOAD] += values['load']
+
+    def reset(self):
+        """Clear the aggregated stats."""
+        with self._lock:
+            self._merged = {}
+            for stats in self._thread_stats:
+                stats.clear()
+
+    def top(self, count=10, field='exclusive'):
+        """Templates with the most time spent rendering."""
+        exported = self.export()
+        keys = sorted(
+            exported, key=lambda key: exported[key][field], reverse=True)
+        return [(key, exported[key]) for key in keys[:count]]
@@ -0,0 +1,106 @@
+"""Test the template profile."""
+
+import threading
+import unittest
+import jinja2
+from grow.performance import template_profile
+from grow.templates import jinja_dependency
+
+
+class TemplateProfileTestCase(unittest.TestCase):
+    """Tests for the TemplateProfile."""
+
+    def setUp(self):
+        self.profile = template_profile.TemplateProfile(enabled=True)
+
+    def _create_env(self, templates):
+        env = jinja_dependency.DepEnvironment(
+            loader=jinja2.DictLoader(templates))
+        env.template_profile = self.profile
+        return env
+
+    def test_exclusive(self):
+        """Exclusive time does not include the nested templates."""
+        clock = iter([0, 1, 3, 6, 10, 15, 20, 21, 22, 24])
+        # pylint: disable=protected-access
+        self.profile._time = lambda: next(clock)
+
+        def _inner():
+            yield 'inner'
+
+        def _outer():
+            yield 'outer'
+            for event in self.profile.render('/inner.html', _inner()):
+                yield event
+
+        events = list(self.profile.render('/outer.html', _outer()))
+        self.assertEqual(['outer', 'inner'], events)
+        exported = self.profile.export()
+        # Outer: 0-1, 3-15, 20-24 with inner: 6-10, 21-22.
+        self.assertEqual(1, exported['/outer.html']['count'])
+        self.assertEqual(17, exported['/outer.html']['inclusive'])
+        self.assertEqual(12, exported['/outer.html']['exclusive'])
+        self.assertEqual(1, exported['/inner.html']['count'])
+        self.assertEqual(5, exported['/inner.html']['inclusive'])
+        self.assertEqual(5, exported['/inner.html']['exclusive'])
+
+    def test_render_templates(self):
+        """Includes, extends and macros are attributed to their templates."""
+        env = self._create_env({
+            'views/base.html': '<main>{% block main %}{% endblock %}</main>',
+            'views/page.html': (
+                '{% extends "views/base.html" %}'
+                '{% import "partials/macros.html" as macros %}'
+                '{% block main %}'
+                '{% include "partials/hero.html" %}{{macros.title("Hi")}}'
+                '{% endblock %}'),
+            'partials/hero.html': '<hero>{{value}}</hero>',
+            'partials/macros.html': '{% macro title(text) %}<h1>{{text}}</h1>{% endmacro %}',
+        })
+        html = env.get_template('views/page.html').render({'value': 'Hello'})
+        self.assertEqual('<main><hero>Hello</hero><h1>Hi</h1></main>', html)
+
+        exported = self.profile.export()
+        for key in ('/views/page.html', '/views/base.html', '/partials/hero.html',
+                    '/partials/macros.html#title'):
+            self.assertIn(key, exported)
+        self.assertEqual(1, exported['/partials/hero.html']['count'])
+        self.assertEqual(1, exported['/partials/macros.html#title']['count'])
+        page = exported['/views/page.html']
+        self.assertLessEqual(page['exclusive'], page['inclusive'])
+        self.assertGreaterEqual(
+            page['inclusive'], exported['/partials/hero.html']['inclusive'])
+        self.assertGreater(exported['/partials/hero.html']['load'], 0)
+
+    def test_disabled(self):
+        """Templates are not profiled when disabled."""
+        self.profile.enabled = False
+        env = self._create_env({'views/base.html': '{{value}}'})
+        self.assertEqual('a', env.get_template('views/base.html').render(value='a'))
+        self.assertEqual({}, self.profile.export())
+
+    def test_merge_reset(self):
+        """Merge exported stats from other profiles."""
+        env = self._create_env({'views/base.html': '{{value}}'})
+
+        def _render():
+            env.get_template('views/base.html').render(value='a')
+
+        thread = threading.Thread(target=_render)
+        thread.start()
+        thread.join()
+        _render()
+
+        other = template_profile.TemplateProfile(enabled=True)
+        other.merge(self.profile.export())
+        other.merge(self.profile.export())
+        self.assertEqual(2, self.profile.export()['/views/base.html']['count'])
+        self.assertEqual(4, other.export()['/views/base.html']['count'])
+        self.assertEqual('/views/base.html', other.top(1)[0][0])
+
+        other.reset()
+        self.assertEqual({}, other.export())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,15 +2,83 @@
 
 import fnmatch
 import os
+import threading
 from collections import OrderedDict
 
 
+GLOB_CHARS = ('*', '?', '[')
+
+
+def _is_glob(pattern):
+    return any(char in pattern for char in GLOB_CHARS)
+
+
+class PathTrie:
+    """Trie of path segments for matching glob patterns against paths."""
+
+    def __init__(self):
+        self._root = {}
+
+    @staticmethod
+    def _segments(path):
+        return path.strip('/').split('/')
+
+    def add(self, path):
+        """Add a path to the trie."""
+        node = self._root
+        for segment in self._segments(path):
+            node = node.setdefault(segment, {})
+        node[None] = path
+
+    def _walk(self, node):
+        for key, value in node.items():
+            if key is None:
+                yield value
+            else:
+                for path in self._walk(value):
+                    yield path
+
+    def match(self, pattern):
+        """Paths that match the glob pattern.
+
+        The literal segments before the first glob segment are used to find
+        the paths to match, the rest of the pattern is matched the same as
+        `fnmatch` where a `*` can match across segments.
+        """
+        node = self._root
+        segments = self._segments(pattern)
+        for index, segment in enumerate(segments):
+            if _is_glob(segment):
+                break
+            if index == len(segments) - 1:
+                # Pattern without any glob characters.
+                path = node.get(segment, {}).get(None)
+                return [path] if path is not None and fnmatch.fnmatch(path, pattern) else []
+            node = node.get(segment)
+            if node is None:
+                return []
+        return [path for path in self._walk(node) if fnmatch.fnmatch(path, pattern)]
+
+    def reset(self):
+        """Remove all of the paths."""
+        self._root = {}
+
+
 class DependencyGraph:
-    """Dependency graph for tracking relationships between the pod content."""
+    """Dependency graph for tracking relationships between the pod content.
+
+    The transitive dependents of references are cached and the cache is
+    updated as new references are added.
+    """
 
     def __init__(self):
         self._dependents = {}
         self._dependencies = {}
+        self._closures = {}
+        self._lock = threading.RLock()
+        self._paths = PathTrie()
+        self._changed = set()
+        self._cleared = False
         self._is_dirty = False
 
     @staticmethod
@@ -25,6 +93,42 @@ class DependencyGraph:
         """Have the contents of the dependency graph been modified?"""
         return self._is_dirty
 
+    def _add_dependent(self, reference, source):
+        """Add the source as a dependent of the reference."""
+        if reference not in self._dependents:
+            self._dependents[reference] = set()
+            self._paths.add(reference)
+        if source in self._dependents[reference]:
+            return
+        self._dependents[reference].add(source)
+        # Track when the dependency graph has changed.
+        self._is_dirty = True
+
+        # Everything that depended on the reference now depends on the source.
+        if not self._closures:
+            return
+        keys = [
+            key for key, closure in self._closures.items()
+            if key == reference or reference in closure]
+        if keys:
+            closure = self._closure(source) | set([source])
+            for key in keys:
+                self._closures[key] = self._closures[key] | closure
+
+    def _closure(self, reference):
+        """All of the transitive dependents of a reference."""
+        if reference not in self._closures:
+            closure = set()
+            pending = list(self._dependents.get(reference, ()))
+            while pending:
+                path = pending.pop()
+                if path in closure:
+                    continue
+                closure.add(path)
+                pending.extend(self._dependents.get(path, ()))
+            self._closures[reference] = frozenset(closure)
+        return self._closures[reference]
+
     def add_all(self, path_to_dependencies):
         """Add all from a dict of paths to dependencies."""
         for path, dependencies in path_to_dependencies.items():
@@ -38,66 +142,101 @@ class DependencyGraph:
         source = DependencyGraph.normalize_path(source)
         reference = DependencyGraph.normalize_path(reference)
 
-        if source not in self._dependencies:
-            self._dependencies[source] = set()
-        self._dependencies[source].add(reference)
+        with self._lock:
+            if source not in self._dependencies:
+                self._dependencies[source] = set()
+            if reference not in self._dependencies[source]:
+                self._dependencies[source].add(reference)
+                self._changed.add(source)
 
-        # Source are a dependent to themselves.
-        if source not in self._dependents:
-            self._dependents[source] = set()
-        if source not in self._dependents[source]:
-            self._is_dirty = True
-        self._dependents[source].add(source)
+            # Source are a dependent to themselves.
+            self._add_dependent(source, source)
 
-        # Bi-directional dependency references for easier lookup.
-        if reference not in self._dependents:
-            self._dependents[reference] = set()
-        if source not in self._dependents[reference]:
-            self._is_dirty = True
-        self._dependents[reference].add(source)
+            # Bi-directional dependency references for easier lookup.
+            self._add_dependent(reference, source)
 
     def add_references(self, source, references):
-        """Add references made in a source file to the graph."""
+        """Add references made in a source file to the graph.
+
+        The references replace any previous references of the source.
+        """
         if not references:
             return
 
         source = DependencyGraph.normalize_path(source)
+        references = set(
+            DependencyGraph.normalize_path(reference) for reference in references)
 
-        self._dependencies[source] = set(references)
+        with self._lock:
+            # Remove the references that the source no longer makes.
+            removed = self._dependencies.get(source, set()) - references - set([source])
+            for reference in removed:
+                dependents = self._dependents.get(reference)
+                if dependents and source in dependents:
+                    dependents.discard(source)
+                    self._is_dirty = True
+            if removed:
+                self._closures = {}
 
-        # Source are a dependent to themselves.
-        if source not in self._dependents:
-            self._dependents[source] = set()
-        if source not in self._dependents[source]:
-            self._is_dirty = True
-        self._dependents[source].add(source)
+            if self._dependencies.get(source) != references:
+                self._changed.add(source)
+            self._dependencies[source] = references
 
-        # Bi-directional dependency references for easier lookup.
-        for reference in references:
-            reference = DependencyGraph.normalize_path(reference)
-            if reference not in self._dependents:
-                self._dependents[reference] = set()
+            # Source are a dependent to themselves.
+            self._add_dependent(source, source)
 
-            # Track when the dependency graph has changed.
-            if source not in self._dependents[reference]:
-                self._is_dirty = True
-            self._dependents[reference].add(source)
+            # Bi-directional dependency references for easier lookup.
+            for reference in references:
+                self._add_dependent(reference, source)
+
+    def changes(self):
+        """Dependencies of the sources changed since the graph was clean.
+
+        Returns if the graph was reset and a dict of the changed sources to
+        the sorted dependencies.
+        """
+        with self._lock:
+            return self._cleared, {
+                source: sorted(self._dependencies[source])
+                for source in self._changed if source in self._dependencies}
 
     def export(self):
         """Formats the dependency graph for export."""
         result = OrderedDict()
-        for key in sorted(self._dependencies.keys()):
-            result[key] = sorted(list(self._dependencies[key]))
+        with self._lock:
+            for key in sorted(self._dependencies.keys()):
+                result[key] = sorted(list(self._dependencies[key]))
         return result
 
+    def get_all_dependents(self, references):
+        """Gets everything affected by a change to any of the references.
+
+        References can be pod paths or glob patterns of pod paths. Unlike
+        `get_dependents` references that are not part of the graph are not
+        included in the result.
+        """
+        affected = set()
+        with self._lock:
+            for reference in references:
+                reference = DependencyGraph.normalize_path(reference)
+                if _is_glob(reference):
+                    affected |= self.match_dependents(reference)
+                    continue
+                affected |= self._closure(reference)
+                affected |= self._closure(os.path.dirname(reference))
+                if reference in self._dependents:
+                    affected.add(reference)
+        return affected
+
     def get_dependents(self, reference):
         """
         Gets dependents that rely upon the reference or a collection that
-        contains the reference.
+        contains the reference, including the transitive dependents.
         """
-        return (self._dependents.get(reference, set())
-                | self._dependents.get(os.path.dirname(reference), set())
-                | set([reference]))
+        with self._lock:
+            return (self._closure(reference)
+                    | self._closure(os.path.dirname(reference))
+                    | set([reference]))
 
     def get_dependencies(self, source):
         """Get the dependencies of a specific source."""
@@ -105,7 +244,10 @@ class DependencyGraph:
 
     def mark_clean(self):
         """Mark that the dependency graph is clean."""
-        self._is_dirty = False
+        with self._lock:
+            self._changed = set()
+            self._cleared = False
+            self._is_dirty = False
 
     def match_dependents(self, reference):
         """
@@ -113,14 +255,19 @@ class DependencyGraph:
         contains the reference using a glob pattern.
         """
         matched_dependents = set()
-        for dependent in self._dependents:
-            if fnmatch.fnmatch(dependent, reference):
-                matched_dependents = (
-                    matched_dependents | self._dependents.get(dependent) | set([dependent]))
+        with self._lock:
+            for dependent in self._paths.match(reference):
+                matched_dependents |= self._closure(dependent)
+                matched_dependents.add(dependent)
         return matched_dependents
 
     def reset(self):
         """Reset all the dependency tracking."""
-        self._dependents = {}
-        self._dependencies = {}
-        self._is_dirty = False
+        with self._lock:
+            self._dependents = {}
+            self._dependencies = {}
+            self._closures = {}
+            self._paths.reset()
+            self._changed = set()
+            self._cleared = True
+            self._is_dirty = False
@@ -144,6 +144,86 @@ class DependencyGraphTestCase(unittest.TestCase):
                  '/content/ref.yaml', '/content/ref1.yaml', '/content/ref2.yaml']),
             graph.match_dependents('/content/test*.yaml'))
 
+    def test_get_dependents_transitive(self):
+        graph = dependency.DependencyGraph()
+        graph.add_references(
+            '/content/page.yaml', ['/views/base.html'])
+        graph.add_references(
+            '/views/base.html', ['/partials/header.html'])
+        self.assertEqual(
+            set(['/content/page.yaml', '/views/base.html',
+                 '/partials/header.html']),
+            graph.get_dependents('/partials/header.html'))
+
+        # Cached closures are updated with new references.
+        graph.add_references(
+            '/partials/header.html', ['/partials/nav.html'])
+        graph.add_references(
+            '/content/other.yaml', ['/views/base.html'])
+        self.assertEqual(
+            set(['/content/page.yaml', '/content/other.yaml',
+                 '/views/base.html', '/partials/header.html',
+                 '/partials/nav.html']),
+            graph.get_dependents('/partials/nav.html'))
+
+    def test_get_dependents_cycle(self):
+        graph = dependency.DependencyGraph()
+        graph.add('/content/a.yaml', '/content/b.yaml')
+        graph.add('/content/b.yaml', '/content/a.yaml')
+        self.assertEqual(
+            set(['/content/a.yaml', '/content/b.yaml']),
+            graph.get_dependents('/content/a.yaml'))
+
+    def test_add_references_removed(self):
+        graph = dependency.DependencyGraph()
+        graph.add_references(
+            '/content/page.yaml', ['/partials/old.html'])
+        self.assertEqual(
+            set(['/content/page.yaml', '/partials/old.html']),
+            graph.get_dependents('/partials/old.html'))
+        graph.add_references(
+            '/content/page.yaml', ['/partials/new.html'])
+        self.assertEqual(
+            set(['/partials/old.html']),
+            graph.get_dependents('/partials/old.html'))
+        self.assertEqual(
+            set(['/content/page.yaml', '/partials/new.html']),
+            graph.get_dependents('/partials/new.html'))
+
+    def test_match_dependents_transitive(self):
+        graph = dependency.DependencyGraph()
+        graph.add_references(
+            '/content/page.yaml', ['/partials/base.html'])
+        graph.add_references(
+            '/partials/base.html', ['/partials/nav/links.html'])
+        self.assertEqual(
+            set(['/content/page.yaml', '/partials/base.html',
+                 '/partials/nav/links.html']),
+            graph.match_dependents('/partials/*/links.html'))
+        self.assertEqual(
+            set(['/content/page.yaml', '/partials/base.html',
+                 '/partials/nav/links.html']),
+            graph.match_dependents('/partials/*'))
+        self.assertEqual(set(), graph.match_dependents('/views/*'))
+        self.assertEqual(set(), graph.match_dependents('/partials/missing.html'))
+
+    def test_get_all_dependents(self):
+        graph = dependency.DependencyGraph()
+        graph.add_references(
+            '/content/pages/page.yaml', ['/partials/header.html'])
+        graph.add_references(
+            '/content/pages/list.yaml', ['/content/posts'])
+        graph.add_references(
+            '/content/pages/other.yaml', ['/partials/footer.html'])
+        self.assertEqual(
+            set(['/content/pages/page.yaml', '/partials/header.html',
+                 '/content/pages/list.yaml']),
+            graph.get_all_dependents([
+                'partials/header.html', '/content/posts/new.yaml']))
+        self.assertEqual(
+            set(['/content/pages/other.yaml', '/partials/footer.html']),
+            graph.get_all_dependents(['/partials/foot*']))
+
     def test_reset(self):
         graph = dependency.DependencyGraph()
         graph.add_references(
@@ -11,11 +11,12 @@ import time
 import shutil
 import tempfile
 import yaml
-import jinja2
 import progressbar
 import cachelib
 from grow import storage as grow_storage
+from grow.cache import cache_journal
 from grow.cache import podcache
+from grow.cache import routes_cache as grow_routes_cache
 from grow.collections import collection
 from grow.common import deprecated
 from grow.common import features
@@ -40,6 +41,7 @@ from grow.routing import router as grow_router
 from grow.templates import filters
 from grow.templates import jinja_dependency
 from grow.templates import tags
+from grow.templates import template_archive
 from grow.translations import catalog_holder
 from grow.translations import locales
 from grow.translations import translation_stats
@@ -211,8 +213,11 @@ class Pod:
                 raise podcache.PodCacheParseError(
                     'Error parsing: {}'.format(path))
 
-    def _parse_dep_cache_file(self):
+    def _parse_dep_cache_file(self, journal):
         with self.profile.timer('Pod._parse_dep_cache_file'):
+            if journal.exists:
+                return journal.load()
+
             podcache_file_name = '/{}'.format(self.FILE_DEP_CACHE)
 
             # TODO Remove deprecated cachefile support.
@@ -232,23 +237,37 @@ class Pod:
                                     json.dumps(temp_data['objects']))
                 self.delete_file(legacy_podcache_file_name)
 
-            if not self.file_exists(podcache_file_name):
-                return {}
-            try:
-                return self.read_json(podcache_file_name) or {}
-            except IOError:
-                path = self.abs_path(podcache_file_name)
-                raise podcache.PodCacheParseError(
-                    'Error parsing: {}'.format(path))
-
-    def _parse_routes_cache_file(self):
+            # Convert legacy json cache files to the journal.
+            for file_name in ('{}{}'.format(self.PATH_CONTROL, self.FILE_DEP_CACHE),
+                              podcache_file_name):
+                if not self.file_exists(file_name):
+                    continue
+                try:
+                    data = self.read_json(file_name) or {}
+                except ValueError:
+                    data = {}
+                except IOError:
+                    path = self.abs_path(file_name)
+                    raise podcache.PodCacheParseError(
+                        'Error parsing: {}'.format(path))
+                journal.compact(data)
+                if file_name.startswith(self.PATH_CONTROL):
+                    self.delete_file(file_name)
+                return data
+            return {}
+
+    def _parse_routes_cache_file(self, journal):
         with self.profile.timer('Pod._parse_routes_cache_file'):
+            if journal.exists:
+                return grow_routes_cache.RoutesCache.from_journal(journal.load())
+
+            # Convert legacy json cache files to the journal.
             routes_cache_file_name = '{}{}'.format(
                 self.PATH_CONTROL, podcache.FILE_ROUTES_CACHE)
             if not self.file_exists(routes_cache_file_name):
                 return {}
             try:
-                return self.read_json(routes_cache_file_name) or {}
+                data = self.read_json(routes_cache_file_name) or {}
             except ValueError:
                 # File became corrupted; delete it and start over.
                 # https://github.com/grow/grow/issues/1050#issuecomment-596346032
@@ -258,6 +277,9 @@ class Pod:
                 path = self.abs_path(routes_cache_file_name)
                 raise podcache.PodCacheParseError(
                     'Error parsing: {}'.format(path))
+            journal.compact(grow_routes_cache.RoutesCache.to_journal(data))
+            self.delete_file(routes_cache_file_name)
+            return data
 
     @utils.memoize
     def _parse_yaml(self):
@@ -320,7 +342,7 @@ class Pod:
 
     @utils.cached_property
     def jinja_bytecode_cache(self):
-        return jinja2.MemcachedBytecodeCache(client=self.cache)
+        return template_archive.TemplateArchive(self)
 
     @property
     def logger(self):
@@ -364,11 +386,15 @@ class Pod:
     @property
     def podcache(self):
         if not self._podcache:
+            dep_journal = cache_journal.CacheJournal(
+                self, '{}{}'.format(self.PATH_CONTROL, podcache.FILE_DEP_JOURNAL))
+            routes_journal = cache_journal.CacheJournal(
+                self, '{}{}'.format(self.PATH_CONTROL, podcache.FILE_ROUTES_JOURNAL))
             self._podcache = podcache.PodCache(
-                dep_cache=self._parse_dep_cache_file(),
+                dep_cache=self._parse_dep_cache_file(dep_journal),
                 obj_cache=self._parse_object_cache_file(),
-                routes_cache=self._parse_routes_cache_file(),
-                pod=self)
+                routes_cache=self._parse_routes_cache_file(routes_journal),
+                pod=self, dep_journal=dep_journal, routes_journal=routes_journal)
         return self._podcache
 
     @property
@@ -378,7 +404,8 @@ class Pod:
     @utils.cached_property
     def profile(self):
         """Profile object for code timing."""
-        return profile.Profile()
+        return profile.Profile(
+            profile_templates='GROW_PROFILE_TEMPLATES' in os.environ)
 
     @utils.cached_property
     def render_pool(self):
@@ -411,6 +438,19 @@ class Pod:
         _POD_TEMP_DIRS.append(dir_name)
         return dir_name
 
+    @utils.cached_property
+    def control_tmp_dir(self):
+        """Temp directory on the same file system as the pod.
+
+        Files in the directory can be moved or linked into place, such as
+        into the build output, instead of being copied.
+        """
+        parent_dir = self.abs_path('{}tmp'.format(self.PATH_CONTROL))
+        os.makedirs(parent_dir, exist_ok=True)
+        dir_name = tempfile.mkdtemp(dir=parent_dir)
+        _POD_TEMP_DIRS.append(dir_name)
+        return dir_name
+
     @property
     def title(self):
         return self.yaml.get('title')
@@ -478,11 +518,12 @@ class Pod:
         self._features.disable(feature)
 
     def dump(self, suffix='index.html', append_slashes=True, pod_paths=None,
-             use_threading=True, source_dir=None):
+             use_threading=True, source_dir=None, process_count=None):
         """Dumps the pod, yielding rendered_doc based on pod routes."""
         for rendered_doc in self.export(
                 suffix=suffix, append_slashes=append_slashes, pod_paths=pod_paths,
-                use_threading=use_threading, source_dir=source_dir):
+                use_threading=use_threading, source_dir=source_dir,
+                process_count=process_count):
             yield rendered_doc
         if self.ui and self.is_enabled(self.FEATURE_UI):
             for rendered_doc in self.export_ui():
@@ -493,11 +534,11 @@ class Pod:
         self._features.enable(feature)
 
     def export(self, suffix=None, append_slashes=False, pod_paths=None,
-               use_threading=True, source_dir=None):
+               use_threading=True, source_dir=None, process_count=None):
         """Builds the pod, yielding rendered_doc based on pod routes."""
-        for rendered_doc in renderer.Renderer.rendered_docs(
+        for rendered_doc in renderer.Renderer.stream_rendered_docs(
                 self, self.router.routes, use_threading=use_threading,
-                source_dir=source_dir):
+                source_dir=source_dir, process_count=process_count):
             yield rendered_doc
 
     def export_ui(self):
@@ -553,6 +594,10 @@ class Pod:
         path = self._normalize_path(pod_path)
         return self.storage.size(path)
 
+    def file_stat(self, pod_path):
+        path = self._normalize_path(pod_path)
+        return self.storage.stat(path)
+
     def get_catalogs(self, template_path=None):
         return catalog_holder.Catalogs(pod=self, template_path=template_path)
 
@@ -642,6 +687,8 @@ class Pod:
                 kwargs['bytecode_cache'] = self._get_bytecode_cache()
             kwargs['extensions'].extend(self.list_jinja_extensions())
             env = jinja_dependency.DepEnvironment(**kwargs)
+            env.template_profile = self.profile.templates
+            env.cache_stats = self.podcache.template_stats
             env.filters.update(filters.create_builtin_filters(env, self, locale=locale))
             env.globals.update(
                 **tags.create_builtin_globals(env, self, locale=locale))
@@ -721,9 +768,22 @@ class Pod:
 
     def hash_file(self, pod_path):
         """Provide the hash of the file from the storage."""
-        path = self._normalize_path(pod_path)
-        with self.profile.timer('Pod.hash_file', label=path, meta={'path': path}):
-            return self.storage.hash(path)
+        pod_path = self._normalize_pod_path(pod_path)
+        with self.profile.timer('Pod.hash_file', label=pod_path, meta={'path': pod_path}):
+            return self.podcache.hash_cache.get_hash(pod_path)
+
+    def hash_files(self, pod_paths, stats=None):
+        """Provide the hashes of multiple files, hashing in parallel.
+
+        Stats of the files can be given to avoid another stat of the files.
+        """
+        pod_paths = [self._normalize_pod_path(pod_path) for pod_path in pod_paths]
+        if stats:
+            stats = {
+                self._normalize_pod_path(pod_path): stat
+                for pod_path, stat in stats.items()}
+        with self.profile.timer('Pod.hash_files', meta={'count': len(pod_paths)}):
+            return self.podcache.hash_cache.get_hashes(pod_paths, stats=stats)
 
     def inject_preprocessors(self, doc=None, collection=None):
         """Conditionally injects or creates data from preprocessors. If a doc
@@ -902,8 +962,15 @@ class Pod:
             with self.profile.timer('Pod.read_yaml', label=label, meta=meta):
                 fields = self.podcache.file_cache.get(path, locale='__raw__')
                 if fields is None:
-                    fields = utils.parse_yaml(
-                        self.read_file(path), pod=self, locale=locale)
+                    yaml_cache = self.podcache.yaml_cache
+                    fields = yaml_cache.get_file(path)
+                    if fields is None:
+                        content = self.read_file(path)
+                        fields = yaml_cache.get_file(path, content=content)
+                        if fields is None:
+                            fields = utils.parse_yaml(
+                                content, pod=self, locale=locale)
+                            yaml_cache.add_file(path, content, fields)
                     self.podcache.file_cache.add(
                         path, fields, locale='__raw__')
                 try:
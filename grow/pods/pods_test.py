@@ -17,6 +17,13 @@ class PodTest(unittest.TestCase):
         self.dir_path = testing.create_test_pod_dir()
         self.pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
 
+    def test_control_tmp_dir(self):
+        """Temp directory is inside of the pod control directory."""
+        tmp_dir = self.pod.control_tmp_dir
+        self.assertTrue(os.path.isdir(tmp_dir))
+        self.assertEqual(
+            self.pod.abs_path('/.grow/tmp'), os.path.dirname(tmp_dir))
+
     def test_disable(self):
         self.assertTrue(self.pod.is_enabled('testing'))
         self.pod.disable('testing')
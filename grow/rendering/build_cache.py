@@ -0,0 +1,190 @@
+"""Content addressed cache shared between builds.
+
+The build cache stores rendered output and parsed data keyed by the hash of
+everything used to create them so that shards of a build and later builds,
+such as other CI runs, can reuse the work instead of doing it again.
+
+Rendered routes are stored in two parts:
+
+- The output is stored by the hash of the content.
+- The route is stored by a key made from the route and everything that
+  affects all of the routes. Since the files a route depends on are only known
+  after rendering, the entry for the route lists the hashes of the files used
+  for each of the recent outputs of the route.
+
+The storage is pluggable using backends, for example a directory that is
+mounted by all of the CI runners.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from urllib import parse as url_parse
+
+
+# Routes cached before version 2 do not list the templates they used.
+CACHE_VERSION = 2
+
+# Number of outputs for a route to keep, such as for different branches.
+MAX_VARIANTS = 4
+
+NAMESPACE_DATA = 'data'
+NAMESPACE_OUTPUT = 'output'
+NAMESPACE_ROUTES = 'routes'
+
+
+class Error(Exception):
+    """Base build cache error."""
+
+    def __init__(self, message):
+        super(Error, self).__init__(message)
+        self.message = message
+
+
+class UnknownBackendError(Error):
+    """Build cache location does not match a backend."""
+    pass
+
+
+class BuildCacheBackend:
+    """Storage for the build cache."""
+
+    def get(self, namespace, key):
+        """Bytes stored for the key or None."""
+        raise NotImplementedError
+
+    def put(self, namespace, key, data):
+        """Store the bytes for the key."""
+        raise NotImplementedError
+
+
+class LocalBuildCacheBackend(BuildCacheBackend):
+    """Build cache stored in a local directory."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(os.path.expanduser(root))
+
+    def _path(self, namespace, key):
+        return os.path.join(self.root, namespace, key[:2], key[2:])
+
+    def get(self, namespace, key):
+        try:
+            with open(self._path(namespace, key), 'rb') as cache_file:
+                return cache_file.read()
+        except (IOError, OSError):
+            return None
+
+    def put(self, namespace, key, data):
+        path = self._path(namespace, key)
+        dir_name = os.path.dirname(path)
+        if not os.path.exists(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+        # Other builds can be reading or writing the same keys.
+        fd, temp_path = tempfile.mkstemp(dir=dir_name, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as cache_file:
+            cache_file.write(data)
+        os.replace(temp_path, path)
+
+
+BACKENDS = {
+    'file': LocalBuildCacheBackend,
+}
+
+
+def register_backend(scheme, backend_class):
+    """Register a backend for build cache locations using the scheme."""
+    BACKENDS[scheme] = backend_class
+
+
+def create_backend(location):
+    """Create the backend for a location, such as a directory or a url."""
+    parsed = url_parse.urlparse(location)
+    if not parsed.scheme or len(parsed.scheme) == 1:
+        # Local paths, including windows drive letters.
+        return LocalBuildCacheBackend(location)
+    if parsed.scheme not in BACKENDS:
+        raise UnknownBackendError(
+            'No build cache backend for: {}'.format(location))
+    if parsed.scheme == 'file':
+        return LocalBuildCacheBackend(parsed.path)
+    return BACKENDS[parsed.scheme](location)
+
+
+class BuildCache:
+    """Shared cache of rendered routes and parsed data."""
+
+    def __init__(self, backend, version=None):
+        self.backend = backend
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_location(cls, location, version=None):
+        """Create the build cache for a location."""
+        return cls(create_backend(location), version=version)
+
+    def key(self, *parts):
+        """Key for the cache made from all of the parts."""
+        hashed = hashlib.sha1('{}:{}'.format(
+            CACHE_VERSION, self.version).encode('utf-8'))
+        for part in parts:
+            if not isinstance(part, bytes):
+                part = str(part).encode('utf-8')
+            hashed.update(b'\0')
+            hashed.update(part)
+        return hashed.hexdigest()
+
+    def get_data(self, key):
+        """Parsed data stored for the key."""
+        data = self.backend.get(NAMESPACE_DATA, key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def put_data(self, key, data):
+        """Store the parsed data for the key."""
+        self.backend.put(
+            NAMESPACE_DATA, key, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+    def get_output(self, route_key, is_valid):
+        """Find the output of a route with valid dependencies.
+
+        Returns the entry and the content of the output, or None.
+        """
+        for entry in self._get_route(route_key):
+            if not is_valid(entry['dependencies']):
+                continue
+            content = self.backend.get(NAMESPACE_OUTPUT, entry['output'])
+            if content is None:
+                continue
+            if not entry['is_bytes']:
+                content = content.decode('utf-8')
+            self.hits += 1
+            return entry, content
+        self.misses += 1
+        return None
+
+    def put_output(self, route_key, entry, content):
+        """Store the output of a route with the dependencies used."""
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+        self.backend.put(NAMESPACE_OUTPUT, entry['output'], content)
+        entries = [entry] + [
+            existing for existing in self._get_route(route_key)
+            if existing['dependencies'] != entry['dependencies']]
+        self.backend.put(NAMESPACE_ROUTES, route_key, pickle.dumps(
+            entries[:MAX_VARIANTS], pickle.HIGHEST_PROTOCOL))
+
+    def _get_route(self, route_key):
+        data = self.backend.get(NAMESPACE_ROUTES, route_key)
+        if data is None:
+            return []
+        try:
+            return pickle.loads(data)
+        except Exception:  # pylint: disable=broad-except
+            return []
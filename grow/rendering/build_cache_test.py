@@ -0,0 +1,139 @@
+"""Tests for the shared build cache."""
+
+import shutil
+import tempfile
+import unittest
+from grow.deployments.destinations import local as local_destination
+from grow.pods import env as environment
+from grow.pods import pods
+from grow import storage
+from grow.rendering import build_cache
+from grow.rendering import build_manifest
+from grow.rendering import renderer
+from grow.testing import testing
+
+
+class BuildCacheTestCase(unittest.TestCase):
+    """Test the build cache."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = build_cache.BuildCache.from_location(self.cache_dir)
+
+    def test_create_backend(self):
+        """Backends are created from the location."""
+        backend = build_cache.create_backend('file://{}'.format(self.cache_dir))
+        self.assertEqual(self.cache_dir, backend.root)
+        with self.assertRaises(build_cache.UnknownBackendError):
+            build_cache.create_backend('gs://bucket/cache')
+
+    def test_data(self):
+        """Parsed data is stored by key."""
+        key = self.cache.key('yaml', 'abc')
+        self.assertIsNone(self.cache.get_data(key))
+        self.cache.put_data(key, {'foo': ['bar']})
+        self.assertEqual({'foo': ['bar']}, self.cache.get_data(key))
+
+        # Keys depend on the version.
+        other = build_cache.BuildCache(self.cache.backend, version='2')
+        self.assertNotEqual(key, other.key('yaml', 'abc'))
+
+    def test_output(self):
+        """Outputs are found using the dependencies."""
+        hashes = {'/content/foo.yaml': 'a'}
+        is_valid = lambda dependencies: all(
+            hashes.get(path) == hashed for path, hashed in dependencies.items())
+        key = self.cache.key('/foo/index.html')
+        self.cache.put_output(key, {
+            'dependencies': {'/content/foo.yaml': 'a'},
+            'references': [],
+            'output': 'output-a',
+            'is_bytes': False,
+        }, 'Foo A')
+        self.cache.put_output(key, {
+            'dependencies': {'/content/foo.yaml': 'b'},
+            'references': [],
+            'output': 'output-b',
+            'is_bytes': False,
+        }, 'Foo B')
+
+        _, content = self.cache.get_output(key, is_valid)
+        self.assertEqual('Foo A', content)
+        hashes['/content/foo.yaml'] = 'b'
+        _, content = self.cache.get_output(key, is_valid)
+        self.assertEqual('Foo B', content)
+        hashes['/content/foo.yaml'] = 'c'
+        self.assertIsNone(self.cache.get_output(key, is_valid))
+        self.assertEqual(2, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+
+class BuildCacheManifestTestCase(unittest.TestCase):
+    """Test sharing the build cache between builds."""
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def _build(self):
+        out_dir = tempfile.mkdtemp()
+        destination = local_destination.LocalDestination(
+            local_destination.Config(out_dir=out_dir))
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage, env=environment.Env(
+            environment.EnvConfig(host='localhost', fingerprint='abc')))
+        pod.router.add_all(use_cache=False)
+        cache = build_cache.BuildCache.from_location(self.cache_dir)
+        manifest = build_manifest.BuildManifest(
+            pod, out_dir, build_cache=cache)
+        rendered_docs = {}
+        for rendered_doc in renderer.Renderer.stream_rendered_docs(
+                pod, pod.router.routes, manifest=manifest):
+            destination.write_file(rendered_doc)
+            rendered_docs[rendered_doc.path] = rendered_doc
+        shutil.rmtree(out_dir)
+        return manifest, rendered_docs
+
+    def test_reuse(self):
+        """Builds to other directories reuse the shared outputs."""
+        manifest, first_docs = self._build()
+        self.assertEqual(0, manifest.reused_count)
+
+        manifest, second_docs = self._build()
+        self.assertTrue(manifest.reused_count)
+        self.assertTrue(manifest.build_cache.hits)
+        for path, rendered_doc in second_docs.items():
+            self.assertEqual(first_docs[path].hash, rendered_doc.hash)
+
+    def test_changed_template(self):
+        """Builds sharing the cache do not reuse outputs of changed templates."""
+        _, first_docs = self._build()
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        posts = pod.read_file('/views/posts.html')
+        pod.write_file('/views/posts.html', posts.replace(
+            '{% endblock %}', 'Posts v2\n{% endblock %}'))
+
+        manifest, second_docs = self._build()
+        self.assertTrue(manifest.reused_count)
+        self.assertNotEqual(
+            first_docs['/post/newer/index.html'].hash,
+            second_docs['/post/newer/index.html'].hash)
+        self.assertIn('Posts v2', second_docs['/post/newer/index.html'].read())
+        self.assertEqual(
+            first_docs['/intro/index.html'].hash,
+            second_docs['/intro/index.html'].hash)
+
+    def test_yaml(self):
+        """Parsed yaml is shared between pods."""
+        cache = build_cache.BuildCache.from_location(self.cache_dir)
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        pod.podcache.yaml_cache.build_cache = cache
+        pod.podcache.yaml_cache.add_content('/foo.yaml', 'foo: bar', {'foo': 'bar'})
+
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        pod.podcache.yaml_cache.build_cache = cache
+        self.assertEqual({'foo': 'bar'}, pod.podcache.yaml_cache.get_content(
+            '/other.yaml', 'foo: bar'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+"""Manifest of the rendered routes for incremental builds.
+
+The manifest records the content hashes of everything a rendered route
+depended on and the hash of the output it produced. When none of the inputs
+of a route have changed the previous output is reused instead of rendering
+the route again.
+
+With a shared build cache the outputs are also stored in and reused from the
+build cache so other shards and builds can use them.
+
+Rendered routes can use the fingerprint of the environment, which is the
+time of the build unless set in the environment config, so the routes are
+only reused between builds with the same fingerprint.
+"""
+
+import hashlib
+import json
+import os
+import pkg_resources
+from grow.rendering import rendered_document
+
+
+FILE_BUILD_MANIFEST = 'buildmanifest.json'
+
+# Manifests before version 2 do not list the templates used by the routes.
+MANIFEST_VERSION = 2
+
+# Only these kinds of routes have their dependencies fully tracked.
+INCREMENTAL_KINDS = ('doc', 'static')
+
+# Changes to any of these paths cause a full build.
+GLOBAL_PATHS = ('/podspec.yaml', '/extensions.txt', '/extensions', '/ext')
+
+
+def grow_version():
+    """Version of grow used for the build."""
+    try:
+        return pkg_resources.get_distribution('grow').version
+    except pkg_resources.DistributionNotFound:
+        return None
+
+
+class BuildManifest:
+    """Tracks the dependencies and output of rendered routes."""
+
+    def __init__(self, pod, out_dir, build_cache=None):
+        self.pod = pod
+        self.out_dir = os.path.abspath(out_dir)
+        self.build_cache = build_cache
+        self.reused_count = 0
+        self._entries = {}
+        self._hashes = {}
+        self._listings = {}
+        self._fingerprint = None
+        self._shared_fingerprint = None
+        self._seen = set()
+
+    @property
+    def file_name(self):
+        """Pod path for the manifest file."""
+        return '{}{}'.format(self.pod.PATH_CONTROL, FILE_BUILD_MANIFEST)
+
+    @property
+    def fingerprint(self):
+        """Fingerprint for everything that affects all of the routes."""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha1(json.dumps(
+                dict(self._fingerprint_parts(), out_dir=self.out_dir),
+                sort_keys=True).encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    @property
+    def shared_fingerprint(self):
+        """Fingerprint for all of the routes that does not depend on the build."""
+        if self._shared_fingerprint is None:
+            self._shared_fingerprint = hashlib.sha1(json.dumps(
+                self._fingerprint_parts(), sort_keys=True).encode('utf-8')).hexdigest()
+        return self._shared_fingerprint
+
+    def _fingerprint_parts(self):
+        env_config = self.pod.env.config
+        return {
+            'version': grow_version(),
+            'env': [
+                env_config.name, env_config.host, env_config.port,
+                env_config.scheme, self.pod.env.fingerprint],
+            'global': {
+                path: self._hash_path(path) for path in GLOBAL_PATHS},
+            # Adding or removing content changes lists of docs.
+            'content': self._list_dir('/content'),
+        }
+
+    def _list_dir(self, pod_path):
+        if pod_path not in self._listings:
+            self._listings[pod_path] = sorted(
+                '{}/{}'.format(pod_path.rstrip('/'), path.lstrip('/'))
+                for path in self.pod.list_dir(pod_path))
+        return self._listings[pod_path]
+
+    def _hash_path(self, pod_path):
+        """Hash of a file, or of all the files in a directory."""
+        if pod_path not in self._hashes:
+            listing = self._list_dir(pod_path)
+            if listing:
+                hashed = hashlib.sha1()
+                for path in listing:
+                    hashed.update('{}:{}\n'.format(
+                        path, self._hash_path(path)).encode('utf-8'))
+                value = hashed.hexdigest()
+            elif self.pod.file_exists(pod_path):
+                value = self.pod.hash_file(pod_path)
+            else:
+                value = None
+            self._hashes[pod_path] = value
+        return self._hashes[pod_path]
+
+    def _dependencies(self, controller):
+        """All of the paths that a route used to render."""
+        kind = controller.route_info.kind
+        pod_path = controller.pod_path
+        if kind == 'static':
+            return set([pod_path])
+
+        # Transitive dependencies from the dependency graph, including the
+        # templates loaded while rendering.
+        dependency_graph = self.pod.podcache.dependency_graph
+        paths = set()
+        pending = [pod_path]
+        while pending:
+            path = pending.pop()
+            if path in paths:
+                continue
+            paths.add(path)
+            pending.extend(dependency_graph.get_dependencies(path))
+
+        # Files that are read by documents without being tracked.
+        meta = controller.route_info.meta
+        collection_path = meta.get('collection_path')
+        if collection_path:
+            paths.add('{}/_blueprint.yaml'.format(collection_path.rstrip('/')))
+        dir_name, base_name = os.path.split(pod_path)
+        prefix = '{}/{}@'.format(dir_name, os.path.splitext(base_name)[0])
+        for path in self._list_dir(dir_name):
+            if path.startswith(prefix):
+                paths.add(path)
+        locale = controller.locale
+        if locale:
+            paths.add('/translations/{}'.format(locale))
+        return paths
+
+    def _is_valid(self, dependencies):
+        for path, hashed in dependencies.items():
+            if self._hash_path(path) != hashed:
+                return False
+        return True
+
+    def _route_key(self, controller, rendered_path):
+        return self.build_cache.key(
+            self.shared_fingerprint, controller.route_info.kind, rendered_path,
+            controller.serving_path)
+
+    def _reuse_shared(self, controller, rendered_path):
+        """Rendered document from the shared build cache if still valid."""
+        if self.build_cache is None:
+            return None
+        found = self.build_cache.get_output(
+            self._route_key(controller, rendered_path), self._is_valid)
+        if not found:
+            return None
+        entry, content = found
+        if entry['references']:
+            self.pod.podcache.dependency_graph.add_references(
+                controller.pod_path, entry['references'])
+        rendered_doc = rendered_document.RenderedDocument.from_data(
+            rendered_path, entry['output'], content=content,
+            is_bytes=entry['is_bytes'])
+        self._entries[rendered_path] = dict(
+            entry, serving_path=controller.serving_path,
+            size=self._output_size(rendered_doc))
+        self._seen.add(rendered_path)
+        self.reused_count += 1
+        return rendered_doc
+
+    def _out_path(self, rendered_path):
+        return os.path.join(self.out_dir, rendered_path.lstrip('/'))
+
+    def load(self):
+        """Load the manifest from the previous build."""
+        self._entries = {}
+        if not self.pod.file_exists(self.file_name):
+            return
+        try:
+            data = self.pod.read_json(self.file_name) or {}
+        except ValueError:
+            return
+        if data.get('version') != MANIFEST_VERSION:
+            return
+        if data.get('fingerprint') != self.fingerprint:
+            return
+        self._entries = data.get('routes', {})
+
+    def rendered_path(self, controller):
+        """Rendered path of a route that can be reused in later builds."""
+        if controller.route_info.kind not in INCREMENTAL_KINDS:
+            return None
+        try:
+            return controller.rendered_path
+        except Exception:  # pylint: disable=broad-except
+            # The error is reported when the route is rendered.
+            return None
+
+    def reuse(self, controller):
+        """Rendered document from the previous build if still valid."""
+        rendered_path = self.rendered_path(controller)
+        if not rendered_path:
+            return None
+        entry = self._entries.get(rendered_path)
+        if (not entry or entry['serving_path'] != controller.serving_path
+                or not self._is_valid(entry['dependencies'])):
+            return self._reuse_shared(controller, rendered_path)
+
+        out_path = self._out_path(rendered_path)
+        try:
+            if os.path.getsize(out_path) != entry['size']:
+                return self._reuse_shared(controller, rendered_path)
+        except OSError:
+            return self._reuse_shared(controller, rendered_path)
+
+        # Keep the dependency graph the same as when rendered.
+        if entry['references']:
+            self.pod.podcache.dependency_graph.add_references(
+                controller.pod_path, entry['references'])
+        self._seen.add(rendered_path)
+        self.reused_count += 1
+        return rendered_document.RenderedDocument.from_file(
+            rendered_path, out_path, entry['output'],
+            is_bytes=entry['is_bytes'])
+
+    def record(self, controller, rendered_doc):
+        """Record the dependencies and output of a rendered route."""
+        if controller.route_info.kind not in INCREMENTAL_KINDS:
+            return
+        dependency_graph = self.pod.podcache.dependency_graph
+        pod_path = controller.pod_path
+        self._seen.add(rendered_doc.path)
+        entry = {
+            'dependencies': {
+                path: self._hash_path(path)
+                for path in self._dependencies(controller)},
+            'references': sorted(dependency_graph.get_dependencies(pod_path)),
+            'output': rendered_doc.hash,
+            'is_bytes': rendered_doc.is_bytes,
+        }
+        self._entries[rendered_doc.path] = dict(
+            entry, serving_path=controller.serving_path,
+            size=self._output_size(rendered_doc))
+        if self.build_cache is not None:
+            self.build_cache.put_output(
+                self._route_key(controller, rendered_doc.path), entry,
+                rendered_doc.read())
+
+    @staticmethod
+    def _output_size(rendered_doc):
+        if rendered_doc.file_path:
+            return os.path.getsize(rendered_doc.file_path)
+        content = rendered_doc.read()
+        if not rendered_doc.is_bytes:
+            content = content.encode('utf-8')
+        return len(content)
+
+    def write(self, prune=True):
+        """Write the manifest for the next build.
+
+        When pruning, only the routes from this build are kept.
+        """
+        routes = self._entries
+        if prune:
+            routes = {
+                key: value for key, value in routes.items()
+                if key in self._seen}
+        self.pod.write_file(self.file_name, json.dumps({
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'routes': routes,
+        }, sort_keys=True))
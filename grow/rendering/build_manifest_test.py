@@ -0,0 +1,129 @@
+"""Tests for the build manifest."""
+
+import tempfile
+import unittest
+import mock
+from grow.deployments.destinations import local as local_destination
+from grow.pods import env as environment
+from grow.pods import pods
+from grow import storage
+from grow.rendering import build_manifest
+from grow.rendering import renderer
+from grow.testing import testing
+
+
+class BuildManifestTestCase(unittest.TestCase):
+    """Test the build manifest."""
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.out_dir = tempfile.mkdtemp()
+        self.destination = local_destination.LocalDestination(
+            local_destination.Config(out_dir=self.out_dir))
+
+    def _build(self, fingerprint='abc'):
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage, env=environment.Env(
+            environment.EnvConfig(host='localhost', fingerprint=fingerprint)))
+        pod.router.add_all(use_cache=False)
+        manifest = build_manifest.BuildManifest(pod, self.out_dir)
+        manifest.load()
+        rendered_docs = {}
+        for rendered_doc in renderer.Renderer.stream_rendered_docs(
+                pod, pod.router.routes, manifest=manifest):
+            self.destination.write_file(rendered_doc)
+            rendered_docs[rendered_doc.path] = rendered_doc
+        manifest.write()
+        return pod, manifest, rendered_docs
+
+    def test_reuse(self):
+        """Unchanged routes reuse the previous output."""
+        _, manifest, first_docs = self._build()
+        self.assertEqual(0, manifest.reused_count)
+
+        pod, manifest, second_docs = self._build()
+        self.assertTrue(manifest.reused_count)
+        self.assertEqual(sorted(first_docs.keys()), sorted(second_docs.keys()))
+        for path, rendered_doc in second_docs.items():
+            self.assertEqual(first_docs[path].hash, rendered_doc.hash)
+            self.assertEqual(first_docs[path].read(), rendered_doc.read())
+
+        # Reused docs keep their dependencies in the dependency graph.
+        self.assertTrue(pod.podcache.dependency_graph.get_dependencies(
+            '/content/pages/intro.md'))
+
+    def test_changed_dependency(self):
+        """Routes with changed dependencies are rendered again."""
+        self._build()
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        content = pod.read_file('/content/pages/intro.md')
+        pod.write_file('/content/pages/intro.md', content + '\nChanged.\n')
+
+        _, manifest, rendered_docs = self._build()
+        reused_paths = set(
+            path for path, rendered_doc in rendered_docs.items()
+            if rendered_doc.file_path)
+        self.assertTrue(reused_paths)
+        self.assertNotIn('/intro/index.html', reused_paths)
+        self.assertIn('Changed.', rendered_docs['/intro/index.html'].read())
+
+    def test_changed_template(self):
+        """Routes are rendered again when the templates they load change."""
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        base = pod.read_file('/views/base.html')
+        pod.write_file(
+            '/views/base.html', base + '{% include "/partials/footer.html" %}\n')
+        pod.write_file('/partials/footer.html', 'Footer v1\n')
+        self._build()
+
+        # The posts view extends the base view which includes the partial.
+        pod.write_file('/partials/footer.html', 'Footer v2\n')
+        _, manifest, rendered_docs = self._build()
+        self.assertTrue(manifest.reused_count)
+        for path in ('/intro/index.html', '/post/newer/index.html'):
+            self.assertIsNone(rendered_docs[path].file_path)
+            self.assertIn('Footer v2', rendered_docs[path].read())
+
+        base = pod.read_file('/views/base.html')
+        pod.write_file('/views/base.html', base + 'Base v2\n')
+        _, manifest, rendered_docs = self._build()
+        for path in ('/intro/index.html', '/post/newer/index.html'):
+            self.assertIsNone(rendered_docs[path].file_path)
+            self.assertIn('Base v2', rendered_docs[path].read())
+
+        # The posts view is not used by the intro page.
+        posts = pod.read_file('/views/posts.html')
+        pod.write_file('/views/posts.html', posts.replace(
+            '{% endblock %}', 'Posts v2\n{% endblock %}'))
+        _, manifest, rendered_docs = self._build()
+        self.assertIsNotNone(rendered_docs['/intro/index.html'].file_path)
+        self.assertIsNone(rendered_docs['/post/newer/index.html'].file_path)
+        self.assertIn('Posts v2', rendered_docs['/post/newer/index.html'].read())
+
+    def test_env_fingerprint(self):
+        """Routes are only reused with the same environment fingerprint."""
+        self._build()
+        _, manifest, _ = self._build(fingerprint='def')
+        self.assertEqual(0, manifest.reused_count)
+
+        # Without a fingerprint the environment uses the time of the build.
+        with mock.patch('time.time', return_value=100):
+            pod, manifest, _ = self._build(fingerprint=None)
+        self.assertEqual('100', pod.env.fingerprint)
+        self.assertEqual(0, manifest.reused_count)
+        with mock.patch('time.time', return_value=200):
+            _, manifest, _ = self._build(fingerprint=None)
+        self.assertEqual(0, manifest.reused_count)
+
+    def test_global_change(self):
+        """Changes to the podspec render everything again."""
+        self._build()
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        podspec = pod.read_file('/podspec.yaml')
+        pod.write_file('/podspec.yaml', podspec + '\n# Changed.\n')
+
+        _, manifest, _ = self._build()
+        self.assertEqual(0, manifest.reused_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
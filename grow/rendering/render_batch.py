@@ -1,8 +1,22 @@
 """Renderer for performing render operations for the pod."""
 
+import collections
+import copy
+import functools
+import multiprocessing
 import sys
+import traceback
 from multiprocessing.dummy import Pool as ThreadPool
+from grow.performance import profile as grow_profile
 from grow.pods import errors
+from grow.rendering import rendered_document
+from grow.routing import router as grow_router
+
+
+# Pod used by a render process. Each process in the process pool creates and
+# keeps its own pod (with its own render pool and podcache) for the life of
+# the process so that the loaded documents and templates stay warm.
+_PROCESS_POD = None
 
 
 class Error(Exception):
@@ -22,12 +36,7 @@ class RenderError(Error):
         self.err_tb = err_tb
 
 
-class RenderNotStartedError(Error):
-    """Rendering was not started."""
-    pass
-
-
-def load_func(batch, source_dir, tick=None):
+def load_func(batch, source_dir):
     """Render the controller."""
     result = LoadBatchResult()
     for item in batch:
@@ -43,20 +52,23 @@ def load_func(batch, source_dir, tick=None):
             result.load_errors.append(RenderError(
                 "Error loading {}".format(controller.serving_path),
                 err, err_tb))
-        finally:
-            if tick:
-                tick()
     return result
 
 
-def render_func(batch, tick=None):
+def render_func(batch):
     """Render the controller."""
     result = RenderBatchResult()
     for item in batch:
         controller = item['controller']
         try:
-            result.rendered_docs.append(controller.render(
-                jinja_env=item['jinja_env']))
+            if controller.use_jinja:
+                # Lease an environment so that no other thread is rendering
+                # with the same environment at the same time.
+                with item['render_pool'].lease(item['locale']) as jinja_env:
+                    rendered_doc = controller.render(jinja_env=jinja_env)
+            else:
+                rendered_doc = controller.render(jinja_env=None)
+            result.rendered_docs.append(rendered_doc)
         except errors.BuildError as err:
             result.render_errors.append(RenderError(
                 "Error rendering {}".format(controller.serving_path),
@@ -66,15 +78,85 @@ def render_func(batch, tick=None):
             result.render_errors.append(RenderError(
                 "Error rendering {}".format(controller.serving_path),
                 err, err_tb))
-        finally:
-            if tick:
-                tick()
+    return result
+
+
+def process_init(root, storage, env_config):
+    """Initialize the pod for a render process."""
+    # Lazy import avoids a circular import with the pod.
+    from grow.pods import pods
+
+    # pylint: disable=global-statement
+    global _PROCESS_POD
+    _PROCESS_POD = pods.Pod(root, storage=storage)
+    _PROCESS_POD.set_env(env_config)
+
+
+def process_render_func(work_unit):
+    """Render a batch of routes in a render process.
+
+    The work unit and the result need to be serializable to be passed between
+    the processes so the results only contain the exported data.
+    """
+    pod = _PROCESS_POD
+    dependency_graph = pod.podcache.dependency_graph
+
+    # Only send back the dependencies changed by this work unit. The graph is
+    # kept since documents loaded by earlier work units are cached.
+    dependency_graph.mark_clean()
+    pod.profile.timers = []
+    pod.profile.templates.reset()
+
+    result = ProcessBatchResult()
+    sources = set()
+    for serving_path, route_data, params in work_unit['routes']:
+        route_info = grow_router.RouteInfo.from_data(**route_data)
+        controller = pod.router.get_render_controller(
+            serving_path, route_info, params=params)
+        if route_info.meta.get('pod_path'):
+            sources.add(route_info.meta['pod_path'])
+        try:
+            if controller.use_jinja:
+                # Lease the same as rendering with threads so the pool limits
+                # apply to the render processes too.
+                with pod.render_pool.lease(work_unit['locale']) as jinja_env:
+                    rendered_doc = controller.render(jinja_env=jinja_env)
+            else:
+                rendered_doc = controller.render(jinja_env=None)
+            result.rendered_docs.append(rendered_doc.export())
+        except errors.BuildError as err:
+            result.render_errors.append({
+                'message': 'Error rendering {}'.format(serving_path),
+                'error': str(err),
+                'traceback': ''.join(traceback.format_tb(err.traceback)),
+            })
+        except Exception as err:  # pylint: disable=broad-except
+            result.render_errors.append({
+                'message': 'Error rendering {}'.format(serving_path),
+                'error': str(err),
+                'traceback': traceback.format_exc(),
+            })
+
+    # The dependencies replace the existing dependencies of the sources so
+    # the rendered sources always send all of their dependencies.
+    _, result.dependencies = dependency_graph.changes()
+    for source in sources:
+        source = dependency_graph.normalize_path(source)
+        dependencies = dependency_graph.get_dependencies(source)
+        if dependencies:
+            result.dependencies[source] = sorted(dependencies)
+    result.timers = pod.profile.export()
+    result.templates = pod.profile.templates.export()
+    pod.profile.timers = []
+    pod.profile.templates.reset()
     return result
 
 
 class RenderBatches:
     """Handles the batching of rendering."""
 
+    STREAM_DEFAULT_WINDOW = 4  # Default number of batches in flight.
+
     def __init__(self, render_pool, profile, tick=None, batch_size=None):
         self.batch_size = batch_size
         self.profile = profile
@@ -91,8 +173,7 @@ class RenderBatches:
     def _get_batch(self, locale):
         if locale not in self._batches:
             self._batches[locale] = RenderLocaleBatch(
-                self.render_pool.get_jinja_env(locale), self.profile, tick=self.tick,
-                batch_size=self.batch_size)
+                self.render_pool, locale=locale, batch_size=self.batch_size)
         return self._batches[locale]
 
     def add(self, controller, *args, **kwargs):
@@ -100,68 +181,163 @@ class RenderBatches:
         batch = self._get_batch(controller.locale)
         batch.add(controller, *args, **kwargs)
 
+    def _stream_results(self, func, items, use_threading=True, window_size=None):
+        """Run the func for each item, yielding the results in order.
+
+        At most `window_size` items are in flight at a time so that the
+        finished results do not pile up faster than they are consumed.
+        """
+        if not ThreadPool or not use_threading:
+            for item in items:
+                yield func(item)
+            return
+
+        window_size = window_size or self.STREAM_DEFAULT_WINDOW
+        thread_pool = ThreadPool(window_size)
+        in_flight = collections.deque()
+        try:
+            for item in items:
+                if len(in_flight) >= window_size:
+                    yield in_flight.popleft().get()
+                in_flight.append(thread_pool.apply_async(func, (item,)))
+            while in_flight:
+                yield in_flight.popleft().get()
+            thread_pool.close()
+        finally:
+            thread_pool.terminate()
+            thread_pool.join()
+
+    def _tick_results(self, count):
+        if self.tick:
+            for _ in range(count):
+                self.tick()
+
+    def load_stream(self, source_dir, use_threading=True, window_size=None):
+        """Load all of the batches, yielding the results as they finish."""
+        func = functools.partial(load_func, source_dir=source_dir)
+        for batch_result in self._stream_results(
+                func, self.batches, use_threading=use_threading,
+                window_size=window_size):
+            for result in batch_result.loaded_docs:
+                self.profile.add_timer(result.load_timer)
+            self._tick_results(
+                len(batch_result.loaded_docs) + len(batch_result.load_errors))
+            yield batch_result.loaded_docs, batch_result.load_errors
+
     def load(self, source_dir, use_threading=True):
         """Load all of the batches."""
         load_errors = []
         load_docs = []
-
-        # Disable threaded rendering until it can be fixed.
-        use_threading = False
-
-        if not ThreadPool or not use_threading:
-            for _, batch in self._batches.items():
-                batch_docs, batch_errors = batch.load_sync(source_dir)
-                load_errors = load_errors + batch_errors
-                load_docs = load_docs + batch_docs
-        else:
-            for _, batch in self._batches.items():
-                batch.load_start(source_dir)
-            for _, batch in self._batches.items():
-                batch_docs, batch_errors = batch.load_finish()
-                load_errors = load_errors + batch_errors
-                load_docs = load_docs + batch_docs
-
+        for batch_docs, batch_errors in self.load_stream(
+                source_dir, use_threading=use_threading):
+            load_errors = load_errors + batch_errors
+            load_docs = load_docs + batch_docs
         return load_docs, load_errors
 
+    def render_stream(self, use_threading=True, window_size=None):
+        """Render all of the batches, yielding the results as they finish."""
+        for batch_result in self._stream_results(
+                render_func, self.batches, use_threading=use_threading,
+                window_size=window_size):
+            for result in batch_result.rendered_docs:
+                self.profile.add_timer(result.render_timer)
+            self._tick_results(
+                len(batch_result.rendered_docs) + len(batch_result.render_errors))
+            yield batch_result.rendered_docs, batch_result.render_errors
+
     def render(self, use_threading=True):
         """Render all of the batches."""
         render_errors = []
         rendered_docs = []
+        for batch_docs, batch_errors in self.render_stream(
+                use_threading=use_threading):
+            render_errors = render_errors + batch_errors
+            rendered_docs = rendered_docs + batch_docs
+        return rendered_docs, render_errors
 
-        # Disable threaded rendering until it can be fixed.
-        use_threading = False
+    def render_processes_stream(self, process_count, window_size=None):
+        """Render all of the batches using a pool of render processes.
+
+        Each of the locale batches is broken into work units that are sent to
+        the render processes. The rendered documents, timers, and dependency
+        graph changes are merged back into the pod as the work units finish.
+        """
+        pod = self.render_pool.pod
+
+        # Keep the fingerprint consistent between the processes.
+        env_config = copy.deepcopy(pod.env.config)
+        env_config.fingerprint = pod.env.fingerprint
+
+        work_units = []
+        for locale, batch in self._batches.items():
+            work_units.extend(batch.work_units(str(locale)))
+
+        window_size = window_size or process_count * 2
+        process_pool = multiprocessing.Pool(
+            process_count, initializer=process_init,
+            initargs=(pod.root, pod.storage, env_config))
+        in_flight = collections.deque()
+
+        def _merge_result(batch_result):
+            rendered_docs = []
+            render_errors = []
+            for data in batch_result.rendered_docs:
+                rendered_docs.append(
+                    rendered_document.RenderedDocument.from_data(**data))
+            for data in batch_result.render_errors:
+                render_errors.append(RenderError(
+                    data['message'],
+                    Error('{}\n{}'.format(data['error'], data['traceback'])),
+                    None))
+            for data in batch_result.timers:
+                self.profile.add_timer(grow_profile.Timer.from_data(**data))
+            self.profile.templates.merge(batch_result.templates)
+            pod.podcache.update(dep_cache=batch_result.dependencies)
+            self._tick_results(len(batch_result))
+            return rendered_docs, render_errors
 
-        if not ThreadPool or not use_threading:
-            for _, batch in self._batches.items():
-                batch_docs, batch_errors = batch.render_sync()
-                render_errors = render_errors + batch_errors
-                rendered_docs = rendered_docs + batch_docs
-        else:
-            for _, batch in self._batches.items():
-                batch.render_start()
-            for _, batch in self._batches.items():
-                batch_docs, batch_errors = batch.render_finish()
-                render_errors = render_errors + batch_errors
-                rendered_docs = rendered_docs + batch_docs
+        try:
+            for work_unit in work_units:
+                if len(in_flight) >= window_size:
+                    yield _merge_result(in_flight.popleft().get())
+                in_flight.append(process_pool.apply_async(
+                    process_render_func, (work_unit,)))
+            while in_flight:
+                yield _merge_result(in_flight.popleft().get())
+            process_pool.close()
+        finally:
+            process_pool.terminate()
+            process_pool.join()
 
+    def render_processes(self, process_count):
+        """Render all of the batches using a pool of render processes."""
+        render_errors = []
+        rendered_docs = []
+        for batch_docs, batch_errors in self.render_processes_stream(
+                process_count):
+            render_errors = render_errors + batch_errors
+            rendered_docs = rendered_docs + batch_docs
         return rendered_docs, render_errors
 
+    @property
+    def batches(self):
+        """All of the batches for all of the locales."""
+        for _, locale_batch in self._batches.items():
+            for batch in locale_batch.batches:
+                if batch:
+                    yield batch
+
 
 class RenderLocaleBatch:
-    """Handles the rendering and threading of the controllers."""
+    """Handles the batching of the controllers for a locale."""
 
     BATCH_DEFAULT_SIZE = 300  # Default number of documents in a batch.
 
-    def __init__(self, jinja_env, profile, tick=None, batch_size=None):
+    def __init__(self, render_pool, locale=None, batch_size=None):
         self.batch_size = batch_size or self.BATCH_DEFAULT_SIZE
-        self.jinja_env = jinja_env
-        self.profile = profile
-        self.tick = tick
+        self.render_pool = render_pool
+        self.locale = locale
         self.batches = [[]]
-        self._is_loading = False
-        self._is_rendering = False
-        self._results = None
-        self._thread_pool = None
 
     def __len__(self):
         count = 0
@@ -183,98 +359,27 @@ class RenderLocaleBatch:
 
         batch.append({
             'controller': controller,
-            'jinja_env': self.jinja_env,
+            'render_pool': self.render_pool,
+            'locale': self.locale,
             'args': args,
             'kwargs': kwargs,
         })
 
-    def load_start(self, source_dir):
-        """Start the batches loading."""
-        self._thread_pool = ThreadPool(len(self.batches))
-        self._results = self._thread_pool.imap_unordered(
-            load_func, self.batches, source_dir)
-        self._is_loading = True
-
-    def load_finish(self):
-        """Finish in progress batches loading."""
-        if not self._is_loading:
-            raise RenderNotStartedError('Rendering was never started')
-
-        load_errors = []
-        loaded_docs = []
-
-        for batch_result in self._results:
-            load_errors = load_errors + batch_result.load_errors
-            loaded_docs = loaded_docs + batch_result.loaded_docs
-            if self.tick:
-                for _ in batch_result.load_errors:
-                    self.tick()
-                for _ in batch_result.loaded_docs:
-                    self.tick()
-            for result in batch_result.loaded_docs:
-                self.profile.add_timer(result.load_timer)
-
-        self._thread_pool.close()
-        self._thread_pool.join()
-        self._is_loading = False
-
-        return loaded_docs, load_errors
-
-    def load_sync(self, source_dir):
-        """Syncronous loading for non-threaded loading."""
-        load_errors = []
-        loaded_docs = []
-
+    def work_units(self, locale):
+        """Serializable work units for rendering in a render process."""
         for batch in self.batches:
-            batch_result = load_func(batch, source_dir, tick=self.tick)
-            load_errors = load_errors + batch_result.load_errors
-            loaded_docs = loaded_docs + batch_result.loaded_docs
-
-        return loaded_docs, load_errors
-
-    def render_start(self):
-        """Start the batches rendering."""
-        self._thread_pool = ThreadPool(len(self.batches))
-        self._results = self._thread_pool.imap_unordered(
-            render_func, self.batches)
-        self._is_rendering = True
-
-    def render_finish(self):
-        """Finish in progress batches rendering."""
-        if not self._is_rendering:
-            raise RenderNotStartedError('Rendering was never started')
-
-        render_errors = []
-        rendered_docs = []
-
-        for batch_result in self._results:
-            render_errors = render_errors + batch_result.render_errors
-            rendered_docs = rendered_docs + batch_result.rendered_docs
-            if self.tick:
-                for _ in batch_result.render_errors:
-                    self.tick()
-                for _ in batch_result.rendered_docs:
-                    self.tick()
-            for result in batch_result.rendered_docs:
-                self.profile.add_timer(result.render_timer)
-
-        self._thread_pool.close()
-        self._thread_pool.join()
-        self._is_rendering = False
-
-        return rendered_docs, render_errors
-
-    def render_sync(self):
-        """Syncronous rendering for non-threaded rendering."""
-        render_errors = []
-        rendered_docs = []
-
-        for batch in self.batches:
-            batch_result = render_func(batch, tick=self.tick)
-            render_errors = render_errors + batch_result.render_errors
-            rendered_docs = rendered_docs + batch_result.rendered_docs
-
-        return rendered_docs, render_errors
+            if not batch:
+                continue
+            routes = []
+            for item in batch:
+                controller = item['controller']
+                routes.append((
+                    controller.serving_path, controller.route_info.export(),
+                    controller.params))
+            yield {
+                'locale': locale,
+                'routes': routes,
+            }
 
 
 class LoadBatchResult:
@@ -291,3 +396,17 @@ class RenderBatchResult:
     def __init__(self):
         self.render_errors = []
         self.rendered_docs = []
+
+
+class ProcessBatchResult:
+    """Results from a batched rendering in a render process."""
+
+    def __init__(self):
+        self.dependencies = {}
+        self.render_errors = []
+        self.rendered_docs = []
+        self.templates = {}
+        self.timers = []
+
+    def __len__(self):
+        return len(self.rendered_docs) + len(self.render_errors)
@@ -1,6 +1,7 @@
 """Tests for the render batch."""
 
 import unittest
+import mock
 from grow.pods import pods
 from grow import storage
 from grow.rendering import render_batch
@@ -41,11 +42,51 @@ class RendererTestCase(unittest.TestCase):
 
         self.assertEqual(len(routes), len(self.batches))
 
-    def test_render_batch_not_started(self):
-        """Breaks up the rendering into max sized batches."""
-        batch = render_batch.RenderLocaleBatch(None, None)
-        with self.assertRaises(render_batch.RenderNotStartedError):
-            batch.render_finish()
+    def test_process_render_func(self):
+        """Work units send back all of the dependencies of the sources."""
+        self.pod.router.add_all(use_cache=False)
+        pod_path = '/content/pages/intro.md'
+        for controller in renderer.Renderer.controller_generator(
+                self.pod, self.pod.router.routes):
+            if controller.pod_path == pod_path:
+                break
+        work_unit = {
+            'locale': str(controller.locale),
+            'routes': [(
+                controller.serving_path, controller.route_info.export(),
+                controller.params)],
+        }
+        render_batch.process_init(
+            self.pod.root, self.pod.storage, self.pod.env.config)
+        first = render_batch.process_render_func(work_unit)
+        self.assertIn(pod_path, first.dependencies)
+
+        # The doc is cached by the process pod for the second work unit.
+        second = render_batch.process_render_func(work_unit)
+        self.assertEqual(
+            first.dependencies[pod_path], second.dependencies[pod_path])
+
+    def test_process_render_func_lease(self):
+        """Work units lease the environments from the render pool."""
+        self.pod.router.add_all(use_cache=False)
+        controller = next(
+            controller for controller in renderer.Renderer.controller_generator(
+                self.pod, self.pod.router.routes)
+            if controller.pod_path == '/content/pages/intro.md')
+        work_unit = {
+            'locale': str(controller.locale),
+            'routes': [(
+                controller.serving_path, controller.route_info.export(),
+                controller.params)],
+        }
+        render_batch.process_init(
+            self.pod.root, self.pod.storage, self.pod.env.config)
+        render_pool = render_batch._PROCESS_POD.render_pool
+        with mock.patch.object(
+                render_pool, 'lease', wraps=render_pool.lease) as mock_lease:
+            result = render_batch.process_render_func(work_unit)
+        self.assertEqual(1, len(result.rendered_docs))
+        mock_lease.assert_called_once_with(str(controller.locale))
 
 
 if __name__ == '__main__':
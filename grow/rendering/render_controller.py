@@ -5,11 +5,14 @@ import mimetypes
 import os
 import sys
 import time
+from grow.common import urls
 from grow.common import utils
 from grow.documents import static_document
 from grow.pods import errors
 from grow.rendering import rendered_document
 from grow.templates import doc_dependency
+from grow.templates import jinja_dependency
+from grow.templates import render_globals
 from grow.templates import tags
 
 
@@ -75,6 +78,11 @@ class RenderController:
         """Locale to use for rendering."""
         return None
 
+    @property
+    def rendered_path(self):
+        """Path of the rendered document."""
+        return self.serving_path
+
     @property
     def mimetype(self):
         """Guess the mimetype of the content."""
@@ -147,6 +155,14 @@ class RenderDocumentController(RenderController):
             return self.route_info.meta['pod_path']
         return self.doc.pod_path if self.doc else None
 
+    @property
+    def rendered_path(self):
+        """Path of the rendered document."""
+        serving_path = self.doc.get_serving_path()
+        if serving_path.endswith('/'):
+            serving_path = '{}{}'.format(serving_path, self.suffix)
+        return serving_path
+
     @property
     def suffix(self):
         """Determine headers to serve for https requests."""
@@ -162,7 +178,8 @@ class RenderDocumentController(RenderController):
             label='{} ({})'.format(self.pod_path, self.locale),
             meta={
                 'path': self.pod_path,
-                'locale': str(self.locale)}
+                'locale': str(self.locale),
+                'serving_path': self.serving_path}
         ).start_timer()
 
         source_dir = self.clean_source_dir(source_dir)
@@ -197,44 +214,47 @@ class RenderDocumentController(RenderController):
             label='{} ({})'.format(self.doc.pod_path, self.doc.locale),
             meta={
                 'path': self.doc.pod_path,
-                'locale': str(self.doc.locale)}
+                'locale': str(self.doc.locale),
+                'serving_path': self.serving_path}
         ).start_timer()
 
         # Validate the path with the config filters.
         self.validate_path()
 
         doc = self.doc
-        template = jinja_env['env'].get_template(doc.view.lstrip('/'))
         track_dependency = doc_dependency.DocDependency(doc)
+        with jinja_dependency.track_dependencies(track_dependency):
+            template = jinja_env['env'].get_template(doc.view.lstrip('/'))
         local_tags = tags.create_builtin_tags(
             self.pod, doc, track_dependency=track_dependency)
         # NOTE: This should be done using get_template(... globals=...)
         # or passed as an argument into render but
         # it is not available included inside macros???
         # See: https://github.com/pallets/jinja/issues/688
-        template.globals['g'] = local_tags
+        # The environment globals proxy to the values set for this render.
+        local_globals = {'g': local_tags}
 
         # Track the message stats, including untranslated strings.
         if self.pod.is_enabled(self.pod.FEATURE_TRANSLATION_STATS):
-            template.globals['_'] = tags.make_doc_gettext(doc)
+            local_globals['_'] = tags.make_doc_gettext(doc)
 
         try:
             doc.footnotes.reset()
-            serving_path = doc.get_serving_path()
-            if serving_path.endswith('/'):
-                serving_path = '{}{}'.format(serving_path, self.suffix)
+            serving_path = self.rendered_path
 
             content = self.pod.extensions_controller.trigger('pre_render', doc, doc.body)
             if content:
                 doc.format.update(content=content)
 
-            rendered_content = template.render({
-                'doc': doc,
-                'request': request,
-                'env': self.pod.env,
-                'podspec': self.pod.podspec,
-                '_track_dependency': track_dependency,
-            }).lstrip()
+            with render_globals.use_globals(**local_globals):
+                with jinja_dependency.track_dependencies(track_dependency):
+                    rendered_content = template.render({
+                        'doc': doc,
+                        'request': request,
+                        'env': self.pod.env,
+                        'podspec': self.pod.podspec,
+                        '_track_dependency': track_dependency,
+                    }).lstrip()
             rendered_content = self.pod.extensions_controller.trigger(
                 'post_render', doc, rendered_content)
             rendered_doc = rendered_document.RenderedDocument(
@@ -269,6 +289,7 @@ class RenderErrorController(RenderController):
             meta={
                 'key': self.route_info.meta['key'],
                 'view': self.route_info.meta['view'],
+                'serving_path': self.serving_path,
             }
         ).start_timer()
 
@@ -304,6 +325,7 @@ class RenderErrorController(RenderController):
             meta={
                 'key': self.route_info.meta['key'],
                 'view': self.route_info.meta['view'],
+                'serving_path': self.serving_path,
             }
         ).start_timer()
 
@@ -318,16 +340,18 @@ class RenderErrorController(RenderController):
             # or passed as an argument into render but
             # it is not available included inside macros???
             # See: https://github.com/pallets/jinja/issues/688
-            template.globals['g'] = local_tags
+            # The environment globals proxy to the values set for this render.
 
             try:
                 serving_path = '/{}.html'.format(self.route_info.meta['key'])
-                rendered_doc = rendered_document.RenderedDocument(
-                    serving_path, template.render({
+                with render_globals.use_globals(g=local_tags):
+                    rendered_content = template.render({
                         'doc': None,
                         'env': self.pod.env,
                         'podspec': self.pod.podspec,
-                    }).lstrip())
+                    }).lstrip()
+                rendered_doc = rendered_document.RenderedDocument(
+                    serving_path, rendered_content)
                 timer.stop_timer()
                 return rendered_doc
             except Exception as err:
@@ -344,6 +368,8 @@ class RenderErrorController(RenderController):
 class RenderSitemapController(RenderController):
     """Controller for handling rendering for sitemaps."""
 
+    MAX_URLS = 50000  # Maximum urls in a sitemap per the sitemap protocol.
+
     @property
     def mimetype(self):
         """Determine headers to serve for https requests."""
@@ -390,40 +416,35 @@ class RenderSitemapController(RenderController):
         # Validate the path with the config filters.
         self.validate_path()
 
-        # Duplicate the routes to use the filters without messing up routing.
-        temp_router = self.pod.router.__class__(self.pod)
-        temp_router.add_all()
-
-        # Sitemaps only show documents...?
-        temp_router.filter('whitelist', kinds=['doc'])
-
-        for sitemap_filter in self.route_info.meta.get('filters') or []:
-            temp_router.filter(
-                sitemap_filter['type'], collection_paths=sitemap_filter.get('collections'),
-                paths=sitemap_filter.get('paths'), locales=sitemap_filter.get('locales'))
-
         # Need a custom root for rendering sitemap.
         root = os.path.join(utils.get_grow_dir(), 'pods', 'templates')
         jinja_env = self.pod.render_pool.custom_jinja_env(root=root)
 
         with jinja_env['lock']:
-            if self.route_info.meta.get('template'):
-                content = self.pod.read_file(self.route_info.meta['template'])
-                template = jinja_env['env'].from_string(content)
-            else:
-                template = jinja_env['env'].get_template('sitemap.xml')
-
             try:
-                docs = []
-                for _, value, _ in temp_router.routes.nodes:
-                    docs.append(self.pod.get_doc(value.meta['pod_path'], locale=value.meta['locale']))
-                rendered_doc = rendered_document.RenderedDocument(
-                    self.serving_path, template.render({
-                        'pod': self.pod,
-                        'env': self.pod.env,
-                        'docs': docs,
-                        'podspec': self.pod.podspec,
-                    }).lstrip())
+                if self.route_info.meta.get('pages') and not self.route_info.meta.get('page'):
+                    template = jinja_env['env'].get_template('sitemap_index.xml')
+                    context = {
+                        'urls': self._page_urls(),
+                    }
+                else:
+                    if self.route_info.meta.get('template'):
+                        content = self.pod.read_file(self.route_info.meta['template'])
+                        template = jinja_env['env'].from_string(content)
+                    else:
+                        template = jinja_env['env'].get_template('sitemap.xml')
+                    context = {
+                        'docs': self._docs(),
+                    }
+                context.update({
+                    'pod': self.pod,
+                    'env': self.pod.env,
+                    'podspec': self.pod.podspec,
+                })
+                rendered_doc = rendered_document.RenderedDocument.from_chunks(
+                    self.serving_path,
+                    self._lstrip_chunks(template.generate(context)),
+                    self.pod.tmp_dir)
                 timer.stop_timer()
                 return rendered_doc
             except Exception as err:
@@ -436,6 +457,52 @@ class RenderSitemapController(RenderController):
                 exception.exception = err
                 raise exception
 
+    @staticmethod
+    def _lstrip_chunks(chunks):
+        """Strip the leading whitespace from streamed chunks."""
+        stripping = True
+        for chunk in chunks:
+            if stripping:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                stripping = False
+            yield chunk
+
+    def _docs(self):
+        """Docs for the sitemap, or for the page of a split sitemap."""
+        router = self.pod.router
+        if not router.is_complete:
+            # The pod routes are filtered or not concrete, use all routes.
+            router = router.__class__(self.pod)
+            router.add_all()
+
+        nodes = router.filtered_nodes(
+            router.sitemap_filters(self.route_info.meta.get('filters')))
+        page = self.route_info.meta.get('page')
+        if page:
+            # Pages need a consistent order to split the routes.
+            nodes = sorted(nodes, key=lambda node: node[0])
+            start = (page - 1) * self.MAX_URLS
+            nodes = nodes[start:start + self.MAX_URLS]
+
+        docs = []
+        for _, value, _ in nodes:
+            docs.append(self.pod.get_doc(
+                value.meta['pod_path'], locale=value.meta['locale']))
+        return docs
+
+    def _page_urls(self):
+        """Urls for the pages of a split sitemap."""
+        page_urls = []
+        for page in range(1, self.route_info.meta['pages'] + 1):
+            page_urls.append(urls.Url(
+                path=self.pod.router.sitemap_page_path(self.serving_path, page),
+                host=self.pod.env.host,
+                port=self.pod.env.port,
+                scheme=self.pod.env.scheme))
+        return page_urls
+
 
 class RenderStaticDocumentController(RenderController):
     """Controller for handling rendering for static documents."""
@@ -537,8 +604,22 @@ class RenderStaticDocumentController(RenderController):
         # Validate the path with the static config specific filter.
         self.validate_path(self.route_info.meta['path_filter'])
 
-        rendered_content = self.pod.read_file(self.pod_path)
-        rendered_content = self.pod.extensions_controller.trigger(
+        # Hooks can depend on the content so it is only read with hooks.
+        extensions_controller = self.pod.extensions_controller
+        rendered_content = None
+        if extensions_controller.has_extension_hooks('post_render'):
+            rendered_content = self.pod.read_file(self.pod_path)
+        if rendered_content is None or not extensions_controller.should_trigger(
+                'post_render', self.static_doc, rendered_content):
+            # Without hooks changing the content the file is used as is.
+            hashed = self.route_info.hashed or self.pod.hash_file(self.pod_path)
+            rendered_doc = rendered_document.RenderedDocument.from_file(
+                self.serving_path, self.pod.abs_path(self.pod_path), hashed,
+                is_bytes=True)
+            timer.stop_timer()
+            return rendered_doc
+
+        rendered_content = extensions_controller.trigger(
             'post_render', self.static_doc, rendered_content)
         rendered_doc = rendered_document.RenderedDocument(
             self.serving_path, rendered_content)
@@ -1,6 +1,8 @@
 """Tests for the render controllers."""
 
 import unittest
+import mock
+from grow.extensions.hooks import post_render_hook
 from grow.pods import pods
 from grow import storage
 from grow.rendering import render_controller
@@ -8,6 +10,17 @@ from grow.routing import router
 from grow.testing import testing
 
 
+class UpperHook(post_render_hook.PostRenderHook):
+    """Post render hook that only changes content that is not empty."""
+
+    # pylint: disable=arguments-differ,unused-argument
+    def should_trigger(self, previous_result, doc, raw_content, *_args, **_kwargs):
+        return bool(previous_result)
+
+    def trigger(self, previous_result, doc, raw_content, *_args, **_kwargs):
+        return previous_result.upper()
+
+
 class RenderControllerTestCase(unittest.TestCase):
     """Test the render controller."""
 
@@ -45,6 +58,90 @@ class RenderControllerTestCase(unittest.TestCase):
             controller = render_controller.RenderController.from_route_info(
                 self.pod, '/', route_info)
 
+    def _static_controller(self):
+        self.pod.router.add_all(use_cache=False)
+        for path, route_info, params in self.pod.router.routes.nodes:
+            if route_info.kind == 'static' and path == '/public/file.txt':
+                return self.pod.router.get_render_controller(
+                    path, route_info, params=params)
+        raise AssertionError('Missing static route.')
+
+    def test_render_static(self):
+        """Static files without post render hooks use the file."""
+        controller = self._static_controller()
+        rendered_doc = controller.render()
+        self.assertEqual(
+            self.pod.abs_path('/public/file.txt'), rendered_doc.file_path)
+        self.assertEqual(
+            self.pod.hash_file('/public/file.txt'), rendered_doc.hash)
+        with open(rendered_doc.file_path, 'rb') as source_file:
+            self.assertEqual(source_file.read(), rendered_doc.read())
+
+    def test_render_static_post_render(self):
+        """Static files with post render hooks use the hook content."""
+        controller = self._static_controller()
+        extensions_controller = self.pod.extensions_controller
+        with mock.patch.object(
+                extensions_controller, 'has_extension_hooks', return_value=True), \
+                mock.patch.object(
+                    extensions_controller, 'should_trigger', return_value=True), \
+                mock.patch.object(
+                    extensions_controller, 'trigger', return_value='changed'):
+            rendered_doc = controller.render()
+        self.assertIsNone(rendered_doc.file_path)
+        self.assertEqual('changed', rendered_doc.read())
+
+    def test_render_static_post_render_content(self):
+        """Post render hooks that depend on the content get the content."""
+        controller = self._static_controller()
+        extension = mock.Mock()
+        extension.auto_hook.return_value = UpperHook(None)
+        # pylint: disable=protected-access
+        self.pod.extensions_controller._hooks['post_render'].register_extensions(
+            [extension])
+        rendered_doc = controller.render()
+        self.assertIsNone(rendered_doc.file_path)
+        content = self.pod.read_file('/public/file.txt')
+        self.assertEqual(content.upper(), rendered_doc.read())
+
+    def _sitemap_controllers(self):
+        self.pod.router.add_all(use_cache=False)
+        controllers = {}
+        for path, route_info, params in self.pod.router.routes.nodes:
+            if route_info.kind == 'sitemap':
+                controllers[path] = self.pod.router.get_render_controller(
+                    path, route_info, params=params)
+        return controllers
+
+    def test_render_sitemap(self):
+        """Sitemaps use the existing routes."""
+        controllers = self._sitemap_controllers()
+        self.assertEqual(['/root/sitemap.xml'], list(controllers.keys()))
+        with mock.patch.object(router.Router, 'add_all') as mock_add_all:
+            content = controllers['/root/sitemap.xml'].render().read()
+        mock_add_all.assert_not_called()
+        self.assertIn('<urlset', content)
+        self.assertIn('/intro/</loc>', content)
+
+    @mock.patch.object(
+        render_controller.RenderSitemapController, 'MAX_URLS', 10)
+    def test_render_sitemap_pages(self):
+        """Large sitemaps are split with a sitemap index."""
+        controllers = self._sitemap_controllers()
+        self.assertIn('/root/sitemap-1.xml', controllers)
+        page_paths = sorted(
+            path for path in controllers if path != '/root/sitemap.xml')
+
+        content = controllers['/root/sitemap.xml'].render().read()
+        self.assertIn('<sitemapindex', content)
+        for path in page_paths:
+            self.assertIn('{}</loc>'.format(path), content)
+
+        for path in page_paths:
+            content = controllers[path].render().read()
+            self.assertIn('<urlset', content)
+            self.assertLessEqual(content.count('<url>'), 10)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,12 @@
 """Rendering pool for grow documents."""
 
+import collections
+import contextlib
 import random
 import threading
 from grow.templates import filters
 from grow.templates import jinja_dependency
+from grow.templates import render_globals
 from grow.templates import tags
 from grow.templates import tests as jinja_tests
 
@@ -17,14 +20,44 @@ class Error(Exception):
 
 
 class RenderPool:
-    """Rendering pool for rendering pods."""
+    """Rendering pool for rendering pods.
 
-    def __init__(self, pod, pool_size=1):
+    Jinja environments are created when a locale is first used, up to the
+    pool size for each locale. When there are `max_envs` environments the
+    idle environments of the least recently used locales are reused for other
+    locales by changing the locale of the environment. The compiled templates
+    do not depend on the locale and stay cached in the environment.
+    """
+
+    DEFAULT_MAX_ENVS = 8
+
+    def __init__(self, pod, pool_size=1, max_envs=None):
         self.pod = pod
-        self._locales = self.pod.list_locales()
         self._pool_size = pool_size
-        self._pool = {}
-        self._adjust_pool_size(pool_size)
+        self._max_envs = max_envs or self.DEFAULT_MAX_ENVS
+        # Environments for each locale, least recently used locale first.
+        self._pool = collections.OrderedDict()
+        self._free = {}
+        self._condition = threading.Condition()
+
+    @property
+    def env_count(self):
+        """How many render environments have been created."""
+        with self._condition:
+            return sum(len(envs) for envs in self._pool.values())
+
+    @property
+    def max_envs(self):
+        """Maximum number of render environments to keep."""
+        return self._max_envs
+
+    @max_envs.setter
+    def max_envs(self, value):
+        """Set the maximum number of render environments to keep."""
+        with self._condition:
+            self._max_envs = value or self.DEFAULT_MAX_ENVS
+            self._trim()
+            self._condition.notify_all()
 
     @property
     def pool_size(self):
@@ -41,25 +74,85 @@ class RenderPool:
     def _adjust_pool_size(self, pool_size):
         """Adjust the pool size.
 
-        Creates a new Jinja Environment for each locale and up to the pool size.
+        New environments are created when needed, so this only removes the
+        environments over the pool size for each locale.
+
+        Each environment has a corresponding thread lock that should be used
+        when rendering using the environment to prevent the same environment
+        from being used in multiple threads at the same time.
+        """
+        with self._condition:
+            for locale_str, envs in self._pool.items():
+                if pool_size < len(envs):
+                    self._pool[locale_str] = envs[:pool_size]
+                    # Leased environments that are no longer in the pool are
+                    # dropped when they are returned.
+                    self._free[locale_str] = [
+                        jinja_env for jinja_env in self._free[locale_str]
+                        if jinja_env in self._pool[locale_str]]
+            self._condition.notify_all()
+
+    def _use_locale(self, locale):
+        """Mark the locale as the most recently used."""
+        if locale in self._pool:
+            self._pool.move_to_end(locale)
+        else:
+            self._pool[locale] = []
+            self._free[locale] = []
+
+    def _remove_locale(self, locale):
+        del self._pool[locale]
+        del self._free[locale]
+
+    @staticmethod
+    def _set_locale(jinja_env, locale):
+        env = jinja_env['env']
+        env.locale = locale
+        # Imported template modules are rendered once for the locale.
+        for template in (env.cache.values() if env.cache else []):
+            template._module = None  # pylint: disable=protected-access
 
-        Also creates a corresponding thread lock that should be used when
-        rendering using the environment to prevent the same environment from
-        being used in multiple threads at the same time.
+    def _add_env(self, locale, force=False):
+        """Add an environment for the locale when it is allowed.
+
+        Reuses an idle environment from another locale when there are already
+        `max_envs` environments. When forced, a new environment is created
+        even when over the maximum.
         """
-        for locale in self._locales:
-            locale_str = str(locale)
-            if locale_str not in self._pool:
-                self._pool[locale_str] = []
-            existing_size = len(self._pool[locale_str])
-            if pool_size > existing_size:
-                for _ in range(pool_size - existing_size):
-                    self._pool[locale_str].append({
-                        'lock': threading.RLock(),
-                        'env': self._create_jinja_env(locale=locale_str),
-                    })
-            elif pool_size < existing_size:
-                self._pool[locale_str] = self._pool[locale_str][:pool_size]
+        if len(self._pool[locale]) >= self._pool_size:
+            return None
+        jinja_env = None
+        if sum(len(envs) for envs in self._pool.values()) >= self._max_envs:
+            for other_locale in list(self._pool.keys()):
+                if other_locale == locale or not self._free[other_locale]:
+                    continue
+                jinja_env = self._free[other_locale].pop(0)
+                self._pool[other_locale].remove(jinja_env)
+                if not self._pool[other_locale]:
+                    self._remove_locale(other_locale)
+                self._set_locale(jinja_env, locale)
+                break
+            if jinja_env is None and not force:
+                return None
+        if jinja_env is None:
+            jinja_env = {
+                'lock': threading.RLock(),
+                'env': self._create_jinja_env(locale=locale),
+            }
+        self._pool[locale].append(jinja_env)
+        return jinja_env
+
+    def _trim(self):
+        """Remove idle environments of the least recently used locales."""
+        excess = sum(len(envs) for envs in self._pool.values()) - self._max_envs
+        for locale in list(self._pool.keys()):
+            if excess <= 0:
+                break
+            while excess > 0 and self._free[locale]:
+                self._pool[locale].remove(self._free[locale].pop(0))
+                excess -= 1
+            if not self._pool[locale]:
+                self._remove_locale(locale)
 
     def _create_jinja_env(self, locale='', root=None):
         kwargs = {
@@ -80,8 +173,11 @@ class RenderPool:
         kwargs['bytecode_cache'] = self.pod.jinja_bytecode_cache
         kwargs['extensions'].extend(self.pod.list_jinja_extensions())
         env = jinja_dependency.DepEnvironment(**kwargs)
+        env.template_profile = self.pod.profile.templates
+        env.cache_stats = self.pod.podcache.template_stats
         env.filters.update(filters.create_builtin_filters(env, self.pod, locale=locale))
         env.globals.update(**tags.create_builtin_globals(env, self.pod, locale=locale))
+        env.globals.update(**render_globals.create_render_globals())
         env.tests.update(jinja_tests.create_builtin_tests())
         self.pod.extensions_controller.trigger('jinja_env_init', env)
         return env
@@ -93,23 +189,77 @@ class RenderPool:
             'env': self._create_jinja_env(locale, root),
         }
 
+    def precompile_templates(self):
+        """Compile the pod templates once for all of the environments."""
+        jinja_env = self.custom_jinja_env()
+        return self.pod.jinja_bytecode_cache.precompile(jinja_env['env'])
+
+    def _checkin(self, locale, jinja_env):
+        with self._condition:
+            # Ignore environments removed from the pool while leased.
+            if jinja_env in self._pool.get(locale, []):
+                self._free[locale].append(jinja_env)
+                self._trim()
+            self._condition.notify_all()
+
+    def _checkout(self, locale):
+        with self._condition:
+            timer = None
+            while True:
+                self._use_locale(locale)
+                if self._free[locale]:
+                    jinja_env = self._free[locale].pop()
+                    break
+                jinja_env = self._add_env(locale)
+                if jinja_env is not None:
+                    break
+                if timer is None:
+                    # Track how long renders are waiting for an environment.
+                    timer = self.pod.profile.timer(
+                        'RenderPool.lease', label=locale, meta={'locale': locale})
+                    timer.start_timer()
+                self._condition.wait()
+            if timer is not None:
+                timer.stop_timer()
+            return jinja_env
+
+    @contextlib.contextmanager
+    def lease(self, locale=''):
+        """Lease a jinja environment for exclusive use while rendering.
+
+        Blocks until an environment for the locale is free. The environment
+        is returned to the pool when the context exits.
+
+            with render_pool.lease(locale) as jinja_env:
+                template = jinja_env['env'].get_template('...')
+                template.render({})
+        """
+        locale = str(locale)
+        jinja_env = self._checkout(locale)
+        try:
+            yield jinja_env
+        finally:
+            self._checkin(locale, jinja_env)
+
     def get_jinja_env(self, locale=''):
         """Retrieves a jinja environment and lock to use to render.
 
         When rendering should use the lock to prevent threading issues.
+        Prefer using `lease` when rendering from multiple threads. The
+        environment can be reused for another locale once it is idle in the
+        pool, so it should not be kept between renders.
 
             with jinja_env['lock']:
                 template = jinja_env['env'].get_template('...')
                 template.render({})
         """
         locale = str(locale)
-        if locale not in self._pool:
-            # Add the new locale to the pool.
-            self._locales.append(locale)
-            self._adjust_pool_size(self._pool_size)
-
-        pool = self._pool[locale]
-        # Randomly select which pool item to use. This should distribute
-        # rendering fairly evenly across the pool. Since render times are fairly
-        # even for most sites this should not be an issue.
-        return pool[random.randrange(len(pool))]
+        with self._condition:
+            self._use_locale(locale)
+            pool = self._pool[locale]
+            if not pool:
+                self._free[locale].append(self._add_env(locale, force=True))
+            # Randomly select which pool item to use. This should distribute
+            # rendering fairly evenly across the pool. Since render times are
+            # fairly even for most sites this should not be an issue.
+            return pool[random.randrange(len(pool))]
@@ -1,5 +1,6 @@
 """Tests for the render pool."""
 
+import threading
 import unittest
 from grow.pods import pods
 from grow import storage
@@ -21,6 +22,108 @@ class RenderPoolTestCase(unittest.TestCase):
         self.pool.pool_size = 3
         self.assertEqual(3, self.pool.pool_size)
 
+    def test_lease(self):
+        """Leased environments are not shared until returned."""
+        self.pool.pool_size = 2
+        with self.pool.lease('en') as first:
+            with self.pool.lease('en') as second:
+                self.assertIsNot(first, second)
+            with self.pool.lease('en') as third:
+                self.assertIs(second, third)
+
+    def test_lease_blocks(self):
+        """Leasing blocks until an environment is returned."""
+        leased = []
+
+        def _lease():
+            with self.pool.lease('en') as jinja_env:
+                leased.append(jinja_env)
+
+        with self.pool.lease('en') as jinja_env:
+            thread = threading.Thread(target=_lease)
+            thread.start()
+            thread.join(0.1)
+            self.assertEqual([], leased)
+        thread.join()
+        self.assertEqual([jinja_env], leased)
+
+    def test_lease_pool_size(self):
+        """Environments removed from the pool while leased are dropped."""
+        self.pool.pool_size = 2
+        with self.pool.lease('de'):
+            with self.pool.lease('de'):
+                self.pool.pool_size = 1
+        self.assertEqual(self.pool._pool['de'], self.pool._free['de'])
+
+    def test_lazy(self):
+        """Environments are only created when a locale is used."""
+        self.pool.pool_size = 2
+        self.assertEqual(0, self.pool.env_count)
+        jinja_env = self.pool.get_jinja_env('de')
+        self.assertEqual(1, self.pool.env_count)
+        self.assertEqual('de', jinja_env['env'].locale)
+        with self.pool.lease('de'):
+            with self.pool.lease('de'):
+                self.assertEqual(2, self.pool.env_count)
+
+    def test_max_envs(self):
+        """Idle environments are reused for other locales."""
+        self.pool.max_envs = 2
+        with self.pool.lease('de') as de_env:
+            pass
+        with self.pool.lease('fr') as fr_env:
+            pass
+        with self.pool.lease('de'):
+            pass
+        # Least recently used locale is reused.
+        with self.pool.lease('ja') as ja_env:
+            self.assertIs(fr_env, ja_env)
+            self.assertEqual('ja', ja_env['env'].locale)
+        self.assertEqual(2, self.pool.env_count)
+        self.assertNotIn('fr', self.pool._pool)
+
+        # Environments in use are not reused.
+        with self.pool.lease('de') as leased_env:
+            self.assertIs(de_env, leased_env)
+            with self.pool.lease('it') as it_env:
+                self.assertIs(ja_env, it_env)
+
+    def test_max_envs_blocks(self):
+        """Leasing blocks when all of the environments are in use."""
+        self.pool.max_envs = 1
+        leased = []
+
+        def _lease():
+            with self.pool.lease('fr') as jinja_env:
+                leased.append(jinja_env['env'].locale)
+
+        with self.pool.lease('de'):
+            thread = threading.Thread(target=_lease)
+            thread.start()
+            thread.join(0.1)
+            self.assertEqual([], leased)
+        thread.join()
+        self.assertEqual(['fr'], leased)
+        self.assertEqual(1, self.pool.env_count)
+
+    def test_max_envs_trim(self):
+        """Lowering the maximum removes idle environments."""
+        self.pool.get_jinja_env('de')
+        self.pool.get_jinja_env('fr')
+        self.pool.get_jinja_env('ja')
+        self.pool.max_envs = 1
+        self.assertEqual(1, self.pool.env_count)
+        self.assertEqual(['ja'], list(self.pool._pool.keys()))
+
+    def test_set_locale_translations(self):
+        """Reused environments translate for the new locale."""
+        self.pod.catalogs.compile()
+        self.pool.max_envs = 1
+        jinja_env = self.pool.get_jinja_env('de')
+        template = jinja_env['env'].from_string('{{gettext("About")}}')
+        self.assertEqual('Über', template.render())
+        self.assertIs(jinja_env, self.pool.get_jinja_env('fr'))
+        self.assertEqual('About', template.render())
 
 if __name__ == '__main__':
     unittest.main()
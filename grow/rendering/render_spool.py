@@ -0,0 +1,56 @@
+"""Spool rendered documents to disk to bound the memory used by a build."""
+
+import threading
+import weakref
+
+BYTES_PER_MB = 1024 * 1024
+
+
+class RenderSpool:
+    """Keeps rendered content in memory until over the memory budget.
+
+    Once the in memory content is over the budget the content of the rendered
+    documents is written to content addressed files in the temp directory.
+    The temp directory needs to be on the same file system as the output so
+    the files can be linked into the output instead of copied.
+    Only the documents that are still in memory count towards the budget, the
+    size of a document is released when it is no longer used, such as after
+    being written by the destination.
+    """
+
+    def __init__(self, tmp_dir, memory_budget=None):
+        self.tmp_dir = tmp_dir
+        self.memory_budget = memory_budget
+        self.memory_size = 0
+        self.spooled_count = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_megabytes(cls, tmp_dir, megabytes):
+        """Create the spool with a memory budget in megabytes."""
+        return cls(tmp_dir, memory_budget=int(megabytes * BYTES_PER_MB))
+
+    def _release(self, size):
+        with self._lock:
+            self.memory_size -= size
+
+    def add(self, rendered_doc):
+        """Keep the rendered document in memory or spool it to disk."""
+        size = rendered_doc.size
+        with self._lock:
+            is_over = (self.memory_budget is not None
+                       and self.memory_size + size > self.memory_budget)
+            if is_over:
+                self.spooled_count += 1
+            else:
+                self.memory_size += size
+        if is_over:
+            rendered_doc.spool(self.tmp_dir)
+        elif size:
+            weakref.finalize(rendered_doc, self._release, size)
+        return rendered_doc
+
+    def spool_docs(self, rendered_docs):
+        """Generator that spools the rendered documents as they pass."""
+        for rendered_doc in rendered_docs:
+            yield self.add(rendered_doc)
@@ -0,0 +1,90 @@
+"""Tests for the render spool."""
+
+import os
+import tempfile
+import unittest
+from grow import storage
+from grow.deployments import indexes
+from grow.deployments import messages
+from grow.deployments.destinations import local as local_destination
+from grow.pods import pods
+from grow.rendering import render_spool
+from grow.rendering import rendered_document
+from grow.testing import testing
+
+
+class RenderSpoolTestCase(unittest.TestCase):
+    """Test the render spool."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def _docs(self):
+        for index in range(4):
+            yield rendered_document.RenderedDocument(
+                '/{}/'.format(index), 'x' * 10 + str(index))
+
+    def test_spool_docs(self):
+        """Docs over the memory budget are spooled to files."""
+        spool = render_spool.RenderSpool(self.tmp_dir, memory_budget=25)
+        docs = list(spool.spool_docs(self._docs()))
+        self.assertEqual([None, None], [doc.file_path for doc in docs[:2]])
+        for doc in docs[2:]:
+            self.assertIsNotNone(doc.file_path)
+        self.assertEqual(2, spool.spooled_count)
+        self.assertEqual('xxxxxxxxxx3', docs[3].read())
+
+    def test_spool_docs_released(self):
+        """Docs that are no longer used do not count towards the budget."""
+        spool = render_spool.RenderSpool(self.tmp_dir, memory_budget=25)
+        for doc in spool.spool_docs(self._docs()):
+            self.assertIsNone(doc.file_path)
+        self.assertEqual(0, spool.spooled_count)
+        del doc
+        self.assertEqual(0, spool.memory_size)
+
+    def test_spool_docs_diff(self):
+        """Only the docs kept by the diff count towards the budget."""
+        spool = render_spool.RenderSpool(self.tmp_dir, memory_budget=25)
+        written = []
+        indexes.Diff.stream(
+            messages.IndexMessage(), spool.spool_docs(self._docs()),
+            write_func=lambda doc: written.append(doc.path))
+        self.assertEqual(4, len(written))
+        self.assertEqual(0, spool.spooled_count)
+
+        spool = render_spool.RenderSpool(self.tmp_dir, memory_budget=25)
+        _, _, paths_to_rendered_doc = indexes.Diff.stream(
+            messages.IndexMessage(), spool.spool_docs(self._docs()))
+        self.assertEqual(4, len(paths_to_rendered_doc))
+        self.assertEqual(2, spool.spooled_count)
+
+    def test_spool_docs_linked(self):
+        """Docs spooled in the pod are linked into the build output."""
+        pod = pods.Pod(testing.create_test_pod_dir(), storage=storage.FileStorage)
+        out_dir = pod.abs_path('/build')
+        destination = local_destination.LocalDestination(
+            local_destination.Config(out_dir=out_dir))
+        spool = render_spool.RenderSpool(pod.control_tmp_dir, memory_budget=0)
+        docs = (
+            rendered_document.RenderedDocument(
+                '/{}.html'.format(index), 'x' * 10 + str(index))
+            for index in range(4))
+        for doc in spool.spool_docs(docs):
+            destination.write_file(doc)
+            out_path = os.path.join(out_dir, doc.path.lstrip('/'))
+            self.assertTrue(os.path.samefile(doc.file_path, out_path))
+        self.assertEqual(4, spool.spooled_count)
+
+    def test_no_budget(self):
+        """Without a budget the docs stay in memory."""
+        spool = render_spool.RenderSpool(self.tmp_dir)
+        docs = list(spool.spool_docs(self._docs()))
+        self.assertEqual(0, spool.spooled_count)
+        self.assertEqual(44, spool.memory_size)
+        for doc in docs:
+            self.assertIsNone(doc.file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
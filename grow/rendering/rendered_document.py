@@ -2,6 +2,7 @@
 
 import hashlib
 import os
+import threading
 
 
 class RenderedDocument:
@@ -12,6 +13,8 @@ class RenderedDocument:
         self.tmp_dir = tmp_dir
         self.hash = None
         self._content = None
+        self._is_bytes = False
+        self._source_file_path = None
 
         # When doing threaded rendering the thread cannot update the timer.
         # Keep the timer with the rendered document to add to the normal
@@ -20,12 +23,54 @@ class RenderedDocument:
         self.write(content)
 
     def _has_tmp_file_path(self):
+        if self._source_file_path is not None:
+            return True
         return self.tmp_dir is not None and self.hash is not None
 
     def _get_tmp_file_path(self):
         """Temp filename if has temporary dir."""
+        if self._source_file_path is not None:
+            return self._source_file_path
         return os.path.join(self.tmp_dir, self.hash)
 
+    @classmethod
+    def from_file(cls, path, file_path, hashed, is_bytes=False):
+        """Create the rendered document from an existing file."""
+        rendered_doc = cls(path)
+        rendered_doc.hash = hashed
+        rendered_doc._source_file_path = file_path
+        rendered_doc._is_bytes = is_bytes
+        return rendered_doc
+
+    @classmethod
+    def from_chunks(cls, path, chunks, tmp_dir):
+        """Create the rendered document by streaming text chunks to a file."""
+        hashed = hashlib.sha1()
+        tmp_file_path = os.path.join(tmp_dir, '{}.{}.{}.tmp'.format(
+            path.strip('/').replace('/', '_'), os.getpid(),
+            threading.get_ident()))
+        with open(tmp_file_path, 'wb') as tmp_file:
+            for chunk in chunks:
+                encoded = chunk.encode('utf-8')
+                hashed.update(encoded)
+                tmp_file.write(encoded)
+        rendered_doc = cls(path, tmp_dir=tmp_dir)
+        rendered_doc.hash = hashed.hexdigest()
+        os.replace(tmp_file_path, rendered_doc._get_tmp_file_path())
+        return rendered_doc
+
+    @classmethod
+    def from_data(cls, path, hashed, content=None, file_path=None,
+                  is_bytes=False):
+        """Create the rendered document from exported data."""
+        if file_path:
+            return cls.from_file(path, file_path, hashed, is_bytes=is_bytes)
+        rendered_doc = cls(path)
+        rendered_doc.hash = hashed
+        rendered_doc._content = content
+        rendered_doc._is_bytes = is_bytes
+        return rendered_doc
+
     @property
     def file_path(self):
         """Returns the temp file name if available."""
@@ -33,27 +78,76 @@ class RenderedDocument:
             return None
         return self._get_tmp_file_path()
 
+    def export(self):
+        """Export the rendered document in a serializable format."""
+        if self._source_file_path is not None:
+            # Existing files are not copied into the exported data.
+            return {
+                'path': self.path,
+                'hashed': self.hash,
+                'file_path': self._source_file_path,
+                'is_bytes': self._is_bytes,
+            }
+        return {
+            'path': self.path,
+            'hashed': self.hash,
+            'content': self.read(),
+            'is_bytes': self._is_bytes,
+        }
+
+    @property
+    def is_bytes(self):
+        """Is the content binary instead of text?"""
+        return self._is_bytes
+
+    @property
+    def size(self):
+        """Approximate size of the content kept in memory."""
+        if self._content is None:
+            return 0
+        return len(self._content)
+
     def read(self):
         """Reads the content when it needs it."""
         if not self._has_tmp_file_path():
             return self._content
 
-        with open(self._get_tmp_file_path(), "r") as tmp_file:
+        with open(self._get_tmp_file_path(), "rb") as tmp_file:
             file_contents = tmp_file.read()
+        if self._is_bytes:
             return file_contents
+        return file_contents.decode('utf-8')
+
+    def spool(self, tmp_dir):
+        """Move the content out of memory into the temp directory."""
+        if self._has_tmp_file_path() or self._content is None:
+            return
+        content = self._content
+        self.tmp_dir = tmp_dir
+        self.write(content)
 
     def write(self, content):
         """Writes the content to the temp filesystem or keeps in memory."""
+        encoded = content
+        self._is_bytes = isinstance(content, bytes)
+        self._source_file_path = None
         if content is None:
             self.hash = None
         else:
-            try:
-                self.hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
-            except AttributeError:
-                self.hash = hashlib.sha1(content).hexdigest()
+            if not self._is_bytes:
+                encoded = content.encode('utf-8')
+            self.hash = hashlib.sha1(encoded).hexdigest()
 
         if self._has_tmp_file_path():
-            with open(self._get_tmp_file_path(), "w") as tmp_file:
-                tmp_file.write(content)
+            self._content = None
+            file_path = self._get_tmp_file_path()
+            # Files are named by the content hash, so same content is the
+            # same file.
+            if not os.path.exists(file_path):
+                tmp_file_path = '{}.{}.{}.tmp'.format(
+                    file_path, os.getpid(), threading.get_ident())
+                with open(tmp_file_path, "wb") as tmp_file:
+                    tmp_file.write(encoded)
+                os.replace(tmp_file_path, file_path)
         else:
             self._content = content
@@ -1,5 +1,7 @@
 """Tests for the rendered document."""
 
+import os
+import tempfile
 import unittest
 from grow.rendering import rendered_document
 
@@ -32,6 +34,24 @@ class RenderPoolTestCase(unittest.TestCase):
         self.assertEqual(None, doc.read())
         self.assertEqual(None, doc.hash)
 
+    def test_spool(self):
+        """Spooled content is stored in a content addressed file."""
+        tmp_dir = tempfile.mkdtemp()
+        doc = self._create_doc('/something', 'foob\u00e4r')
+        expected_hash = doc.hash
+        doc.spool(tmp_dir)
+        self.assertEqual(os.path.join(tmp_dir, expected_hash), doc.file_path)
+        self.assertEqual(expected_hash, doc.hash)
+        self.assertEqual('foob\u00e4r', doc.read())
+        self.assertEqual(0, doc.size)
+
+    def test_spool_bytes(self):
+        """Spooled binary content is read back as bytes."""
+        tmp_dir = tempfile.mkdtemp()
+        doc = self._create_doc('/something.png', b'\x89PNG\xff')
+        doc.spool(tmp_dir)
+        self.assertEqual(b'\x89PNG\xff', doc.read())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -10,8 +10,30 @@ class Renderer:
     """Handles the rendering and threading of the controllers."""
 
     @staticmethod
-    def rendered_docs(pod, routes, use_threading=True, source_dir=None):
-        """Generate the rendered documents for the given routes."""
+    def rendered_docs(pod, routes, use_threading=True, source_dir=None,
+                      process_count=None):
+        """Generate the rendered documents for the given routes.
+
+        When a process count greater than one is given the documents are
+        rendered using a pool of render processes instead of in this process.
+        """
+        return list(Renderer.stream_rendered_docs(
+            pod, routes, use_threading=use_threading, source_dir=source_dir,
+            process_count=process_count))
+
+    @staticmethod
+    def stream_rendered_docs(pod, routes, use_threading=True, source_dir=None,
+                             process_count=None, window_size=None,
+                             manifest=None):
+        """Yield the rendered documents for the routes as they finish.
+
+        Only `window_size` batches are rendered ahead of the consumer. The
+        render errors are raised together after all of the documents have
+        been yielded.
+
+        When a build manifest is given, routes whose inputs have not changed
+        since the previous build reuse the previous output.
+        """
         with pod.profile.timer('renderer.Renderer.render_docs'):
             routes_len = len(routes)
             text = 'Building: %(value)d/{} (in %(time_elapsed).9s)'
@@ -27,17 +49,49 @@ class Renderer:
             batches = render_batch.RenderBatches(
                 pod.render_pool, pod.profile, tick=tick)
 
+            if not source_dir:
+                # Compile the templates once before the render threads or
+                # processes need them.
+                pod.render_pool.precompile_templates()
+
+            reused_docs = []
+            path_to_controller = {}
             for controller in Renderer.controller_generator(pod, routes):
+                if manifest and not source_dir:
+                    rendered_doc = manifest.reuse(controller)
+                    if rendered_doc:
+                        reused_docs.append(rendered_doc)
+                        continue
+                    rendered_path = manifest.rendered_path(controller)
+                    if rendered_path:
+                        path_to_controller[rendered_path] = controller
                 batches.add(controller)
 
+            for rendered_doc in reused_docs:
+                tick()
+                yield rendered_doc
+
             if source_dir:
                 # When using an input directory, load the files instead of render.
-                rendered_docs, render_errors = batches.load(
-                    use_threading=use_threading, source_dir=source_dir)
+                results = batches.load_stream(
+                    source_dir, use_threading=use_threading,
+                    window_size=window_size)
+            elif Renderer.use_processes(pod, process_count):
+                results = batches.render_processes_stream(
+                    process_count, window_size=window_size)
             else:
                 # Default to rendering the documents.
-                rendered_docs, render_errors = batches.render(
-                    use_threading=use_threading)
+                results = batches.render_stream(
+                    use_threading=use_threading, window_size=window_size)
+
+            render_errors = []
+            for batch_docs, batch_errors in results:
+                render_errors.extend(batch_errors)
+                for rendered_doc in batch_docs:
+                    if rendered_doc.path in path_to_controller:
+                        manifest.record(
+                            path_to_controller[rendered_doc.path], rendered_doc)
+                    yield rendered_doc
 
             progress.finish()
 
@@ -45,7 +99,18 @@ class Renderer:
                 text = 'There were {} errors during rendering.'
                 raise bulk_errors.BulkErrors(text.format(
                     len(render_errors)), render_errors)
-            return rendered_docs
+
+    @staticmethod
+    def use_processes(pod, process_count):
+        """Determine if the rendering can be done using render processes."""
+        if not process_count or process_count <= 1:
+            return False
+        # Translation stats are only collected in the current process.
+        if pod.is_enabled(pod.FEATURE_TRANSLATION_STATS):
+            pod.logger.info(
+                'Translation stats are enabled, rendering in a single process.')
+            return False
+        return True
 
     @staticmethod
     def controller_generator(pod, routes):
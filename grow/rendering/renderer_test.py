@@ -30,6 +30,56 @@ class RendererTestCase(unittest.TestCase):
         routes = self.pod.router.routes
         self.render.rendered_docs(self.pod, routes, use_threading=False)
 
+    def test_renderer_processes(self):
+        """Renders the docs using render processes."""
+        self.pod.router.add_all(use_cache=False)
+        routes = self.pod.router.routes
+        expected = {}
+        for rendered_doc in self.render.rendered_docs(
+                self.pod, routes, use_threading=False):
+            expected[rendered_doc.path] = rendered_doc.hash
+
+        self.pod.podcache.dependency_graph.reset()
+        fingerprint = self.pod.env.config.fingerprint
+        actual = {}
+        for rendered_doc in self.render.rendered_docs(
+                self.pod, routes, process_count=2):
+            actual[rendered_doc.path] = rendered_doc.hash
+            self.assertIsNotNone(rendered_doc.read())
+
+        self.assertEqual(expected, actual)
+        self.assertEqual(fingerprint, self.pod.env.config.fingerprint)
+        # Dependencies from the render processes are merged into the pod.
+        self.assertTrue(
+            self.pod.podcache.dependency_graph.get_dependencies(
+                '/content/pages/intro.md'))
+
+    def test_stream_rendered_docs(self):
+        """Streams the rendered docs with a small window."""
+        self.pod.router.add_all(use_cache=False)
+        routes = self.pod.router.routes
+        expected = sorted(
+            doc.path for doc in self.render.rendered_docs(self.pod, routes))
+        actual = sorted(
+            doc.path for doc in self.render.stream_rendered_docs(
+                self.pod, routes, window_size=1))
+        self.assertEqual(expected, actual)
+
+    @mock.patch.object(render_controller.RenderDocumentController, 'render')
+    def test_stream_rendered_docs_errors(self, mock_render):
+        """Streams the docs without errors before raising the errors."""
+        mock_render.side_effect = ValueError()
+
+        self.pod.router.add_all(use_cache=False)
+        routes = self.pod.router.routes
+
+        streamed_docs = []
+        with self.assertRaises(bulk_errors.BulkErrors):
+            for rendered_doc in self.render.stream_rendered_docs(
+                    self.pod, routes):
+                streamed_docs.append(rendered_doc)
+        self.assertTrue(streamed_docs)
+
     @mock.patch.object(render_controller.RenderDocumentController, 'render')
     def test_render(self, mock_render):
         """Renders the docs with errors."""
@@ -42,5 +92,17 @@ class RendererTestCase(unittest.TestCase):
             self.render.rendered_docs(self.pod, routes)
 
 
+    @mock.patch.object(render_controller.RenderDocumentController, 'render')
+    def test_render_processes_errors(self, mock_render):
+        """Renders the docs using render processes with errors."""
+        mock_render.side_effect = ValueError()
+
+        self.pod.router.add_all(use_cache=False)
+        routes = self.pod.router.routes
+
+        with self.assertRaises(bulk_errors.BulkErrors):
+            self.render.rendered_docs(self.pod, routes, process_count=2)
+
+
 if __name__ == '__main__':
     unittest.main()
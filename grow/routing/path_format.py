@@ -95,20 +95,16 @@ class PathFormat:
         """Format a static document url."""
 
         params = self.params_pod()
+        if fingerprint:
+            # Format specs of missing params are not kept, such as for
+            # `{fingerprint:.8}`, so the fingerprint is formatted first.
+            params['fingerprint'] = fingerprint
         path = utils.safe_format(path, **params)
 
         if parameterize:
             path = self.parameterize(path)
 
-        params = {}
-
-        if fingerprint:
-            params['fingerprint'] = fingerprint
-
-        params['locale'] = self._locale_or_alias(locale)
-
-        if params:
-            path = utils.safe_format(path, **params)
+        path = utils.safe_format(path, locale=self._locale_or_alias(locale))
 
         return self.strip_double_slash(path)
 
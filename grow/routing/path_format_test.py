@@ -191,6 +191,9 @@ class PathFormatTestCase(unittest.TestCase):
         self.assertEqual(
             '/root_path/test/asdf', path_format.format_static(
                 '/{root}/test/{fingerprint}', fingerprint='asdf'))
+        self.assertEqual(
+            '/root_path/test/as', path_format.format_static(
+                '/{root}/test/{fingerprint:.2}', fingerprint='asdf'))
 
     def test_format_static_locale_params(self):
         """Test doc paths with locale and keeping params."""
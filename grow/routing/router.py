@@ -1,10 +1,19 @@
 """Router for grow documents."""
 
+import copy
 import fnmatch
 import os
 import re
+import sys
+import threading
+import time
+import types
+from collections import abc
 from protorpc import messages
+from grow.cache import cache_files
+from grow.documents import static_document
 from grow.performance import docs_loader
+from grow.performance import static_scanner
 from grow.rendering import render_controller
 from grow.routing import path_filter as grow_path_filter
 from grow.routing import routes as grow_routes
@@ -38,6 +47,7 @@ class Router:
     def __init__(self, pod, routes=None):
         self.pod = pod
         self._routes = routes or grow_routes.Routes()
+        self._is_complete = False
 
     def _preload_and_expand(self, docs, expand=True):
         # Force preload the docs.
@@ -49,11 +59,43 @@ class Router:
             docs_loader.DocsLoader.load(self.pod, docs)
         return docs
 
+    @staticmethod
+    def _file_meta(stat, now):
+        """Size and modified time of a file for validating cached routes.
+
+        Recently modified files are validated using the hash instead.
+        """
+        if stat is None or cache_files.is_racy(stat.st_mtime_ns, now):
+            return None, None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _file_stats(self, pod_paths):
+        """Stats of the files, missing files have a `None` stat."""
+        stats = {}
+        for pod_path in pod_paths:
+            if pod_path in stats:
+                continue
+            try:
+                stats[pod_path] = self.pod.file_stat(pod_path)
+            except (IOError, OSError):
+                stats[pod_path] = None
+        return stats
+
+    @property
+    def is_complete(self):
+        """Routes contain all of the concrete routes of the pod."""
+        return self._is_complete
+
     @property
     def routes(self):
         """Routes reflective of the docs."""
         return self._routes
 
+    @property
+    def shared_meta(self):
+        """Meta shared by the routes, kept with the routes cache."""
+        return self.pod.podcache.routes_cache.shared_meta
+
     def _add_to_routes(self, path, route_info, concrete=True, options=None, fingerprinted=None):
         """Add to the routes and the route cache."""
         self.routes.add(path, route_info, options=options)
@@ -64,10 +106,11 @@ class Router:
                 path, route_info, options=options, concrete=concrete,
                 env=self.pod.env.name)
 
-    def add_all(self, concrete=True, use_cache=True):
+    def add_all(self, concrete=True, use_cache=True, verify_hashes=False):
         """Add all documents and static content."""
         if use_cache:
-            unchanged_pod_paths = self.from_cache(concrete=concrete)
+            unchanged_pod_paths = self.from_cache(
+                concrete=concrete, verify_hashes=verify_hashes)
         else:
             unchanged_pod_paths = []
 
@@ -77,6 +120,7 @@ class Router:
             concrete=concrete, unchanged_pod_paths=unchanged_pod_paths)
         self.add_all_other(concrete=concrete)
         self.add_all_hook(concrete=concrete)
+        self._is_complete = concrete
 
     def add_all_docs(self, concrete=True, unchanged_pod_paths=None):
         """Add all pod docs to the router."""
@@ -140,15 +184,34 @@ class Router:
                 default_sitemap_path = default_sitemap_path.replace('//', '/')
                 sitemap_path = self.pod.path_format.format_pod(
                     sitemap.get('path', default_sitemap_path))
-                route_info = RouteInfo('sitemap', meta={
+                meta = {
                     'collections': sitemap.get('collections'),
                     'locales': sitemap.get('locales'),
                     'template': sitemap.get('template'),
                     'filters': sitemap.get('filters'),
                     'path': sitemap_path,
-                })
+                }
+
+                # Large sitemaps are split into pages with a sitemap index.
+                pages = 0
+                if concrete:
+                    url_count = 0
+                    for _ in self.filtered_nodes(
+                            self.sitemap_filters(meta['filters'])):
+                        url_count += 1
+                    max_urls = render_controller.RenderSitemapController.MAX_URLS
+                    if url_count > max_urls:
+                        pages = (url_count + max_urls - 1) // max_urls
+
+                route_info = RouteInfo('sitemap', meta=dict(meta, pages=pages))
                 self._add_to_routes(
                     sitemap_path, route_info, concrete=concrete)
+                for page in range(1, pages + 1):
+                    route_info = RouteInfo(
+                        'sitemap', meta=dict(meta, pages=pages, page=page))
+                    self._add_to_routes(
+                        self.sitemap_page_path(sitemap_path, page), route_info,
+                        concrete=concrete)
 
     def add_all_static(self, concrete=True, unchanged_pod_paths=None):
         """Add all pod docs to the router."""
@@ -180,22 +243,22 @@ class Router:
                             localization.get('static_dir')]
 
                 if concrete:
-                    # Enumerate static files.
-                    for static_dir in static_dirs:
-                        for root, dirs, files in self.pod.walk(static_dir):
-                            for directory in dirs:
-                                if directory.startswith('.'):
-                                    dirs.remove(directory)
-                            pod_dir = root.replace(self.pod.root, '')
-                            for file_name in files:
-                                pod_path = os.path.join(pod_dir, file_name)
-                                # Skip when the doc is in the unchanged pod paths set.
-                                if pod_path in unchanged_pod_paths:
-                                    continue
-                                static_doc = self.pod.get_static(
-                                    pod_path, locale=None)
-                                self.add_static_doc(
-                                    static_doc, concrete=concrete)
+                    # Enumerate static files in batches while scanning.
+                    for batch in static_scanner.StaticScanner.scan(
+                            self.pod, static_dirs):
+                        # Skip when the doc is in the unchanged pod paths set.
+                        stats = {
+                            pod_path: stat for pod_path, stat in batch
+                            if pod_path not in unchanged_pod_paths}
+                        # Hash the changed files together before adding the routes.
+                        hashes = self.pod.hash_files(stats, stats=stats)
+                        for pod_path, stat in stats.items():
+                            static_doc = static_document.StaticDocument(
+                                self.pod, pod_path, locale=None,
+                                fingerprint=hashes.get(pod_path))
+                            self.add_static_doc(
+                                static_doc, concrete=concrete,
+                                hashed=hashes.get(pod_path), stat=stat)
                     if localization:
                         # TODO handle the localized static files?
                         pass
@@ -238,14 +301,16 @@ class Router:
         """Add doc to the router."""
         if not doc.has_serving_path():
             return
-        route_info = RouteInfo(
-            'doc', pod_path=doc.pod_path,
+        # The file is stat before hashing so changes while hashing are found.
+        stat = self._file_stats([doc.pod_path])[doc.pod_path]
+        size, mtime_ns = self._file_meta(stat, time.time_ns())
+        route_info = RouteInfo.for_pod_path(
+            'doc', doc.pod_path,
+            shared_meta=self.shared_meta,
             hashed=self.pod.hash_file(doc.pod_path),
-            meta={
-                'pod_path': doc.pod_path,
-                'locale': str(doc.locale),
-                'collection_path': doc.collection.pod_path,
-            })
+            size=size, mtime_ns=mtime_ns,
+            locale=str(doc.locale),
+            collection_path=doc.collection.pod_path)
         self._add_to_routes(
             doc.get_serving_path(), route_info,
             concrete=concrete, options=doc.path_params)
@@ -253,6 +318,17 @@ class Router:
     def add_docs(self, docs, concrete=True):
         """Add docs to the router."""
         with self.pod.profile.timer('Router.add_docs'):
+            docs = list(docs)
+            # The files are stat before hashing so changes while hashing are
+            # found when validating the cached routes.
+            stats = self._file_stats(doc.pod_path for doc in docs)
+            hashes = self.pod.hash_files(
+                stats, stats={
+                    pod_path: stat for pod_path, stat in stats.items() if stat})
+            now = time.time_ns()
+            file_meta = {
+                pod_path: self._file_meta(stat, now)
+                for pod_path, stat in stats.items()}
             skipped_paths = []
             for doc in docs:
                 if not doc.has_serving_path():
@@ -262,14 +338,14 @@ class Router:
                     continue
                 if concrete:
                     # Concrete iterates all possible documents.
-                    route_info = RouteInfo(
-                        'doc', pod_path=doc.pod_path,
-                        hashed=self.pod.hash_file(doc.pod_path),
-                        meta={
-                            'pod_path': doc.pod_path,
-                            'locale': str(doc.locale),
-                            'collection_path': doc.collection.pod_path,
-                        })
+                    route_info = RouteInfo.for_pod_path(
+                        'doc', doc.pod_path,
+                        shared_meta=self.shared_meta,
+                        hashed=hashes[doc.pod_path],
+                        size=file_meta[doc.pod_path][0],
+                        mtime_ns=file_meta[doc.pod_path][1],
+                        locale=str(doc.locale),
+                        collection_path=doc.collection.pod_path)
                     self._add_to_routes(
                         doc.get_serving_path(), route_info,
                         options=doc.path_params, concrete=concrete)
@@ -280,14 +356,14 @@ class Router:
                     # If the path is already localized only add the
                     # parameterized version of the path.
                     if base_path and not only_localized:
-                        route_info = RouteInfo(
-                            'doc', pod_path=doc.pod_path,
-                            hashed=self.pod.hash_file(doc.pod_path),
-                            meta={
-                                'pod_path': doc.pod_path,
-                                'locale': str(doc.locale),
-                                'collection_path': doc.collection.pod_path,
-                            })
+                        route_info = RouteInfo.for_pod_path(
+                            'doc', doc.pod_path,
+                            shared_meta=self.shared_meta,
+                            hashed=hashes[doc.pod_path],
+                            size=file_meta[doc.pod_path][0],
+                            mtime_ns=file_meta[doc.pod_path][1],
+                            locale=str(doc.locale),
+                            collection_path=doc.collection.pod_path)
                         self._add_to_routes(
                             base_path, route_info,
                             concrete=concrete, options=doc.path_params)
@@ -295,25 +371,25 @@ class Router:
                     if not localized_path or ':locale' not in localized_path:
                         localized_paths = doc.get_serving_paths_localized()
                         for locale, path in localized_paths.items():
-                            route_info = RouteInfo(
-                                'doc', pod_path=doc.pod_path,
-                                hashed=self.pod.hash_file(doc.pod_path),
-                                meta={
-                                    'pod_path': doc.pod_path,
-                                    'locale': str(locale),
-                                    'collection_path': doc.collection.pod_path,
-                                })
+                            route_info = RouteInfo.for_pod_path(
+                                'doc', doc.pod_path,
+                                shared_meta=self.shared_meta,
+                                hashed=hashes[doc.pod_path],
+                                size=file_meta[doc.pod_path][0],
+                                mtime_ns=file_meta[doc.pod_path][1],
+                                locale=str(locale),
+                                collection_path=doc.collection.pod_path)
                             self._add_to_routes(
                                 path, route_info,
                                 concrete=concrete, options=doc.path_params)
                     else:
-                        route_info = RouteInfo(
-                            'doc', pod_path=doc.pod_path,
-                            hashed=self.pod.hash_file(doc.pod_path),
-                            meta={
-                                'pod_path': doc.pod_path,
-                                'collection_path': doc.collection.pod_path,
-                            })
+                        route_info = RouteInfo.for_pod_path(
+                            'doc', doc.pod_path,
+                            shared_meta=self.shared_meta,
+                            hashed=hashes[doc.pod_path],
+                            size=file_meta[doc.pod_path][0],
+                            mtime_ns=file_meta[doc.pod_path][1],
+                            collection_path=doc.collection.pod_path)
                         self._add_to_routes(
                             localized_path, route_info,
                             concrete=concrete, options=doc.path_params_localized)
@@ -330,14 +406,11 @@ class Router:
                 for doc in collection.list_docs_unread():
                     all_doc_pod_paths.add(doc.pod_path)
 
-            doc_pod_paths = set()
-            for pod_path in pod_paths:
-                # Add docs from the depdency graph.
-                dependents = self.pod.podcache.dependency_graph.match_dependents(
-                    pod_path)
-                for dep_path in dependents:
-                    doc_pod_paths.add(dep_path)
+            # Add docs from the dependency graph.
+            doc_pod_paths = self.pod.podcache.dependency_graph.get_all_dependents(
+                pod_paths)
 
+            for pod_path in pod_paths:
                 # Add docs based just on the doc pod paths.
                 for doc_pod_path in all_doc_pod_paths:
                     if fnmatch.fnmatch(doc_pod_path, pod_path):
@@ -349,13 +422,20 @@ class Router:
             docs = self._preload_and_expand(docs, expand=concrete)
             self.add_docs(docs, concrete=concrete)
 
-    def add_static_doc(self, static_doc, concrete=True):
+    def add_static_doc(self, static_doc, concrete=True, hashed=None, stat=None):
         """Add static doc to the router."""
-        if not static_doc.path_filter.is_valid(static_doc.serving_path):
+        serving_path = static_doc.serving_path
+        path_filter = static_doc.path_filter
+        if not path_filter.is_valid(serving_path):
             return
+        if stat is None:
+            stat = self._file_stats([static_doc.pod_path])[static_doc.pod_path]
+        if hashed is None:
+            hashed = self.pod.hash_file(static_doc.pod_path)
+        size, mtime_ns = self._file_meta(stat, time.time_ns())
         route_info = RouteInfo(
             'static', pod_path=static_doc.pod_path,
-            hashed=self.pod.hash_file(static_doc.pod_path),
+            hashed=hashed, size=size, mtime_ns=mtime_ns,
             meta={
                 'pod_path': static_doc.pod_path,
                 'locale': None,
@@ -363,14 +443,28 @@ class Router:
                 'localization': static_doc.config.get('localization'),
                 'fingerprinted': static_doc.fingerprinted,
                 'static_filter': static_doc.filter,
-                'path_filter': static_doc.path_filter,
+                'path_filter': path_filter,
             })
         self._add_to_routes(
-            static_doc.serving_path, route_info, concrete=concrete,
+            serving_path, route_info, concrete=concrete,
             fingerprinted=static_doc.fingerprinted)
 
     def filter(self, filter_type, collection_paths=None, paths=None, locales=None, kinds=None):
         """Filter the routes based on the filter type and criteria."""
+        filter_func = self.filter_func(
+            filter_type, collection_paths=collection_paths, paths=paths,
+            locales=locales, kinds=kinds)
+        count = self.routes.filter(filter_func)
+        self._is_complete = False
+        if count > 0:
+            if filter_type == 'whitelist':
+                self.pod.logger.info('Whitelist filtered out {} routes.'.format(count))
+            else:
+                self.pod.logger.info('Blacklist filtered out {} routes.'.format(count))
+
+    @staticmethod
+    def filter_func(filter_type, collection_paths=None, paths=None, locales=None, kinds=None):
+        """Function that determines if a route passes the filter."""
         # Convert paths to be regex.
         regex_paths = []
         for path in paths or []:
@@ -404,57 +498,102 @@ class Router:
 
                 # Not whitelist.
                 return False
+            return _filter_whitelist
 
-            count = self.routes.filter(_filter_whitelist)
-            if count > 0:
-                self.pod.logger.info('Whitelist filtered out {} routes.'.format(count))
-        else:
-            def _filter_blacklist(serving_path, route_info):
-                # Check for blacklisted collection path.
-                if collection_paths and 'collection_path' in route_info.meta:
-                    if route_info.meta['collection_path'] in collection_paths:
-                        return False
-
-                # Check for blacklisted serving path.
-                for regex_path in regex_paths:
-                    if regex_path.match(serving_path):
-                        return False
-
-                # Check for blacklisted locale.
-                if 'locale' in route_info.meta:
-                    if route_info.meta['locale'] in locales:
-                        return False
+        def _filter_blacklist(serving_path, route_info):
+            # Check for blacklisted collection path.
+            if collection_paths and 'collection_path' in route_info.meta:
+                if route_info.meta['collection_path'] in collection_paths:
+                    return False
 
-                # Check for blacklisted kinds of routes.
-                if kinds and route_info.kind in kinds:
+            # Check for blacklisted serving path.
+            for regex_path in regex_paths:
+                if regex_path.match(serving_path):
                     return False
 
-                # Not blacklisted.
-                return True
+            # Check for blacklisted locale.
+            if 'locale' in route_info.meta:
+                if route_info.meta['locale'] in locales:
+                    return False
 
-            count = self.routes.filter(_filter_blacklist)
-            if count > 0:
-                self.pod.logger.info('Blacklist filtered out {} routes.'.format(count))
+            # Check for blacklisted kinds of routes.
+            if kinds and route_info.kind in kinds:
+                return False
 
-    def from_cache(self, concrete=True):
-        """Import routes from routes cache."""
+            # Not blacklisted.
+            return True
+        return _filter_blacklist
+
+    @staticmethod
+    def sitemap_filters(filters=None):
+        """Filters for the routes included in a sitemap."""
+        # Sitemaps only show documents.
+        return [{'type': 'whitelist', 'kinds': ['doc']}] + list(filters or [])
+
+    @staticmethod
+    def sitemap_page_path(sitemap_path, page):
+        """Serving path for a page of a split sitemap."""
+        base, ext = os.path.splitext(sitemap_path)
+        return '{}-{}{}'.format(base, page, ext)
+
+    def filtered_nodes(self, filters, routes=None):
+        """View of the route nodes that pass all of the filters.
+
+        Unlike `filter` the routes are not changed.
+        """
+        routes = routes if routes is not None else self.routes
+        filter_funcs = [
+            self.filter_func(
+                item['type'], collection_paths=item.get('collections'),
+                paths=item.get('paths'), locales=item.get('locales'),
+                kinds=item.get('kinds'))
+            for item in filters]
+        for path, route_info, options in routes.nodes:
+            passes = True
+            for filter_func in filter_funcs:
+                if not filter_func(path, route_info):
+                    passes = False
+                    break
+            if passes:
+                yield path, route_info, options
+
+    def from_cache(self, concrete=True, verify_hashes=False):
+        """Import routes from routes cache.
+
+        Routes are unchanged when the size and modified time of the file
+        match the cached route, otherwise the file is hashed. When verifying
+        the hashes all of the files are hashed.
+        """
         fingerprinted_dirs = set()
         for config in self.pod.static_configs:
             if 'fingerprinted' in config and config['fingerprinted']:
                 fingerprinted_dirs.add(config['static_dir'])
         fingerprinted_dirs = tuple(fingerprinted_dirs)
 
-        routes_data = self.pod.podcache.routes_cache.raw(
-            concrete=concrete, env=self.pod.env.name)
-        unchanged_pod_paths = set()
-        removed_paths = []
-        for key, item in routes_data.items():
-            route_info = item['value']
-
-            # For now ignore anything that doesn't have a hash.
-            if not route_info.hashed:
+        # For now ignore anything that doesn't have a hash.
+        routes_data = [
+            item for item in self.pod.podcache.routes_cache.items(
+                concrete=concrete, env=self.pod.env.name)
+            if item[1].hashed]
+        stats = self._file_stats(
+            route_info.pod_path for _, route_info, _ in routes_data)
+
+        # Hash the files that may have changed together before validating.
+        hash_stats = {}
+        for _, route_info, _ in routes_data:
+            stat = stats[route_info.pod_path]
+            if stat is None:
                 continue
+            if (verify_hashes or route_info.size is None
+                    or route_info.size != stat.st_size
+                    or route_info.mtime_ns != stat.st_mtime_ns):
+                hash_stats[route_info.pod_path] = stat
+        hashes = self.pod.hash_files(hash_stats, stats=hash_stats)
 
+        now = time.time_ns()
+        unchanged_pod_paths = set()
+        removed_paths = []
+        for key, route_info, options in routes_data:
             # If the serving path is no longer in the static configs, ignore.
             if route_info.kind == 'static':
                 try:
@@ -463,13 +602,24 @@ class Router:
                     continue
 
             # Ignore deleted files.
-            if not self.pod.file_exists(route_info.pod_path):
+            stat = stats[route_info.pod_path]
+            if stat is None:
                 removed_paths.append(key)
                 continue
 
             # If the hash has changed then skip.
-            if route_info.hashed != self.pod.hash_file(route_info.pod_path):
-                continue
+            if route_info.pod_path in hashes:
+                if route_info.hashed != hashes[route_info.pod_path]:
+                    continue
+                size, mtime_ns = self._file_meta(stat, now)
+                if (size, mtime_ns) != (route_info.size, route_info.mtime_ns):
+                    # Keep the file information for validating next time.
+                    route_info = copy.copy(route_info)
+                    route_info.size = size
+                    route_info.mtime_ns = mtime_ns
+                    self.pod.podcache.routes_cache.add(
+                        key, route_info, options=options, concrete=concrete,
+                        env=self.pod.env.name)
 
             # Ignore the fingerprinted files.
             if 'fingerprinted' in route_info.meta:
@@ -482,7 +632,7 @@ class Router:
                         continue
 
             unchanged_pod_paths.add(route_info.pod_path)
-            self.routes.add(key, route_info, options=item['options'])
+            self.routes.add(key, route_info, options=options)
 
         for key in removed_paths:
             self.pod.podcache.routes_cache.remove(key, concrete=concrete)
@@ -494,7 +644,9 @@ class Router:
         for key, item in routes_data.items():
             self.routes.add(
                 key,
-                RouteInfo.from_data(**item['value']),
+                RouteInfo.from_data(
+                    shared_meta=self.shared_meta,
+                    **item['value']),
                 options=item['options'])
 
     def get_render_controller(self, path, route_info, params=None):
@@ -559,9 +711,23 @@ class Router:
         for doc in add_docs if add_docs else []:
             self.add_doc(doc)
 
-    def shard(self, shard_count, current_shard, attr='kind'):
-        """Removes paths from the routes based on sharding rules."""
-        self.routes.shard(shard_count, current_shard, attr=attr)
+    def shard(self, shard_count, current_shard, attr='kind', costs=None):
+        """Removes paths from the routes based on sharding rules.
+
+        When the costs of the paths are given the shards are balanced by
+        cost and the predicted cost of each shard is logged and returned.
+        """
+        shard_costs = self.routes.shard(
+            shard_count, current_shard, attr=attr, costs=costs)
+        self._is_complete = False
+        if shard_costs:
+            self.pod.logger.info(
+                'Predicted render time of shard {} of {}: {:.1f}s'.format(
+                    current_shard, shard_count, shard_costs[current_shard - 1]))
+            self.pod.logger.info('Predicted render time of shards: {}'.format(
+                ', '.join('{}: {:.1f}s'.format(index + 1, cost)
+                          for index, cost in enumerate(shard_costs))))
+        return shard_costs
 
     def use_simple(self):
         """Switches the routes to be a simple routes object."""
@@ -572,18 +738,92 @@ class Router:
                 self._routes.add(path, value)
 
 
+# Path filters of the routes created from data by the patterns.
+_PATH_FILTERS = {}
+
+
+def _meta_record(values):
+    """Read only record of the meta values."""
+    return types.MappingProxyType({
+        name: sys.intern(value) if isinstance(value, str) else value
+        for name, value in values.items()})
+
+
+class SharedMeta:
+    """Route meta shared by many routes, such as a collection in a locale.
+
+    The records are read only since they are shared by the routes.
+    """
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def record(self, **values):
+        """Shared record for the values."""
+        key = tuple(values.items())
+        record = self._records.get(key)
+        if record is None:
+            with self._lock:
+                record = self._records.get(key)
+                if record is None:
+                    record = _meta_record(values)
+                    self._records[key] = record
+        return record
+
+    def reset(self):
+        """Remove all of the records."""
+        with self._lock:
+            self._records = {}
+
+
+class RouteMeta(abc.Mapping):
+    """Meta of a route made from the pod path and the shared meta."""
+
+    __slots__ = ('pod_path', 'shared')
+
+    def __init__(self, pod_path, shared):
+        self.pod_path = pod_path
+        self.shared = shared
+
+    def __getitem__(self, key):
+        if key == 'pod_path':
+            return self.pod_path
+        return self.shared[key]
+
+    def __iter__(self):
+        yield 'pod_path'
+        for key in self.shared:
+            yield key
+
+    def __len__(self):
+        return len(self.shared) + 1
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 # pylint: disable=too-few-public-methods
 class RouteInfo:
     """Organize information stored in the routes."""
 
+    __slots__ = ('kind', 'pod_path', 'hashed', '_meta', 'size', 'mtime_ns')
+
     def __eq__(self, other):
         return self.kind == other.kind and self.meta == other.meta
 
-    def __init__(self, kind, pod_path=None, hashed=None, meta=None):
+    def __init__(self, kind, pod_path=None, hashed=None, meta=None, size=None,
+                 mtime_ns=None):
         self.kind = kind
         self.pod_path = pod_path
         self.hashed = hashed
-        self.meta = meta or {}
+        self._meta = meta or {}
+        # Size and modified time of the file when it was hashed.
+        self.size = size
+        self.mtime_ns = mtime_ns
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -591,19 +831,65 @@ class RouteInfo:
     def __repr__(self):
         return '<RouteInfo kind={} meta={}>'.format(self.kind, self.meta)
 
+    @property
+    def meta(self):
+        """Meta information for the route."""
+        if self._meta.__class__ is types.MappingProxyType:
+            return RouteMeta(self.pod_path, self._meta)
+        return self._meta
+
+    @meta.setter
+    def meta(self, value):
+        self._meta = value or {}
+
+    @staticmethod
+    def _path_filter(data):
+        """Path filter from the exported data, shared by all routes."""
+        ignored = tuple(data.get('ignored') or ())
+        included = tuple(data.get('included') or ())
+        key = (ignored, included)
+        path_filter = _PATH_FILTERS.get(key)
+        if path_filter is None:
+            path_filter = grow_path_filter.PathFilter(
+                ignored=ignored, included=included)
+            _PATH_FILTERS[key] = path_filter
+        return path_filter
+
     @classmethod
-    def from_data(cls, kind, pod_path, hashed, meta):
+    def from_data(cls, kind, pod_path, hashed, meta, size=None, mtime_ns=None,
+                  shared_meta=None):
         """Create the route info from data."""
         # Need to reconstruct the path filter object.
         if 'path_filter' in meta:
-            meta['path_filter'] = grow_path_filter.PathFilter(
-                ignored=meta['path_filter'].get('ignored'),
-                included=meta['path_filter'].get('included'))
+            meta['path_filter'] = cls._path_filter(meta['path_filter'])
         if 'static_filter' in meta:
-            meta['static_filter'] = grow_path_filter.PathFilter(
-                ignored=meta['static_filter'].get('ignored'),
-                included=meta['static_filter'].get('included'))
-        return cls(kind, pod_path=pod_path, hashed=hashed, meta=meta)
+            meta['static_filter'] = cls._path_filter(meta['static_filter'])
+        if (kind == 'doc' and pod_path and meta.get('pod_path') == pod_path
+                and set(meta) <= set(('pod_path', 'locale', 'collection_path'))):
+            shared = dict(meta)
+            del shared['pod_path']
+            return cls.for_pod_path(
+                kind, pod_path, hashed=hashed, size=size, mtime_ns=mtime_ns,
+                shared_meta=shared_meta, **shared)
+        return cls(
+            kind, pod_path=pod_path, hashed=hashed, meta=meta, size=size,
+            mtime_ns=mtime_ns)
+
+    @classmethod
+    def for_pod_path(cls, kind, pod_path, hashed=None, size=None,
+                     mtime_ns=None, shared_meta=None, **meta):
+        """Create the route info for a pod path with shared meta.
+
+        The pod path is added to the meta of the route and the rest of the
+        meta is shared with the other routes using the same values in the
+        shared meta.
+        """
+        record = (
+            shared_meta.record(**meta) if shared_meta is not None
+            else _meta_record(meta))
+        return cls(
+            kind, pod_path=sys.intern(pod_path), hashed=hashed,
+            meta=record, size=size, mtime_ns=mtime_ns)
 
     def export(self):
         """Export route information in a serializable format."""
@@ -613,9 +899,13 @@ class RouteInfo:
             if hasattr(meta_value, 'export'):
                 meta_value = meta_value.export()
             export_meta[key] = meta_value
-        return {
+        exported = {
             'kind': self.kind,
             'pod_path': self.pod_path,
             'hashed': self.hashed,
             'meta': export_meta,
         }
+        if self.size is not None:
+            exported['size'] = self.size
+            exported['mtime_ns'] = self.mtime_ns
+        return exported
@@ -1,6 +1,9 @@
 """Tests for the router."""
 
+import os
 import unittest
+import mock
+from grow.cache import routes_cache as grow_routes_cache
 from grow.pods import pods
 from grow import storage
 from grow.routing import router as grow_router
@@ -23,6 +26,119 @@ class RouterTestCase(unittest.TestCase):
         modified_len = len(self.router.routes)
         self.assertTrue(modified_len < original_len)
 
+    def test_shard_costs(self):
+        """Sharding by cost keeps the routes of the shard."""
+        self.router.add_all(use_cache=False)
+        self.router.use_simple()
+        paths = sorted(self.router.routes.paths)
+        costs = {path: 1.0 for path in paths}
+        costs[paths[0]] = len(paths)
+        shard_costs = self.router.shard(2, 1, costs=costs)
+        self.assertEqual([len(paths), len(paths) - 1.0], shard_costs)
+        self.assertEqual([paths[0]], list(self.router.routes.paths))
+
+    def _age_files(self):
+        """Make the pod files old enough to use the file information."""
+        old_time = os.path.getmtime(self.pod.abs_path('/podspec.yaml')) - 60
+        for root, _, files in os.walk(self.pod.root):
+            for file_name in files:
+                os.utime(os.path.join(root, file_name), (old_time, old_time))
+
+    def test_from_cache(self):
+        """Cached routes of unchanged files are not hashed again."""
+        self._age_files()
+        self.router.add_all(use_cache=False)
+        route_info = self.router.routes.match('/').value
+        self.assertEqual(
+            os.path.getsize(self.pod.abs_path(route_info.pod_path)),
+            route_info.size)
+
+        hash_files = self.pod.hash_files
+        with mock.patch.object(
+                self.pod, 'hash_files', side_effect=hash_files) as mock_hash:
+            router = grow_router.Router(self.pod)
+            unchanged_pod_paths = router.from_cache()
+            self.assertIn(route_info.pod_path, unchanged_pod_paths)
+            self.assertEqual({}, mock_hash.call_args[0][0])
+
+            router = grow_router.Router(self.pod)
+            self.assertEqual(
+                unchanged_pod_paths, router.from_cache(verify_hashes=True))
+            self.assertIn(route_info.pod_path, mock_hash.call_args[0][0])
+
+    def test_from_cache_changed(self):
+        """Cached routes of changed files are not used."""
+        self._age_files()
+        self.router.add_all(use_cache=False)
+        pod_path = self.router.routes.match('/').value.pod_path
+        with open(self.pod.abs_path(pod_path), 'a') as pod_file:
+            pod_file.write('\n# Changed.\n')
+        router = grow_router.Router(self.pod)
+        self.assertNotIn(pod_path, router.from_cache())
+
+
+class RouteInfoTestCase(unittest.TestCase):
+    """Test the route info."""
+
+    def test_for_pod_path(self):
+        """Route info with meta shared between routes."""
+        shared_meta = grow_router.SharedMeta()
+        route_info = grow_router.RouteInfo.for_pod_path(
+            'doc', '/content/pages/foo.yaml', hashed='abc',
+            shared_meta=shared_meta, locale='de',
+            collection_path='/content/pages')
+        other_info = grow_router.RouteInfo.for_pod_path(
+            'doc', '/content/pages/bar.yaml', hashed='def',
+            shared_meta=shared_meta, locale='de',
+            collection_path='/content/pages')
+        expected = {
+            'pod_path': '/content/pages/foo.yaml',
+            'locale': 'de',
+            'collection_path': '/content/pages',
+        }
+        self.assertEqual(expected, route_info.meta)
+        self.assertEqual('de', route_info.meta.get('locale'))
+        self.assertNotIn('path_filter', route_info.meta)
+        self.assertIs(route_info._meta, other_info._meta)
+        self.assertEqual(
+            grow_router.RouteInfo('doc', meta=dict(expected)), route_info)
+
+        exported = route_info.export()
+        self.assertEqual(expected, exported['meta'])
+        self.assertNotIn('size', exported)
+        self.assertEqual(route_info, grow_router.RouteInfo.from_data(**exported))
+
+    def test_shared_meta(self):
+        """Shared meta is read only and cleared with the routes cache."""
+        shared_meta = grow_router.SharedMeta()
+        record = shared_meta.record(locale='de')
+        self.assertIs(record, shared_meta.record(locale='de'))
+        self.assertIsNot(record, grow_router.SharedMeta().record(locale='de'))
+        with self.assertRaises(TypeError):
+            record['locale'] = 'fr'
+        route_info = grow_router.RouteInfo.for_pod_path(
+            'doc', '/content/pages/foo.yaml', shared_meta=shared_meta,
+            locale='de')
+        with self.assertRaises(TypeError):
+            route_info.meta['locale'] = 'fr'
+
+        routes_cache = grow_routes_cache.RoutesCache()
+        routes_cache.shared_meta.record(locale='de')
+        self.assertEqual(1, len(routes_cache.shared_meta))
+        routes_cache.reset()
+        self.assertEqual(0, len(routes_cache.shared_meta))
+
+    def test_file_information(self):
+        """Size and modified time of the file are exported."""
+        route_info = grow_router.RouteInfo.for_pod_path(
+            'doc', '/content/pages/foo.yaml', hashed='abc', size=10,
+            mtime_ns=20, locale='de', collection_path='/content/pages')
+        exported = route_info.export()
+        self.assertEqual(10, exported['size'])
+        self.assertEqual(20, exported['mtime_ns'])
+        imported = grow_router.RouteInfo.from_data(**exported)
+        self.assertEqual((10, 20), (imported.size, imported.mtime_ns))
+
 
 if __name__ == '__main__':
     unittest.main()
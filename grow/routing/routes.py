@@ -1,6 +1,7 @@
 """Routes trie for mapping grow documents to paths."""
 
 import collections
+import heapq
 from grow.common import utils
 
 
@@ -10,6 +11,12 @@ URL_SEPARATOR = '/'
 SHARD_KEY_DEFAULT = '_default'
 TEMPLATE_CHAR = '{'
 
+# Number of matched paths to keep before clearing the match cache.
+MAX_MATCH_CACHE = 10000
+
+# Largest number of shards the routes can be split into.
+MAX_SHARD_COUNT = 1000
+
 
 class Error(Exception):
     """Base routes error."""
@@ -51,6 +58,51 @@ class PathParamNameConflictError(Error):
         self.existing_param = existing_param
 
 
+def shard_paths(items, shard_count, attr='kind', costs=None):
+    """Assign the paths to the shards.
+
+    Without costs the paths are dealt out in path order for each value of the
+    attribute. With costs the most expensive paths are assigned first to the
+    shard with the lowest cost (longest processing time first), paths without
+    a cost use the median cost.
+
+    Returns the shard index of each path and the cost of each shard when
+    using costs.
+    """
+    items = sorted(items, key=lambda item: item[0])
+    assignments = {}
+
+    if costs is None:
+        counters = {}
+        for path, value in items:
+            counter_key = SHARD_KEY_DEFAULT
+
+            # Use the attribute as a counter to equally distribute routes
+            # based on an attribute in the value.
+            if attr and value is not None:
+                counter_key = getattr(value, attr, SHARD_KEY_DEFAULT)
+
+            count = counters.get(counter_key, 0)
+            assignments[path] = count % shard_count
+            counters[counter_key] = count + 1
+        return assignments, None
+
+    known = sorted(costs[path] for path, _ in items if path in costs)
+    default_cost = known[len(known) // 2] if known else 1.0
+    weighted = sorted(
+        ((costs.get(path, default_cost), path) for path, _ in items),
+        key=lambda item: (-item[0], item[1]))
+    shard_costs = [0.0] * shard_count
+    # Ties go to the lowest shard index to keep the shards deterministic.
+    heap = [(0.0, index) for index in range(shard_count)]
+    for cost, path in weighted:
+        shard_cost, index = heapq.heappop(heap)
+        assignments[path] = index
+        shard_costs[index] = shard_cost + cost
+        heapq.heappush(heap, (shard_costs[index], index))
+    return assignments, shard_costs
+
+
 class Routes:
     """Routes container for mapping paths to documents."""
 
@@ -118,14 +170,19 @@ class Routes:
         """Removes a path from the routes."""
         return self._root.remove(path)
 
-    def shard(self, shard_count, current_shard, attr='kind'):
-        """Removes paths from the routes based on sharding rules."""
+    def shard(self, shard_count, current_shard, attr='kind', costs=None):
+        """Removes paths from the routes based on sharding rules.
+
+        When the costs of the paths are given the shards are balanced by
+        cost and the predicted cost of each shard is returned.
+        """
 
         if shard_count <= 1:
             raise ValueError('Shard count needs to be greater than 1')
 
-        if shard_count >= 50:
-            raise ValueError('Shard count needs to be less than 50')
+        if shard_count > MAX_SHARD_COUNT:
+            raise ValueError('Shard count needs to be at most {}'.format(
+                MAX_SHARD_COUNT))
 
         if shard_count < current_shard:
             raise ValueError('Shard count needs to be larger than the current shard')
@@ -133,7 +190,8 @@ class Routes:
         if current_shard < 1:
             raise ValueError('Current shard needs to be at least 1')
 
-        return self._root.shard(shard_count, current_shard, attr=attr)
+        return self._root.shard(
+            shard_count, current_shard, attr=attr, costs=costs)
 
     def update(self, other):
         """Allow updating the current routes with other Routes."""
@@ -204,31 +262,17 @@ class RoutesDict:
             return None
         return MatchResult(path, value)
 
-    def shard(self, shard_count, current_shard, attr='kind'):
+    def shard(self, shard_count, current_shard, attr='kind', costs=None):
         """Removes paths from the routes based on sharding rules."""
         shard_index = current_shard - 1
-        counters = {}
-        remove_paths = []
-        for path in sorted(self._root):
-            counter_key = SHARD_KEY_DEFAULT
-
-            # Use the attribute as a counter to equally distribute routes based
-            # on an attribute in the value.
-            if attr:
-                value = self._root.get(path, None)
-                if value is not None:
-                    counter_key = getattr(value, attr, SHARD_KEY_DEFAULT)
-
-            count = counters.get(counter_key, 0)
-
-            # Remove all paths that do not match the current shard.
-            if count % shard_count != shard_index:
-                remove_paths.append(path)
-
-            counters[counter_key] = count + 1
+        assignments, shard_costs = shard_paths(
+            self._root.items(), shard_count, attr=attr, costs=costs)
 
-        for path in remove_paths:
-            self._root.pop(path, None)
+        # Remove all paths that do not match the current shard.
+        for path, index in assignments.items():
+            if index != shard_index:
+                self._root.pop(path, None)
+        return shard_costs
 
 
 class RouteTrie:
@@ -236,12 +280,14 @@ class RouteTrie:
 
     def __init__(self):
         self._root = RouteNode()
+        # Nodes of paths without any parameters, wildcards or templates.
+        self._static_paths = {}
+        # Results of matching the other paths, cleared when the trie changes.
+        self._matches = {}
+        self._count = 0
 
     def __len__(self):
-        i = 0
-        for _ in self.nodes:
-            i = i + 1
-        return i
+        return self._count
 
     @staticmethod
     def clean_path(path):
@@ -267,43 +313,88 @@ class RouteTrie:
     def add(self, path, value, options=None):
         """Add a new doc to the route trie."""
         segments = self.segments(path)
-        self._root.add(segments, path, value, options=options)
+        is_static = not any(
+            segment and segment[0] in (PREFIX_PARAMETER, PREFIX_WILDCARD)
+            for segment in segments)
+        node, is_new = self._root.add(segments, path, value, options=options)
+        self._matches = {}
+        if is_new:
+            self._count += 1
+        clean_path = self.clean_path(path)
+        if is_static and not node.is_templated:
+            self._static_paths[clean_path] = node
+        else:
+            self._static_paths.pop(clean_path, None)
 
     def filter(self, func):
         """Filters out the nodes that do not match the filter."""
-        return self._root.filter(func)
+        self._matches = {}
+        count = self._root.filter(func)
+        self._count -= count
+        return count
 
     def match(self, path):
         """Matches a path against the known trie looking for a match."""
-        segments = self.segments(path)
-        return self._root.match(segments)
+        path = self.clean_path(path)
+
+        # Static paths always match before parameters and wildcards.
+        node = self._static_paths.get(path)
+        if node is not None and node.path is not None:
+            return MatchResult(node.path, node.value)
+
+        if path in self._matches:
+            matched = self._matches[path]
+        else:
+            matched = self._root.match_segments(path.split(URL_SEPARATOR), 0)
+            if len(self._matches) >= MAX_MATCH_CACHE:
+                self._matches = {}
+            self._matches[path] = matched
+        if matched is None:
+            return None
+        # Results are changed by the callers so they are not shared.
+        return MatchResult(matched.path, matched.value, dict(matched.params))
 
     def remove(self, path):
         """Removes a path from the trie."""
+        self._matches = {}
         segments = self.segments(path)
-        return self._root.remove(segments)
+        removed = self._root.remove(segments)
+        if removed is not None and removed.path is not None:
+            self._count -= 1
+        return removed
 
-    # pylint: disable=unused-argument
-    def shard(self, shard_count, current_shard, attr='kind'):
-        """Removes paths from the routes based on sharding rules."""
-        # Sharding doesn't work on the routing trie since it uses patterns
-        # and would not equally distribute the routes.
-        raise NotImplementedError('Sharding cannot be done on routing trie.')
+    def shard(self, shard_count, current_shard, attr='kind', costs=None):
+        """Removes paths from the routes based on sharding rules.
+
+        Routes with parameters or wildcards are assigned as a whole so all of
+        the paths they match stay in the same shard.
+        """
+        shard_index = current_shard - 1
+        assignments, shard_costs = shard_paths(
+            ((path, value) for path, value, _ in self.nodes),
+            shard_count, attr=attr, costs=costs)
+        self.filter(lambda path, _: assignments[path] == shard_index)
+        return shard_costs
 
 
 class RouteNode:
     """Individual node in the routes trie."""
 
+    __slots__ = (
+        'path', 'paths', 'value', 'options', 'param_name', 'param_options',
+        '_dynamic_children', '_static_children', '_dispatch')
+
     def __init__(self, param_name=None):
         super(RouteNode, self).__init__()
         self.path = None
-        self.paths = set()
+        self.paths = ()
         self.value = None
         self.options = None
         self.param_name = param_name
         self.param_options = None
         self._dynamic_children = {}
         self._static_children = {}
+        self._dispatch = None
 
     def __repr__(self):
         return "<RouteNode({}, {})>".format(self.path, self.param_name)
@@ -327,6 +418,23 @@ class RouteNode:
             for item in self._dynamic_children[key].nodes:
                 yield item
 
+    @property
+    def dispatch(self):
+        """Children used for matching, compiled when the children change.
+
+        Returns the static children, the templated static children, the
+        parameter child and the wildcard child.
+        """
+        if self._dispatch is None:
+            self._dispatch = (
+                self._static_children,
+                tuple(child for child in self._static_children.values()
+                      if child.is_templated),
+                self._dynamic_children.get(PREFIX_PARAMETER),
+                self._dynamic_children.get(PREFIX_WILDCARD),
+            )
+        return self._dispatch
+
     @property
     def is_templated(self):
         """Does the node have a templated path?"""
@@ -369,18 +477,26 @@ class RouteNode:
         return paths
 
     def add(self, segments, path, value, options=None):
-        """Recursively add into the trie based upon the given segments."""
+        """Recursively add into the trie based upon the given segments.
+
+        Returns the node for the path and if the path is new.
+        """
 
         if not segments:
+            is_new = self.path is None
             if self.path and self.value != value:
                 raise PathConflictError(path, value, self.value)
             self.path = path
             self.value = value
             self.options = options
-            # Generate all possible values for the path using the options.
-            self.paths = self._dynamic_paths(path, options)
-            return
-
+            # Generate all possible values for the path using the options,
+            # only kept when there is more than one path.
+            paths = self._dynamic_paths(path, options)
+            self.paths = paths if len(paths) > 1 else ()
+            return self, is_new
+
+        # The children or the templated children can change.
+        self._dispatch = None
         segment = segments.popleft()
 
         # Insert as a parameterized node.
@@ -402,9 +518,8 @@ class RouteNode:
                 if options and segment in options:
                     new_node.add_param_options(options[segment])
                 self._dynamic_children[PREFIX_PARAMETER] = new_node
-            self._dynamic_children[PREFIX_PARAMETER].add(
+            return self._dynamic_children[PREFIX_PARAMETER].add(
                 segments, path, value, options=options)
-            return
 
         # Insert as a wildcard node.
         if segment and segment.startswith(PREFIX_WILDCARD):
@@ -413,15 +528,16 @@ class RouteNode:
                     and self._dynamic_children[PREFIX_WILDCARD].value != value):
                 raise PathConflictError(
                     path, value, self._dynamic_children[PREFIX_WILDCARD].value)
+            existing = self._dynamic_children.get(PREFIX_WILDCARD)
             new_node = RouteWildcardNode(param_name=segment or PREFIX_WILDCARD)
             new_node.add([], path, value, options=options)
             self._dynamic_children[PREFIX_WILDCARD] = new_node
-            return
+            return new_node, existing is None or existing.path is None
 
         # Add a static node.
         if segment not in self._static_children:
             self._static_children[segment] = RouteNode()
-        self._static_children[segment].add(
+        return self._static_children[segment].add(
             segments, path, value, options=options)
 
     def add_param_options(self, options):
@@ -447,16 +563,24 @@ class RouteNode:
 
         return count
 
-    # pylint: disable=too-many-return-statements
     def match(self, segments, last_segment=None):
         """Performs the trie matching to find a doc in the trie."""
+        if last_segment is None:
+            return self.match_segments(list(segments), 0)
+        # Matching segments includes the segment used to match this node.
+        return self.match_segments(
+            [last_segment] + list(segments), 1, last_segment=last_segment)
+
+    # pylint: disable=too-many-return-statements
+    def match_segments(self, segments, index, last_segment=None):
+        """Match the segments starting at the index against the trie."""
 
         # If this is a parameterized node and it needs to match the options.
         if last_segment and self.param_options:
             if last_segment not in self.param_options:
                 return None
 
-        if not segments:
+        if index == len(segments):
             # Check for removed nodes.
             if self.path is None:
                 return None
@@ -468,38 +592,38 @@ class RouteNode:
             matched = MatchResult(self.path, self.value)
             return self._dynamic_params(matched, last_segment)
 
-        segment = segments.popleft()
+        segment = segments[index]
+        static_children, templated_children, param_child, wildcard_child = (
+            self._dispatch or self.dispatch)
 
         # Match static children first, then fallback to dynamic.
-        if segment in self._static_children:
-            matched = self._static_children[segment].match(
-                segments, last_segment=segment)
+        child = static_children.get(segment)
+        if child is not None:
+            matched = child.match_segments(
+                segments, index + 1, last_segment=segment)
             if matched is not None:
                 return self._dynamic_params(matched, last_segment)
         else:
             # Check for templated static children.
-            for key in self._static_children:
-                child = self._static_children[key]
-                if child.is_templated:
-                    matched = child.match(segments, last_segment=segment)
-                    if matched is not None:
-                        return self._dynamic_params(matched, last_segment)
+            for child in templated_children:
+                matched = child.match_segments(
+                    segments, index + 1, last_segment=segment)
+                if matched is not None:
+                    return self._dynamic_params(matched, last_segment)
 
         # Check if this is a parameterized segement.
-        if PREFIX_PARAMETER in self._dynamic_children:
-            matched = self._dynamic_children[PREFIX_PARAMETER].match(
-                segments, last_segment=segment)
+        if param_child is not None:
+            matched = param_child.match_segments(
+                segments, index + 1, last_segment=segment)
             if matched is not None:
                 return self._dynamic_params(matched, last_segment)
 
         # Check for the wildcard catch all.
-        if PREFIX_WILDCARD in self._dynamic_children:
-            matched = self._dynamic_children[PREFIX_WILDCARD].match(
-                segments, last_segment=segment)
+        if wildcard_child is not None:
+            matched = wildcard_child.match_segments(
+                segments, index + 1, last_segment=segment)
             return self._dynamic_params(matched, last_segment)
 
-        # Add the current segment back since this is not a match.
-        segments.appendleft(segment)
         return None
 
     def remove(self, segments):
@@ -532,7 +656,9 @@ class RouteNode:
 class RouteWildcardNode(RouteNode):
     """Individual wildcard node in the routes trie."""
 
-    def match(self, segments, last_segment=None):
+    __slots__ = ()
+
+    def match_segments(self, segments, index, last_segment=None):
         """Matches the rest of the segments as the wildcard portion."""
 
         # Handle deleted node.
@@ -541,8 +667,8 @@ class RouteWildcardNode(RouteNode):
 
         # Add the last segment back to be joined.
         if last_segment:
-            segments.appendleft(last_segment)
-        segment = URL_SEPARATOR.join(segments)
+            index = index - 1
+        segment = URL_SEPARATOR.join(segments[index:])
 
         return self._dynamic_params(
             MatchResult(self.path, self.value), segment)
@@ -559,6 +685,8 @@ class RouteWildcardNode(RouteNode):
 class MatchResult:
     """Node information for a trie match."""
 
+    __slots__ = ('path', 'value', 'params')
+
     def __init__(self, path, value, params=None):
         self.path = path
         self.value = value
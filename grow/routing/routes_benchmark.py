@@ -0,0 +1,119 @@
+"""Micro-benchmarks for the routes.
+
+Usage:
+    python -m grow.routing.routes_benchmark [route_count]
+    python -m grow.routing.routes_benchmark memory [route_count]
+"""
+
+import gc
+import random
+import sys
+import timeit
+import tracemalloc
+from grow.cache import routes_cache as grow_routes_cache
+from grow.routing import router as grow_router
+from grow.routing import routes as grow_routes
+
+
+LOCALES = ['de', 'en', 'es', 'fr', 'it', 'ja', 'ko', 'pt', 'ru', 'zh']
+
+
+def create_routes(count):
+    """Create abstract routes similar to a large localized pod."""
+    routes = grow_routes.Routes()
+    routes.add('/', 'home')
+    routes.add('/static/*', 'static')
+    routes.add('/:locale/static/*', 'static_localized', options={
+        'locale': LOCALES,
+    })
+    collections = max(1, count // 1000)
+    index = 0
+    while index < count:
+        collection = 'collection{}'.format(index % collections)
+        page = 'page{}'.format(index)
+        routes.add('/{}/{}/'.format(collection, page), page)
+        routes.add('/:locale/{}/{}/'.format(collection, page), page, options={
+            'locale': LOCALES,
+        })
+        index += 2
+    return routes
+
+
+def create_paths(count, sample_size=1000):
+    """Sample of request paths for the routes."""
+    rand = random.Random(0)
+    collections = max(1, count // 1000)
+    paths = []
+    for _ in range(sample_size):
+        index = rand.randrange(0, count, 2)
+        collection = 'collection{}'.format(index % collections)
+        kind = rand.random()
+        if kind < 0.4:
+            paths.append('/{}/page{}/'.format(collection, index))
+        elif kind < 0.8:
+            paths.append('/{}/{}/page{}/'.format(
+                rand.choice(LOCALES), collection, index))
+        elif kind < 0.9:
+            paths.append('/{}/static/css/main.css'.format(rand.choice(LOCALES)))
+        else:
+            paths.append('/missing/page{}/'.format(index))
+    return paths
+
+
+def run(count=100000, number=20):
+    """Benchmark the matching and print the time for each match."""
+    routes = create_routes(count)
+    paths = create_paths(count)
+
+    def _match_all():
+        for path in paths:
+            routes.match(path)
+
+    seconds = min(timeit.repeat(_match_all, number=number, repeat=3))
+    per_match = seconds / (number * len(paths))
+    print('{} routes: {:.3f} us per match'.format(
+        len(routes), per_match * 1000000))
+    return per_match
+
+
+def run_memory(count=1000000):
+    """Measure the memory used for each concrete route of a build.
+
+    Concrete builds keep the routes and the routes cache of every localized
+    document, the paths are included in the memory used.
+    """
+    pod_paths = [
+        '/content/collection{}/page{}.yaml'.format(index % 100, index)
+        for index in range(count // len(LOCALES))]
+    hashes = {pod_path: '{:040x}'.format(index)
+              for index, pod_path in enumerate(pod_paths)}
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    routes = grow_routes.RoutesSimple()
+    routes_cache = grow_routes_cache.RoutesCache()
+    for index, pod_path in enumerate(pod_paths):
+        collection_path = '/content/collection{}'.format(index % 100)
+        for locale in LOCALES:
+            path = '/{}/collection{}/page{}/'.format(locale, index % 100, index)
+            route_info = grow_router.RouteInfo.for_pod_path(
+                'doc', pod_path, hashed=hashes[pod_path],
+                shared_meta=routes_cache.shared_meta, locale=str(locale),
+                collection_path=collection_path)
+            routes.add(path, route_info, options={})
+            routes_cache.add(
+                path, route_info, options={}, concrete=True, env='dev')
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    per_route = used / len(routes)
+    print('{} routes: {:.0f} bytes per route'.format(len(routes), per_route))
+    return per_route
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'memory':
+        run_memory(int(sys.argv[2]) if len(sys.argv) > 2 else 1000000)
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -334,6 +334,79 @@ class RoutesTestCase(unittest.TestCase):
         result = self.routes.match('/foo/bar')
         self.assertEqual(None, result)
 
+    def test_remove_wildcard_fallback(self):
+        """Tests that removed wildcards fall back to the other routes."""
+
+        doc = self._add('/foo/:bar', '/content/bar')
+        self._add('/foo/*baz', '/content/baz')
+        self.routes.remove('/foo/*baz')
+        self.assertEqual(None, self.routes.match('/foo/bar/baz'))
+        result = self.routes.match('/foo/bar')
+        self.assertEqual(doc['value'], result.value)
+        self.assertEqual({'bar': 'bar'}, result.params)
+
+    def test_shard(self):
+        """Tests that the trie can be sharded."""
+        self._add('/foo', value=1)
+        self._add('/bar', value=2)
+        self._add('/:locale/bar', value=3, options={'locale': ['de', 'en']})
+        self._add('/static/*', value=4)
+
+        self.routes.shard(2, 1, attr=None)
+        self.assertEqual(['/foo', '/:locale/bar'], list(self.routes.paths))
+        self.assertEqual(2, len(self.routes))
+        self.assertEqual(3, self.routes.match('/en/bar').value)
+        self.assertEqual(None, self.routes.match('/bar'))
+        self.assertEqual(None, self.routes.match('/static/main.css'))
+
+        self.routes = grow_routes.Routes()
+        self._add('/foo', value=1)
+        self._add('/bar', value=2)
+        self._add('/:locale/bar', value=3, options={'locale': ['de', 'en']})
+        self.assertEqual(
+            [3.0, 2.0],
+            self.routes.shard(2, 2, costs={'/:locale/bar': 2.0, '/foo': 1.0}))
+        self.assertEqual(['/bar'], list(self.routes.paths))
+
+    def test_len(self):
+        """Tests the number of paths in the routes."""
+
+        self._add('/foo', '/content/foo')
+        self._add('/foo', '/content/foo')
+        self._add('/:foo/bar', '/content/bar')
+        self._add('/foo/*', '/content/baz')
+        self._add('/foo/*', '/content/baz')
+        self.assertEqual(3, len(self.routes))
+        self.routes.remove('/foo')
+        self.routes.remove('/foo')
+        self.assertEqual(2, len(self.routes))
+        self.routes.filter(lambda path, value: value != '/content/bar')
+        self.assertEqual(1, len(self.routes))
+        self.assertEqual(1, len(list(self.routes.nodes)))
+
+    def test_match_changes(self):
+        """Tests that matches reflect changes to the routes."""
+
+        param_doc = self._add('/foo/:bar', '/content/bar')
+        result = self.routes.match('/foo/bar')
+        self.assertEqual(param_doc['value'], result.value)
+
+        # Results are not shared between matches.
+        result.params['bar'] = 'baz'
+        self.assertEqual({'bar': 'bar'}, self.routes.match('/foo/bar').params)
+
+        static_doc = self._add('/foo/bar', '/content/static')
+        result = self.routes.match('/foo/bar')
+        self.assertEqual(static_doc['value'], result.value)
+        self.assertEqual({}, result.params)
+
+        self.routes.remove('/foo/bar')
+        result = self.routes.match('/foo/bar')
+        self.assertEqual(param_doc['value'], result.value)
+
+        self.routes.filter(lambda path, value: False)
+        self.assertEqual(None, self.routes.match('/foo/bar'))
+
     def test_param(self):
         """Test that params work for matching paths."""
 
@@ -868,6 +941,44 @@ class RoutesSimpleTestCase(unittest.TestCase):
         actual = sorted(list(self.routes.paths))
         self.assertEqual(expected, actual)
 
+    def test_shard_costs(self):
+        """Tests that routes' can be sharded by cost."""
+        costs = {
+            '/bax/bar': 8.0,
+            '/bax/coo/lib': 5.0,
+            '/bax/coo/vin': 4.0,
+            '/bax/pan': 3.0,
+            '/foo': 2.0,
+        }
+
+        def _reset_routes():
+            self.routes = grow_routes.RoutesSimple()
+            self._add('/foo', value=1)
+            self._add('/bax/coo/lib', value=2)
+            self._add('/bax/bar', value=3)
+            self._add('/bax/pan', value=4)
+            self._add('/bax/coo/vin', value=5)
+            # Paths without a cost use the median cost.
+            self._add('/tem/pon', value=6)
+
+        _reset_routes()
+        shard_costs = self.routes.shard(2, 1, costs=costs)
+        self.assertEqual([14.0, 12.0], shard_costs)
+        self.assertEqual(
+            ['/bax/bar', '/foo', '/tem/pon'], sorted(self.routes.paths))
+
+        _reset_routes()
+        self.assertEqual([14.0, 12.0], self.routes.shard(2, 2, costs=costs))
+        self.assertEqual(
+            ['/bax/coo/lib', '/bax/coo/vin', '/bax/pan'],
+            sorted(self.routes.paths))
+
+        # Many more shards than routes.
+        _reset_routes()
+        shard_costs = self.routes.shard(500, 500, costs=costs)
+        self.assertEqual(500, len(shard_costs))
+        self.assertEqual([], list(self.routes.paths))
+
     def test_shard_errors(self):
         """Tests that errors happen with invalid shard values."""
 
@@ -883,7 +994,7 @@ class RoutesSimpleTestCase(unittest.TestCase):
             self.routes.shard(0, 1)
 
         with self.assertRaises(ValueError):
-            self.routes.shard(50, 1)
+            self.routes.shard(grow_routes.MAX_SHARD_COUNT + 1, 1)
 
         with self.assertRaises(ValueError):
             self.routes.shard(1, 1)
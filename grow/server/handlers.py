@@ -87,9 +87,12 @@ def serve_pod(pod, request, matched, **_kwargs):
         request.path, matched.value, params=matched.params)
     response = None
     headers = controller.get_http_headers()
-    jinja_env = pod.render_pool.get_jinja_env(
-        controller.doc.locale) if controller.use_jinja else None
-    rendered_document = controller.render(jinja_env=jinja_env, request=request)
+    if controller.use_jinja:
+        with pod.render_pool.lease(controller.doc.locale) as jinja_env:
+            rendered_document = controller.render(
+                jinja_env=jinja_env, request=request)
+    else:
+        rendered_document = controller.render(jinja_env=None, request=request)
     content = rendered_document.read()
     response = Response(body=content)
     response.headers.update(headers)
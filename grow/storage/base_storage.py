@@ -30,6 +30,10 @@ class BaseStorage:
     def walk(dirpath):
         raise NotImplementedError
 
+    @staticmethod
+    def scandir(dirpath):
+        raise NotImplementedError
+
     @staticmethod
     def delete(filename):
         raise NotImplementedError
@@ -42,7 +42,7 @@ class FileStorage(base_storage.BaseStorage):
     def hash(filename):
         hash_digest = hashlib.sha256()
         with open(filename, "rb") as source_file:
-            for chunk in iter(lambda: source_file.read(4096), b""):
+            for chunk in iter(lambda: source_file.read(1024 * 1024), b""):
                 hash_digest.update(chunk)
         return hash_digest.hexdigest()
 
@@ -62,6 +62,10 @@ class FileStorage(base_storage.BaseStorage):
     def walk(dirpath):
         return os.walk(dirpath, followlinks=True)
 
+    @staticmethod
+    def scandir(dirpath):
+        return os.scandir(dirpath)
+
     @staticmethod
     def JinjaLoader(path):
         return jinja_loader.FrontMatterLoader(path)
@@ -14,14 +14,50 @@ When updating jinja to a new version:
 - The `get_template`, `select_template`, `get_or_select_template` pass the `context`
   argument to the `_load_template` method.
 - The `_load_template` method can remain unchanged.
+
+Templates loaded by `extends` and `import`, and the template loaded for the
+render itself, do not pass the context. While inside `track_dependencies` the
+templates loaded on the current thread are tracked without the context.
+
+When the environment has an enabled `template_profile` the render time of each
+template is recorded. The `DepTemplate` wraps the root render function, blocks
+and macros of the template when it is created so the generated code is the same
+with or without profiling and the templates without profiling have no overhead.
+- The `_from_namespace` method needs to match the upstream `Template` method.
+
+When the environment has `cache_stats` the lookups of the template cache are
+counted, which needs to match the cache key used by the upstream `_load_template`.
 """
 
+import contextlib
+import threading
+import weakref
+
 from jinja2 import nodes
 from jinja2.compiler import supports_yield_from, CodeGenerator
 from jinja2.environment import Environment, Template, TemplateNotFound, TemplatesNotFound
+from jinja2.runtime import Macro
 from jinja2._compat import string_types
 
 
+_LOCAL = threading.local()
+
+
+def _profile_key(name):
+    return name if name.startswith('/') else '/{}'.format(name)
+
+
+@contextlib.contextmanager
+def track_dependencies(track_dependency):
+    """Track the templates loaded on the current thread."""
+    previous = getattr(_LOCAL, 'track_dependency', None)
+    _LOCAL.track_dependency = track_dependency
+    try:
+        yield
+    finally:
+        _LOCAL.track_dependency = previous
+
+
 class DepCodeGenerator(CodeGenerator):
     """Custom code generator for dependency tracking."""
 
@@ -82,10 +118,54 @@ class DepCodeGenerator(CodeGenerator):
             self.outdent()
 
 
+class DepTemplate(Template):
+    """Custom template for render time profiling."""
+
+    @classmethod
+    def _from_namespace(cls, environment, namespace, globals):
+        template = super(DepTemplate, cls)._from_namespace(
+            environment, namespace, globals)
+        template_profile = getattr(environment, 'template_profile', None)
+        if not template.name or template_profile is None or not template_profile.enabled:
+            return template
+
+        key = _profile_key(template.name)
+        root_render_func = template.root_render_func
+
+        def _profiled_root(context, *args, **kwargs):
+            return template_profile.render(
+                key, root_render_func(context, *args, **kwargs))
+
+        def _profiled_block(block_func):
+            def _block(context, *args, **kwargs):
+                return template_profile.render(
+                    key, block_func(context, *args, **kwargs))
+            return _block
+
+        class ProfiledMacro(Macro):
+            """Macro that records the time spent in the macro."""
+
+            def _invoke(self, arguments, autoescape):
+                return template_profile.call(
+                    '{}#{}'.format(key, self.name),
+                    super(ProfiledMacro, self)._invoke, arguments, autoescape)
+
+        template.root_render_func = _profiled_root
+        template.blocks = {
+            name: _profiled_block(block_func)
+            for name, block_func in template.blocks.items()}
+        # The generated code looks up the macro class in the namespace.
+        namespace['Macro'] = ProfiledMacro
+        return template
+
+
 class DepEnvironment(Environment):
     """Custom environment for dependency tracking."""
 
     code_generator_class = DepCodeGenerator
+    template_class = DepTemplate
+    template_profile = None
+    cache_stats = None
 
     def get_template(self, name, parent=None, globals=None, context=None):
         """Copied from upstream. Added context arg passthrough."""
@@ -121,9 +201,36 @@ class DepEnvironment(Environment):
             return template_name_or_list
         return self.select_template(template_name_or_list, parent, globals, context=context)
 
+    def _count_cache_lookup(self, name):
+        """Count the template cache lookup that upstream is about to make."""
+        if self.cache is None or self.loader is None:
+            self.cache_stats.miss()
+            return
+        template = self.cache.get((weakref.ref(self.loader), name))
+        if template is None:
+            self.cache_stats.miss()
+            capacity = getattr(self.cache, 'capacity', None)
+            if capacity is not None and len(self.cache) >= capacity:
+                self.cache_stats.evict()
+            self.cache_stats.insert()
+        elif self.auto_reload and not template.is_up_to_date:
+            self.cache_stats.miss()
+            self.cache_stats.invalidate()
+            self.cache_stats.insert()
+        else:
+            self.cache_stats.hit()
+
     # pylint: disable=redefined-builtin
     def _load_template(self, name, globals, context=None):
         """Custom template loading that tracks template as a dependency."""
         if context and '_track_dependency' in context:
             context['_track_dependency'](name)
+        elif getattr(_LOCAL, 'track_dependency', None) is not None:
+            _LOCAL.track_dependency(name)
+        if self.cache_stats is not None:
+            self._count_cache_lookup(name)
+        if self.template_profile is not None and self.template_profile.enabled:
+            return self.template_profile.load(
+                _profile_key(name), super(DepEnvironment, self)._load_template,
+                name, globals)
         return super(DepEnvironment, self)._load_template(name, globals)
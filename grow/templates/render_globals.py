@@ -0,0 +1,92 @@
+"""Render specific globals for the jinja environments.
+
+The render specific tags are not available inside of imported macros when they
+are passed as render variables (See: https://github.com/pallets/jinja/issues/688)
+so they need to be environment globals. Instead of changing the shared
+environment globals for every render, the environment globals are proxies to
+the values set for the render in progress on the current thread.
+
+    with render_globals.use_globals(g=local_tags):
+        template.render({...})
+"""
+
+import contextlib
+import threading
+from grow.templates import tags
+
+
+_LOCAL = threading.local()
+
+
+def _current_value(key):
+    values = getattr(_LOCAL, 'values', None) or {}
+    return values.get(key, None)
+
+
+class RenderGlobalTags:
+    """Proxy to the tags set for the current render."""
+
+    def __init__(self, key):
+        self._key = key
+
+    def __repr__(self):
+        return '<RenderGlobalTags({})>'.format(self._key)
+
+    def __getattr__(self, name):
+        value = _current_value(self._key)
+        if value is None:
+            raise AttributeError(name)
+        try:
+            return getattr(value, name)
+        except AttributeError:
+            try:
+                return value[name]
+            except (KeyError, TypeError):
+                raise AttributeError(name)
+
+    def __getitem__(self, name):
+        value = _current_value(self._key)
+        if value is None:
+            raise KeyError(name)
+        return value[name]
+
+    def __contains__(self, name):
+        value = _current_value(self._key)
+        return value is not None and name in value
+
+
+class RenderGlobalFunction:
+    """Proxy to a context function set for the current render."""
+
+    # Jinja passes the context to the proxy the same as a context function.
+    contextfunction = True
+
+    def __init__(self, key, default):
+        self._key = key
+        self._default = default
+
+    def __repr__(self):
+        return '<RenderGlobalFunction({})>'.format(self._key)
+
+    def __call__(self, *args, **kwargs):
+        func = _current_value(self._key) or self._default
+        return func(*args, **kwargs)
+
+
+def create_render_globals():
+    """Create the render specific globals for an environment."""
+    return {
+        'g': RenderGlobalTags('g'),
+        '_': RenderGlobalFunction('_', tags.make_doc_gettext(None)),
+    }
+
+
+@contextlib.contextmanager
+def use_globals(**values):
+    """Set the render specific global values for the current thread."""
+    previous = getattr(_LOCAL, 'values', None)
+    _LOCAL.values = values
+    try:
+        yield
+    finally:
+        _LOCAL.values = previous
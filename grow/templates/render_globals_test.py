@@ -0,0 +1,33 @@
+"""Tests for the render globals."""
+
+import unittest
+from grow.templates import render_globals
+
+
+class RenderGlobalsTestCase(unittest.TestCase):
+    """Test the render globals."""
+
+    def test_tags(self):
+        """Render tags proxy to the values for the current render."""
+        proxy = render_globals.RenderGlobalTags('g')
+        with self.assertRaises(AttributeError):
+            _ = proxy.foo
+        with render_globals.use_globals(g={'foo': 'bar'}):
+            self.assertEqual('bar', proxy.foo)
+            self.assertEqual('bar', proxy['foo'])
+            self.assertIn('foo', proxy)
+            with render_globals.use_globals(g={'foo': 'baz'}):
+                self.assertEqual('baz', proxy.foo)
+            self.assertEqual('bar', proxy.foo)
+        self.assertNotIn('foo', proxy)
+
+    def test_function(self):
+        """Render functions proxy to the function for the current render."""
+        proxy = render_globals.RenderGlobalFunction('_', lambda value: 'default')
+        self.assertEqual('default', proxy('foo'))
+        with render_globals.use_globals(_=lambda value: value.upper()):
+            self.assertEqual('FOO', proxy('foo'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -314,14 +314,19 @@ def create_builtin_tags(pod, doc, track_dependency=None):
 
 
 def create_builtin_globals(env, pod, locale=None):
-    """Create built in global tags."""
+    """Create built in global tags.
+
+    The translations use the `locale` of the environment when called so the
+    environment can be used for a different locale by changing `env.locale`.
+    """
     # Mark that we are using the newstyle gettext to avoid issues with escaping.
     env.newstyle_gettext = True
+    env.locale = locale
     get_gettext_func = pod.catalogs.get_gettext_translations
     gettext = make_gettext(
-        pod, lambda x: get_gettext_func(locale).ugettext(x))
+        pod, lambda x: get_gettext_func(env.locale).ugettext(x))
     ngettext = make_ngettext(
-        pod, lambda s, p, n: get_gettext_func(locale).ungettext(s, p, n))
+        pod, lambda s, p, n: get_gettext_func(env.locale).ungettext(s, p, n))
     return {
         'gettext': gettext,
         'ngettext': ngettext,
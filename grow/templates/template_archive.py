@@ -0,0 +1,173 @@
+"""Persistent archive of compiled templates.
+
+The archive is a jinja bytecode cache that keeps the compiled template code in
+memory and in the pod's control directory. Every jinja environment (for every
+locale and render pool slot) and every render process shares the archive so a
+template is only compiled once for the same source, until the source changes.
+The compiled code does not depend on the locale, so the loaded code objects are
+also shared in memory between the environments.
+
+    archive = template_archive.TemplateArchive(pod)
+    archive.precompile(jinja_env)
+"""
+
+import hashlib
+import os
+import threading
+import jinja2
+from jinja2 import bccache
+
+# Templates that are compiled ahead of rendering.
+PRECOMPILE_DIRS = ('/views', '/partials')
+# Extensions of files in the precompile directories that are not templates.
+IGNORED_EXTENSIONS = (
+    '.gif', '.ico', '.jpeg', '.jpg', '.mp4', '.png', '.pyc', '.svgz', '.webp',
+    '.woff', '.woff2',
+)
+
+
+class TemplateArchive(bccache.BytecodeCache):
+    """Bytecode cache shared by the jinja environments of a pod."""
+
+    PATH_ARCHIVE = 'templates/'
+    SUFFIX = '.cache'
+
+    def __init__(self, pod):
+        self.pod = pod
+        self._code = {}
+        self._compiled = {}
+        # Archived file names of each template key, listed once when needed.
+        self._index = None
+        self._lock = threading.Lock()
+        self._is_writable = True
+
+    @property
+    def archive_dir(self):
+        """Directory where the compiled templates are archived."""
+        return self.pod.abs_path('{}{}'.format(
+            self.pod.PATH_CONTROL, self.PATH_ARCHIVE))
+
+    @staticmethod
+    def environment_signature(environment):
+        """Signature of the environment options that change compiled code."""
+        parts = [
+            jinja2.__version__,
+            environment.code_generator_class.__name__,
+            repr(environment.autoescape),
+            repr(environment.trim_blocks),
+            repr(environment.lstrip_blocks),
+        ]
+        parts.extend(sorted(environment.extensions.keys()))
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def _file_path(self, bucket):
+        return os.path.join(self.archive_dir, '{}-{}{}'.format(
+            bucket.key, bucket.checksum, self.SUFFIX))
+
+    def _load_index(self):
+        """Index of the archived file names by template key."""
+        if self._index is None:
+            self._index = {}
+            for file_name in os.listdir(self.archive_dir):
+                if file_name.endswith(self.SUFFIX):
+                    key = file_name.split('-', 1)[0]
+                    self._index.setdefault(key, set()).add(file_name)
+        return self._index
+
+    def _remove_outdated(self, bucket):
+        """Remove archived code for previous versions of the template."""
+        current = os.path.basename(self._file_path(bucket))
+        index = self._load_index()
+        for file_name in index.get(bucket.key, set()) - set([current]):
+            try:
+                os.remove(os.path.join(self.archive_dir, file_name))
+            except OSError:
+                pass
+        index[bucket.key] = set([current])
+
+    def get_bucket(self, environment, name, filename, source):
+        """Bucket for the template keyed by environment and source checksum."""
+        key = self.get_cache_key('{}|{}'.format(
+            self.environment_signature(environment), name), filename)
+        checksum = self.get_source_checksum(source)
+        bucket = bccache.Bucket(environment, key, checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket):
+        archive_key = (bucket.key, bucket.checksum)
+        code = self._compiled.get(archive_key)
+        if code is not None:
+            bucket.code = code
+            return
+        data = self._code.get(archive_key)
+        if data is None:
+            try:
+                with open(self._file_path(bucket), 'rb') as archive_file:
+                    data = archive_file.read()
+            except (IOError, OSError):
+                return
+            self._code[archive_key] = data
+        bucket.bytecode_from_string(data)
+        if bucket.code is not None:
+            self._compiled[archive_key] = bucket.code
+
+    def dump_bytecode(self, bucket):
+        data = bucket.bytecode_to_string()
+        self._code[(bucket.key, bucket.checksum)] = data
+        self._compiled[(bucket.key, bucket.checksum)] = bucket.code
+        if not self._is_writable:
+            return
+        file_path = self._file_path(bucket)
+        tmp_file_path = '{}.{}.{}.tmp'.format(
+            file_path, os.getpid(), threading.get_ident())
+        try:
+            with self._lock:
+                if not os.path.exists(self.archive_dir):
+                    os.makedirs(self.archive_dir)
+                self._remove_outdated(bucket)
+            with open(tmp_file_path, 'wb') as archive_file:
+                archive_file.write(data)
+            os.replace(tmp_file_path, file_path)
+        except (IOError, OSError):
+            # Keep working in memory when the pod is not writable.
+            self.pod.logger.debug('Unable to write the template archive.')
+            self._is_writable = False
+
+    def clear(self):
+        self._code = {}
+        self._compiled = {}
+        self._index = None
+        if not os.path.exists(self.archive_dir):
+            return
+        for file_name in os.listdir(self.archive_dir):
+            if file_name.endswith(self.SUFFIX):
+                os.remove(os.path.join(self.archive_dir, file_name))
+
+    def list_templates(self):
+        """Pod paths of the templates to compile ahead of rendering."""
+        template_paths = []
+        for dir_path in PRECOMPILE_DIRS:
+            if not self.pod.file_exists(dir_path):
+                continue
+            for path in self.pod.list_dir(dir_path):
+                if path.lower().endswith(IGNORED_EXTENSIONS):
+                    continue
+                template_paths.append('{}/{}'.format(dir_path, path.lstrip('/')))
+        return sorted(template_paths)
+
+    def precompile(self, jinja_env):
+        """Compile the pod templates into the archive.
+
+        Templates with errors are skipped, the error is raised when the
+        template is used for rendering.
+        """
+        count = 0
+        with self.pod.profile.timer('TemplateArchive.precompile'):
+            for pod_path in self.list_templates():
+                try:
+                    jinja_env.get_template(pod_path.lstrip('/'))
+                    count += 1
+                except (jinja2.TemplateError, UnicodeDecodeError):
+                    continue
+        return count
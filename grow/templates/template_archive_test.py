@@ -0,0 +1,68 @@
+"""Tests for the template archive."""
+
+import os
+import unittest
+import mock
+from grow.pods import pods
+from grow import storage
+from grow.templates import jinja_dependency
+from grow.templates import template_archive
+from grow.testing import testing
+
+
+class TemplateArchiveTestCase(unittest.TestCase):
+    """Test the template archive."""
+
+    def setUp(self):
+        self.dir_path = testing.create_test_pod_dir()
+        self.pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+
+    def test_precompile(self):
+        """Templates are compiled into the archive directory."""
+        archive = self.pod.jinja_bytecode_cache
+        self.assertIsInstance(archive, template_archive.TemplateArchive)
+        self.assertIn('/views/base.html', archive.list_templates())
+        count = self.pod.render_pool.precompile_templates()
+        self.assertTrue(count)
+        self.assertEqual(count, len(os.listdir(archive.archive_dir)))
+
+    def test_precompile_lists_once(self):
+        """The archive directory is listed once for all of the templates."""
+        archive = self.pod.jinja_bytecode_cache
+        with mock.patch.object(
+                template_archive.os, 'listdir', wraps=os.listdir) as mock_listdir:
+            count = self.pod.render_pool.precompile_templates()
+        self.assertTrue(count > 1)
+        mock_listdir.assert_called_once_with(archive.archive_dir)
+
+    def test_shared_archive(self):
+        """Other environments and pods load the compiled templates."""
+        self.pod.render_pool.precompile_templates()
+
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        with mock.patch.object(
+                jinja_dependency.DepEnvironment, 'compile') as mock_compile:
+            jinja_env = pod.render_pool.get_jinja_env('de')
+            jinja_env['env'].get_template('views/base.html')
+        mock_compile.assert_not_called()
+
+    def test_changed_source(self):
+        """Changed templates are compiled again."""
+        archive = self.pod.jinja_bytecode_cache
+        self.pod.render_pool.precompile_templates()
+        count = len(os.listdir(archive.archive_dir))
+
+        content = self.pod.read_file('/views/base.html')
+        self.pod.write_file('/views/base.html', content + '\n{# Changed #}')
+        pod = pods.Pod(self.dir_path, storage=storage.FileStorage)
+        with mock.patch.object(
+                jinja_dependency.DepEnvironment, 'compile',
+                wraps=pod.render_pool.custom_jinja_env()['env'].compile) as mock_compile:
+            pod.render_pool.get_jinja_env()['env'].get_template('views/base.html')
+        self.assertEqual(1, mock_compile.call_count)
+        # The outdated code for the template is removed.
+        self.assertEqual(count, len(os.listdir(archive.archive_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
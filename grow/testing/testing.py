@@ -33,6 +33,13 @@ def get_testdata_dir():
     return TESTDATA_DIR
 
 
+def write_old_file(pod, pod_path, content):
+    """Write a file that is not recently modified."""
+    pod.write_file(pod_path, content)
+    old_time = os.path.getmtime(pod.abs_path(pod_path)) - 60
+    os.utime(pod.abs_path(pod_path), (old_time, old_time))
+
+
 class TestCase(unittest.TestCase):
     pass
 